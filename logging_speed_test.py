@@ -0,0 +1,32 @@
+import sys
+import os
+import time
+import tempfile
+sys.path.append(os.path.abspath("."))
+from zytlib import scope
+from zytlib.logging import Logger, INFO
+
+n = 100000
+
+def per_call(func):
+    start = time.perf_counter()
+    for step in range(n):
+        func(step)
+    return (time.perf_counter() - start) / n * 1e6
+
+logger = Logger(stream_log_level=False, file_log_level=INFO, file_path=tempfile.mkdtemp(), file_name="speed")
+logger.logger
+
+with scope("debug (filtered out)"):
+    print("{:.3f} us per call".format(per_call(lambda step: logger.debug("step", step, "loss", 0.5))))
+
+with scope("info (written to file)"):
+    print("{:.3f} us per call".format(per_call(lambda step: logger.info("step", step, "loss", 0.5))))
+
+with scope("variable (written to file and metrics sidecar)"):
+    print("{:.3f} us per call".format(per_call(lambda step: logger.variable("loss[train]", 0.5))))
+
+logger.disable()
+
+with scope("info (disabled logger)"):
+    print("{:.3f} us per call".format(per_call(lambda step: logger.info("step", step, "loss", 0.5))))
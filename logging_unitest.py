@@ -48,3 +48,85 @@ for step in range(20):
     logger.update_notion("current_epoch", step)
 
 Logger.plot_variable_dict(logger.variable_dict, hline=["bottom"], saved_path="Log/test.pdf")
+
+with scope("notion sync"):
+    from zytlib.logging import MockNotionClient
+    mock = MockNotionClient(fail_times=1)
+    notion_logger = Logger(notion_client=mock, notion_batch_interval=0.2, notion_backoff=0.01)
+    for step in range(20):
+        notion_logger.update_notion("current_epoch", step)
+    notion_logger.notion_buffer_flush()
+    assert mock.properties == {"current_epoch": 19}
+    from zytlib.logging import NotionSyncWorker
+    mock = MockNotionClient()
+    worker = NotionSyncWorker(lambda: mock, batch_interval=0.3)
+    for step in range(5):
+        worker.submit("current_epoch", step)
+        time.sleep(0.02)
+    assert worker.close(timeout=10) and len(mock.calls) == 1 and mock.properties == {"current_epoch": 4}
+
+with scope("metrics sidecar"):
+    import tempfile
+    metrics_logger = Logger(stream_log_level=False, file_log_level=True, file_path=tempfile.mkdtemp(), file_name="metrics")
+    metrics_logger.hyper(lr=0.1)
+    for step in range(5):
+        metrics_logger.variable("acc", [step, step])
+        metrics_logger.variable("loss[train]", step)
+    metrics_logger.metrics_sidecar.flush()
+    variable_dict = Logger.variable_from_logging_file(metrics_logger.get_f_fullpath(), names=["loss"])
+    assert list(variable_dict.keys()) == ["loss"] and list(variable_dict["loss"]["train"]) == [0., 1., 2., 3., 4.]
+    assert Logger.hyper_from_logging_file(metrics_logger.get_f_fullpath())["lr"] == 0.1
+    from zytlib.logging import LogFileParser
+    text_variables = LogFileParser(hyper=False, parser=False).parse(metrics_logger.get_f_fullpath()).variable
+    assert list(Logger.variable_from_logging_file(metrics_logger.get_f_fullpath())) == list(text_variables) == ["acc", "loss"]
+    assert list(text_variables["loss"]["train"]) == list(variable_dict["loss"]["train"])
+    quoting_parser = LogFileParser()
+    quoting_parser.feed("INFO: HYPER<note>: options of the Argument Parser: see above\n")
+    assert quoting_parser.hyper["note"] == "options of the Argument Parser: see above"
+
+with scope("load runs"):
+    import tempfile
+    run_folder = tempfile.mkdtemp()
+    run_files = vector()
+    for run in range(3):
+        run_logger = Logger(stream_log_level=False, file_log_level=True, file_path=run_folder, file_name="run{}".format(run))
+        run_logger.hyper(lr=0.1 * run)
+        for step in range(5):
+            run_logger.variable("loss[train]", step * run)
+        run_logger.metrics_sidecar.close()
+        run_files.append(run_logger.get_f_fullpath())
+    runs = Logger.load_runs(run_files, variables=["loss"], workers=2)
+    assert list(runs.map(lambda run: run.hyper["lr"])) == [0., 0.1, 0.2]
+    assert list(runs[2].variable["loss"]["train"]) == [0., 2., 4., 6., 8.]
+    assert str(Logger.load_run(run_files[1])) == str(runs[1])
+    from zytlib.parallel import default_workers
+    assert default_workers() == (os.cpu_count() or 1) and default_workers(2) == 2
+    assert str(Logger.load_runs(run_files, variables=["loss"])) == str(runs)
+
+with scope("lazy call site"):
+    import tempfile
+    class CountStr:
+        count = 0
+        def __str__(self):
+            CountStr.count += 1
+            return "counted"
+    from zytlib.logging import DEBUG, INFO
+    lazy_logger = Logger(stream_log_level=False, file_log_level=INFO, file_path=tempfile.mkdtemp(), file_name="lazy")
+    assert not lazy_logger.isEnabledFor(DEBUG) and lazy_logger.isEnabledFor(INFO)
+    lazy_logger.debug(CountStr())
+    assert CountStr.count == 0
+    lazy_logger.info(CountStr())
+    assert CountStr.count == 1
+    lazy_logger.f_handler.flush()
+    assert "logging_unitest.py[line:" in open(lazy_logger.get_f_fullpath()).read().splitlines()[-1]
+
+with scope("async file handler"):
+    import tempfile
+    from zytlib.logging import AsyncFileHandler, INFO
+    async_logger = Logger(stream_log_level=False, file_log_level=INFO, file_path=tempfile.mkdtemp(), file_name="async", async_file=True, name="async")
+    assert isinstance(async_logger.f_handler, AsyncFileHandler)
+    for step in range(1000):
+        async_logger.info("step", step)
+    async_logger.f_handler.flush()
+    lines = [line for line in open(async_logger.get_f_fullpath()) if "INFO: step" in line]
+    assert [int(line.split()[-1]) for line in lines] == list(range(1000))
@@ -9,3 +9,21 @@ from zytlib.filemanager import path
 p = path(".")
 t = p / "Log" / "test.log"
 
+
+from zytlib import scope
+with scope("recursive search"):
+    folder = path("zytlib")
+    files = folder.recursive_search().vector()
+    assert files.filter(lambda x: x.fullname == "filemanager.py").length == 1
+    assert sorted(str(x) for x in folder.recursive_search(workers=4)) == sorted(str(x) for x in files)
+    assert path.rlistdir(folder, ext="py").vector().all(lambda x: x.isfile())
+
+with scope("file index"):
+    import tempfile
+    from zytlib.filemanager import FileIndex
+    FileIndex.cache_folder = tempfile.mkdtemp()
+    folder = path("zytlib")
+    index = folder.file_index()
+    assert [str(x) for x in folder.recursive_search(use_index=True)] == [str(x) for x in folder.recursive_search()]
+    assert index.stat("vector.py")[0] == os.path.getsize("zytlib/vector.py")
+    assert not index.refresh()
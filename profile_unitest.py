@@ -12,3 +12,39 @@ def gcd(a, b):
     if a == 0:
         return b
     return gcd(b % a, a)
+
+from zytlib import scope
+
+with scope("profiler"):
+    from zytlib import vector
+    from zytlib.timing import Profiler
+    from zytlib.wrapper import FunctionTimer
+    p = Profiler(trace=True)
+    function_timer = FunctionTimer(profiler=p)
+    square = function_timer.timer(lambda x: x ** 2)
+    for _ in range(3):
+        with p.scope("epoch"):
+            with p.scope("data"):
+                vector.range(100).sum()
+            square(2)
+    records = p.table()
+    assert list(records.keys()) == ["epoch", "epoch/data", "epoch/<lambda>"]
+    assert records["epoch"].calls == 3 and records["epoch"].total >= records["epoch/data"].total + records["epoch/<lambda>"].total
+    assert len(p.chrome_trace()["traceEvents"]) == 10
+    assert p.folded().splitlines()[1].startswith("MainThread;epoch;data ")
+    assert Profiler(enabled=False).scope("x") is Profiler(enabled=False).scope("y")
+
+with scope("sampling profile"):
+    import tempfile
+    from time import sleep
+    from zytlib import vector
+    from zytlib.visual.debugger import profile, SamplingProfiler
+    stats_file = os.path.join(tempfile.mkdtemp(), "profile.stats")
+    @profile(1, filename=stats_file, mode="sample", interval=0.001)
+    def sampled(n):
+        sleep(0.02)
+        return vector.range(n).sum()
+    assert sampled(1000) == sampled(1000) == 499500
+    stats = SamplingProfiler.load_stats(stats_file)
+    assert stats["samples"] > 0 and stats["functions"][0][2] == "sampled"
+    assert any(key[2] == "sampled" for key in stats["line_total"])
@@ -12,6 +12,7 @@ __all__ = """
 """.split()
 
 from functools import wraps
+from collections import namedtuple
 from .typehint import *
 from .typehint import __all__ as typehint_all
 from .typehint import TypeHintError, _getDeclaration
@@ -23,11 +24,30 @@ _debug = False
 
 def set_debug_mode(m): global _debug; _debug = m
 
+_params_cache = {}
+
 def _wrap_params(f):
+    try: return _params_cache[f]
+    except (KeyError, TypeError): pass
     if hasattr(f, '__wrapped__'):
-        if '[params]' in f.__name__: return None, f
-        else: return f, params(run=False)(_get_wrapped(f))
-    return f, params(run=False)(f)
+        if '[params]' in f.__name__: ret = None, f
+        else: ret = f, params(run=False)(_get_wrapped(f))
+    else: ret = f, params(run=False)(f)
+    try: _params_cache[f] = ret
+    except TypeError: pass
+    return ret
+
+def _type_only(f):
+    """
+    whether the check of params on f only depends on the types of the arguments,
+    i.e. f is not decorated and all its annotations are plain classes
+    """
+    if hasattr(f, '__wrapped__'): return False
+    annotations = getattr(f, '__annotations__', None)
+    if annotations is None: return False
+    return all(type(t) is type and t is not type for k, t in annotations.items() if k != 'return')
+
+DispatchInfo = namedtuple("DispatchInfo", ["hits", "misses", "size"])
 
 def _collect_declarations(func, collection, place_first=False, error=''):
     f = _get_wrapped(raw_function(func))
@@ -69,6 +89,8 @@ def overload(func):
         local_vars[key] = 0
         local_vars[overrider] = override(func)
     exec(f"def {rawfname}(*args, **kwargs): return {overrider}(*args, **kwargs)", local_vars)
+    for attr in ("dispatch_info", "dispatch_cache_clear"):
+        if hasattr(local_vars[overrider], attr): setattr(local_vars[rawfname], attr, getattr(local_vars[overrider], attr))
     # func.__name__ = '['.join([new_name] + func.__name__.split('[')[1:])
     return local_vars[rawfname]
 
@@ -95,6 +117,14 @@ def override(*arg):
     if not iterable(arg):
         if not Functional(arg): raise SyntaxError("Wrong usage of @override. ")
         class override_wrapper:
+            """
+            the implementation chosen for the types of the arguments (and the names of keyword arguments) is cached:
+            dispatch_cache[key] = (positions of candidates tried before the winner whose check depends on values, position of the winner, whether the winner can be called without check)
+            candidates with a type-only check (see _type_only) that failed for key are skipped at the next call,
+            the cache is cleared when a new implementation is registered.
+            """
+            max_cache_size = 1024
+
             def __init__(self, argf):
                 self.mainfunc = argf
                 self.func_list = [argf]
@@ -102,18 +132,79 @@ def override(*arg):
                 if fname.endswith('__0__') or fname.endswith("__default__"): self.default = 0
                 else: self.default = None
                 self.must_default = False
+                self.dispatch_cache = {}
+                self.hits = 0
+                self.misses = 0
+                self.order = None
+
+            def dispatch_info(self):
+                return DispatchInfo(self.hits, self.misses, len(self.dispatch_cache))
+
+            def dispatch_cache_clear(self):
+                self.dispatch_cache.clear()
+                self.order = None
+
+            def resolution_order(self):
+                if self.order is None:
+                    order = [(f, False) for i, f in enumerate(self.func_list) if i != self.default]
+                    if self.default is not None: order.append((self.func_list[self.default], True))
+                    self.order = order
+                return self.order
+
+            def dispatch(self, args, kwargs, dec_list):
+                order = self.resolution_order()
+                key = (tuple(type(x) for x in args), tuple((k, type(v)) for k, v in kwargs.items()))
+                entry = self.dispatch_cache.get(key, None)
+                if entry is None:
+                    self.misses += 1
+                    tries = []
+                    for pos, (f, place_first) in enumerate(order):
+                        ret = _try_imp(f, by=(args, kwargs), collect=dec_list, place_first=place_first)
+                        if isinstance(ret, str) and ret == "__try_imp_failed__":
+                            if not _type_only(f): tries.append(pos)
+                            continue
+                        if len(self.dispatch_cache) >= self.max_cache_size: self.dispatch_cache.clear()
+                        self.dispatch_cache[key] = (tuple(tries), pos, _type_only(f))
+                        return ret
+                    return "__try_imp_failed__"
+                self.hits += 1
+                tries, winner, direct = entry
+                declarations = {}
+                for pos in tries + tuple(range(winner, len(order))):
+                    f, place_first = order[pos]
+                    declarations[pos] = collected = []
+                    if pos == winner and direct:
+                        try: return f(*args, **kwargs)
+                        except TypeHintError as e:
+                            _collect_declarations(f, collected, error=str(e))
+                            continue
+                    ret = _try_imp(f, by=(args, kwargs), collect=collected)
+                    if not (isinstance(ret, str) and ret == "__try_imp_failed__"): return ret
+                # no implementation matches: the usages are listed in resolution order as without cache,
+                # the skipped candidates are type-only, so their check is run again without running their body
+                for pos, (f, place_first) in enumerate(order):
+                    if pos not in declarations:
+                        try:
+                            _wrap_params(f)[1](*args, **kwargs)
+                            _collect_declarations(f, dec_list, place_first=place_first)
+                        except TypeHintError as e: _collect_declarations(f, dec_list, place_first=place_first, error=str(e))
+                        continue
+                    for x in declarations[pos]:
+                        if place_first: dec_list.insert(0, x)
+                        else: dec_list.append(x)
+                return "__try_imp_failed__"
 
             def __call__(self, *args, **kwargs):
                 if len(args) > 0:
                     argf = args[0]
-                    if not kwargs and len(args) == 1 and Functional(argf):
+                    if not kwargs and len(args) == 1 and callable(argf) and Functional(argf):
                         fname = raw_function(argf).__name__.split('[')[0]
                         funcname = _get_func_name(self.mainfunc)
                         if fname == "_" or funcname in fname:
                             if fname.endswith('__0__') or fname.endswith("__default__"):
                                 if self.default is not None: raise TypeError("Only one default function is acceptable. ")
                                 self.default = len(self.func_list)
-                            self.func_list.append(argf); return
+                            self.func_list.append(argf); self.dispatch_cache_clear(); return
                             self.must_default = True
                 dec_list = []
                 if len(self.func_list) == 1:
@@ -136,12 +227,9 @@ def override(*arg):
                         _collect_declarations(self.func_list[0], dec_list, error=str(e))
                         if _debug: print(str(e))
                 elif len(self.func_list) > 1:
-                    if self.must_default and self.default is None: self.default = 0
-                    for i, f in list(enumerate(self.func_list)) + ([(-1, self.func_list[self.default])] if self.default is not None else []):
-                        if i == self.default: continue
-                        ret = _try_imp(f, by=(args, kwargs), collect=dec_list, place_first=i==-1)
-                        if isinstance(ret, str) and ret == "__try_imp_failed__": pass
-                        else: return ret
+                    if self.must_default and self.default is None: self.default = 0; self.dispatch_cache_clear()
+                    ret = self.dispatch(args, kwargs, dec_list)
+                    if not (isinstance(ret, str) and ret == "__try_imp_failed__"): return ret
                 else:
                     for name, value in arg.__globals__.items():
                         name = name.replace('override', '').strip('_')
@@ -161,6 +249,8 @@ def override(*arg):
         owrapper = override_wrapper(arg)
         @wraps(arg)
         def final_wrapper(*args, **kwargs): return owrapper(*args, **kwargs)
+        final_wrapper.dispatch_info = owrapper.dispatch_info
+        final_wrapper.dispatch_cache_clear = owrapper.dispatch_cache_clear
         return final_wrapper
     else:
         functionlist = arg
@@ -45,7 +45,7 @@ __all__ = """
     FloatScalar
 """.split()
 
-import re, sys
+import re, os, sys, weakref
 from pyoverload.utils import decorator, get_environ_vars, raw_function, _get_wrapped
 
 try:
@@ -556,11 +556,15 @@ class Type(type):
     def checktype(self, *args):
         raise NotImplementedError("Please implement the check function 'checktype' first.")
 
+# the calls of Types that check nothing but isoftype(x, self.types), shape, itemtypes and inv
+_plain_calls = {Type.__call__}
+
 def T(main_type, *args, name=None):
     class Default_Type(Type):
         def __call__(self, arg):
             if super().__call__(arg): return main_type
             else: return None
+    _plain_calls.add(Default_Type.__call__)
     return Default_Type(main_type, *args, name=name)
 
 Bool = T(bool)
@@ -687,81 +691,177 @@ def getArgs(func, *args, **kwargs):
         .format(lower=-rg[0], upper=rg[1] - rg[0], real=len(inputargs) + rg[1] - rg[0]))
     return allargs
 
+_check = os.environ.get("PYOVERLOAD_CHECK", "1").lower() not in ("0", "false", "off", "no")
+
+def set_check_mode(m):
+    """
+    set_check_mode(m)
+
+    Switch the checks of @params on (True) or off (False). With checks off, functions decorated afterwards
+    are returned unchanged, so they run without any overhead. The environment variable PYOVERLOAD_CHECK=0
+    switches the checks off from the start, which also covers functions decorated at import time.
+    Checkers used by overload resolution (params(run=False)) are not affected.
+    """
+    global _check; _check = m
+
+_type_predicates = weakref.WeakKeyDictionary()
+
+def _isinstance_types(xtype):
+    """
+    Returns a tuple of classes ct such that isoftype(x, xtype) == isinstance(x, ct) for any x, or None if there is none.
+    """
+    if isinstance(xtype, Type):
+        if type(xtype).__call__ in _plain_calls and not xtype.inv and len(xtype.shape) == 0 and xtype.itemtypes is None:
+            return _isinstance_types(xtype.types)
+        return None
+    if isinstance(xtype, type): return None if xtype is type else (xtype,)
+    if isinstance(xtype, (list, tuple)):
+        classes = tuple()
+        for xt in xtype:
+            ct = _isinstance_types(xt)
+            if ct is None: return None
+            classes += ct
+        return classes
+    return None
+
+def _type_predicate(xtype):
+    """
+    Returns a cached function equivalent to lambda x: isoftype(x, xtype) for a pyctlib.Type xtype.
+    """
+    try: return _type_predicates[xtype]
+    except KeyError: pass
+    if type(xtype).__call__ in _plain_calls and len(xtype.shape) == 0 and xtype.itemtypes is None:
+        inner = _compile_predicate(xtype.types)
+        if xtype.inv: predicate = lambda x: not inner(x)
+        else: predicate = inner
+    elif xtype.isunion:
+        types = xtype.types
+        predicate = lambda x: type(x) in types or xtype(x) not in (None, False)
+    else: predicate = lambda x: xtype(x) not in (None, False)
+    _type_predicates[xtype] = predicate
+    return predicate
+
+def _compile_predicate(xtype):
+    """
+    Returns a function equivalent to lambda x: isoftype(x, xtype), with the dispatch on xtype done once.
+    """
+    classes = _isinstance_types(xtype)
+    if classes is not None: return lambda x: isinstance(x, classes)
+    if xtype is None: return lambda x: True
+    if xtype is type: return isatype
+    # strings are evaluated in the environment of each call
+    if isinstance(xtype, str): return lambda x: isoftype(x, xtype)
+    if not iterable(xtype):
+        if isinstance(xtype, Type): return _type_predicate(xtype)
+        if callable(xtype):
+            name = _get_func_name(xtype)
+            if name and (name.split('.')[-1].startswith('is') or name.split('.')[-1].endswith('able')):
+                def predicate(x):
+                    try: return xtype(x) not in (None, False)
+                    except: return False
+                return predicate
+            return lambda x: False
+        return lambda x: isoftype(x, xtype)
+    predicates = [_compile_predicate(xt) for xt in xtype]
+    return lambda x: type(x) in xtype or any(p(x) for p in predicates)
+
+def _varargs_predicate(xtype):
+    each = _compile_predicate(xtype)
+    items = [_compile_predicate(xt) for xt in xtype] if isinstance(xtype, (list, tuple)) else None
+    def predicate(values):
+        if items is not None and len(items) == len(values) and not all(p(v) for p, v in zip(items, values)): return False
+        return all(each(x) for x in values)
+    return predicate
+
+def _varkwargs_predicate(xtype):
+    if isinstance(xtype, dict):
+        predicates = {k: _compile_predicate(xt) for k, xt in xtype.items()}
+        return lambda values: all(p(values[k]) for k, p in predicates.items() if k in values)
+    each = _compile_predicate(xtype)
+    return lambda values: all(each(x) for x in values.values())
+
+def _compile_checker(signature, annotations):
+    """
+    Generates the function 'tmp' with the parameters of signature (defaults replaced by a marker) which
+    returns None if the arguments satisfy annotations and (name, value) of the first wrong argument otherwise.
+    Plain classes are checked by an inline isinstance, other types by the predicates of _compile_predicate.
+    """
+    env = {'__default': object(), '__isinstance': isinstance}
+    declaration = []
+    lines = []
+    star = False
+    for i, (name, param) in enumerate(signature.parameters.items()):
+        kind = param.kind
+        if kind == param.VAR_POSITIONAL: declaration.append('*' + name); star = True
+        elif kind == param.VAR_KEYWORD: declaration.append('**' + name)
+        else:
+            if kind == param.KEYWORD_ONLY and not star: declaration.append('*'); star = True
+            declaration.append(name + ('=__default' if param.default is not param.empty else ''))
+            if kind == param.POSITIONAL_ONLY and (
+                i + 1 == len(signature.parameters) or
+                list(signature.parameters.values())[i + 1].kind != param.POSITIONAL_ONLY
+            ): declaration.append('/')
+        if name not in annotations: continue
+        xtype = annotations[name]
+        if kind == param.VAR_POSITIONAL:
+            env[f'__p{i}'] = _varargs_predicate(xtype)
+            condition = f"not __p{i}({name})"
+        elif kind == param.VAR_KEYWORD:
+            env[f'__p{i}'] = _varkwargs_predicate(xtype)
+            condition = f"not __p{i}({name})"
+        else:
+            classes = _isinstance_types(xtype)
+            if classes is not None:
+                env[f'__t{i}'] = classes
+                condition = f"not __isinstance({name}, __t{i})"
+            else:
+                env[f'__p{i}'] = _compile_predicate(xtype)
+                condition = f"not __p{i}({name})"
+            if param.default is not param.empty: condition = f"{name} is not __default and {condition}"
+        lines.append(f"    if {condition}: return {name!r}, {name}")
+    lines.append("    return None")
+    exec(f"def tmp({', '.join(declaration)}):\n" + '\n'.join(lines), env)
+    return env['tmp']
+
 @decorator
 def params(*types, run=True, **kwtypes):
+    """
+    @params
+    @params(type1, type2, arg3=type3, __return__=rtype)
+
+    Check the types of the arguments (given by the annotations or the arguments of params) at each call,
+    a TypeHintError is raised for an argument of wrong type. With run=False, the decorated function only
+    performs the checks and returns None. The checker is generated once per signature, see set_check_mode
+    for switching the checks off.
+    """
     if len(types) == 1 and len(kwtypes) == 0 and Functional(types[0]): return params()(types[0])
     @decorator
     def induced_decorator(func):
-        declaration = _getDeclaration(_get_wrapped(raw_function(func)))
-        eargs = ''
-        ekwargs = ''
-        depth = []
-        d = 0;
-        is_comma = False
-        is_star = False
-        args_rec = False
-        kwargs_rec = False
-        for c in declaration:
-            if c in '([{': d += 1
-            depth.append(d)
-            if c not in "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ_0123456789":
-                kwargs_rec = args_rec = False
-            elif kwargs_rec: ekwargs += c
-            elif args_rec: eargs += c
-            if c  == '*' and d == 1:
-                if is_star:
-                    # **
-                    kwargs_rec = True
-                    ekwargs += c
-                elif is_comma:
-                    is_star = True
-            elif is_star:
-                # *
-                args_rec = True
-                eargs += c
-                is_star = False
-            if c  == ',' and d == 1: is_comma = True
-            elif c in ' \t': pass
-            elif c == '(': is_comma = True
-            else: is_comma = False
-            if c in '}])': d -= 1
-            if d == 0: break
-        declaration = ''.join(c for x, c in zip(depth, declaration) if x == 1)
-        declaration = declaration.strip('()')
-        declaration = ','.join(p.split(':')[0].split('=')[0].strip() + ("='__default__'" if '=' in p else '') for p in declaration.split(','))
-        exec(f"def tmp({declaration}): return locals()")
-        fetch = eval('tmp')
+        if run and not _check: return func
+        signature = inspect.signature(_get_wrapped(raw_function(func)), follow_wrapped=False)
         if len(types) == len(kwtypes) == 0:
-            annotations = func.__annotations__
-            if 'return' in annotations:
-                rtype = annotations.pop('return')
-            else: rtype = None
+            annotations = dict(func.__annotations__)
+            rtype = annotations.pop('return', None)
         else:
-            if '__return__' in kwtypes:
-                rtype = kwtypes.pop('__return__')
-            else: rtype = None
-            annotations = fetch(*types, **kwtypes)
+            _kwtypes = dict(kwtypes)
+            rtype = _kwtypes.pop('__return__', None)
+            annotations = dict(signature.bind_partial(*types, **_kwtypes).arguments)
+        fetch = _compile_checker(signature, annotations)
+        rcheck = None if rtype is None else _compile_predicate(rtype)
         def wrapper_func(*args, **kwargs):
-            try: values = fetch(*args, **kwargs)
-            except Exception as e: raise TypeHintError(str(e).replace('tmp()', f'{_get_func_name(func)}()'))
-            for arg in values:
-                if equals(values[arg], "__default__") or arg not in annotations: continue
-                if arg == eargs:
-                    if Sequence(annotations[arg]) and len(annotations[arg]) == len(values[arg]):
-                        if not all(isoftype(v, t) for v, t in zip(values[arg], annotations[arg])): break
-                    if any(not isoftype(x, annotations[arg]) for x in values[arg]): break
-                elif arg == ekwargs:
-                    if Dict(annotations[args]):
-                        if not all(isoftype(values[arg][k], annotations[arg][k]) for k in annotations[args]): break
-                    if any(not isoftype(x, annotations[arg]) for x in values[arg].values()): break
-                elif not isoftype(values[arg], annotations[arg]): break
-            else:
+            try: wrong = fetch(*args, **kwargs)
+            except TypeError as e:
+                # errors of binding the arguments are raised before the frame of fetch is created
+                if e.__traceback__.tb_next is not None: raise
+                raise TypeHintError(str(e).replace('tmp()', f'{_get_func_name(func)}()'))
+            if wrong is None:
                 if run:
                     r = func(*args, **kwargs)
-                    if isoftype(r, rtype): return r
+                    if rcheck is None or rcheck(r): return r
                     else: raise TypeHintError(f"{_get_func_name(func)}() has return value of wrong type. Expect type {repr(rtype)} but got {repr(r)}.")
                 else: return None
-            raise TypeHintError(f"{_get_func_name(func)}() has argument {arg} of wrong type. Expect type {repr(annotations[arg])} but got {repr(values[arg])}.")
+            arg, value = wrong
+            raise TypeHintError(f"{_get_func_name(func)}() has argument {arg} of wrong type. Expect type {repr(annotations[arg])} but got {repr(value)}.")
         return wrapper_func
     return induced_decorator
         
@@ -34,7 +34,9 @@ def decorator(wrapper_func):
             raw_func = raw_function(func)
             if callable(raw_func):
                 func_name = f"{raw_func.__name__}[{wrapper_func.__qualname__.split('.')[0]}]"
-                wrapped_func = wraps(raw_func)(wrapper_func(raw_func))
+                wrapped_func = wrapper_func(raw_func)
+                if wrapped_func is raw_func: return func
+                wrapped_func = wraps(raw_func)(wrapped_func)
                 wrapped_func.__name__ = func_name
                 wrapped_func.__doc__ = raw_func.__doc__
                 # return wrapped_func
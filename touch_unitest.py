@@ -22,3 +22,15 @@ for index in range(2):
         print(1)
 
 print(once.history)
+
+from zytlib import scope
+
+with scope("touch fast path"):
+    from zytlib import vector, touch
+    def touch_locals():
+        x = 3
+        return touch("x + 1"), touch("np.ones(2).sum()"), touch("x / 0", -1), touch("(", "syntax")
+    assert touch_locals() == (4, 2.0, -1, "syntax")
+    assert list(vector(0, 1, 2).map(lambda x: 1 / x, default=-1)) == [-1, 1.0, 0.5]
+    assert list(vector((1, 2), (0, 1)).map(lambda a, b: b / a, default=-1)) == [2.0, -1]
+    assert list(vector(0, 1, 2).map(lambda x: 1 / x, default=-1, filter_function=lambda index, x: index > 0)) == [0, 1.0, 0.5]
@@ -98,3 +98,214 @@ with scope("register_result"):
     assert all(f1 == f2)
     assert list(t._vector__map_register.keys()) == ["plus 1"]
     assert list(t._vector__filter_register.keys()) == [">0"]
+
+with scope("dense"):
+    t = vector([1, 2, 3, 4], content_type=float)
+    assert t.isdense
+    assert t.sum() == 10
+    assert list(t < 3) == [True, True, False, False]
+    assert list(t.cumsum()) == [1., 3., 6., 10.]
+    assert t[1:3].isdense
+    assert (t + vector([5], content_type=float)).isdense
+    assert vector(1, 2, 3).dense().content_type is int
+
+with scope("lazy"):
+    t = vector.range(10)
+    r = t.lazy().map(lambda x: x * 2).filter(lambda x: x > 5).collect()
+    assert list(r) == list(t.map(lambda x: x * 2).filter(lambda x: x > 5)) == [6, 8, 10, 12, 14, 16, 18]
+    assert list(r) == list(t.map_index_from(r).map(lambda x: x * 2))
+    assert list(vector(0, 1, 2, 3).lazy().test(lambda x: 1 / x).replace(1, -1)) == [-1, 2, 3]
+
+with scope("parallel"):
+    t = vector.range(1000)
+    assert list(t.map(lambda x: x ** 2, workers=4)) == list(t.map(lambda x: x ** 2)) == [x ** 2 for x in range(1000)]
+    assert list(vector(0, 1, 2).map(lambda x: 1 / x, workers=2, default=None)) == [None, 1.0, 0.5]
+
+with scope("IndexMapping slice composition"):
+    t = vector.range(100)
+    r = t[10:][::2][::-3]
+    assert r.index_mapping.isslice
+    assert list(r) == list(range(100))[10:][::2][::-3]
+    assert r.index_mapping.reverse_getitem(0) == 98 and r.index_mapping[98] == 0 and r.index_mapping[97] == -1
+    assert list(r.index_mapping.reverse().index_map) == list(r)
+    assert t.filter(lambda x: x % 3 == 0)[::-1].index_mapping.reverse_getitem(0) == 99
+
+with scope("mask indexing"):
+    t = vector.range(10)
+    assert list(t[t > 5]) == [6, 7, 8, 9]
+    assert list(t[[3, -1, 2]]) == [3, 9, 2]
+    assert list(t[np.arange(10) % 2 == 0]) == [0, 2, 4, 6, 8]
+    assert t[2:][t[2:] > 5].index_mapping.reverse_getitem(0) == 6
+
+with scope("columnar save"):
+    import tempfile
+    filepath = os.path.join(tempfile.mkdtemp(), "t.vec")
+    t = vector.range(20)[::-3]
+    t.save(filepath)
+    r = vector.load(filepath)
+    assert list(r) == list(t) == list(range(20))[::-3] and r.index_mapping.reverse_getitem(0) == 19
+    assert list(vector.load(filepath, mmap=True, index=slice(1, 3))) == list(t[1:3]) == [16, 13]
+    vector.from_list([[1, 2], [3, 4]]).save(filepath)
+    assert vector.load(filepath).shape == (2, 2)
+    vector("a", "b").save(filepath)
+    assert list(vector.load(filepath)) == ["a", "b"]
+    os.remove(filepath)
+
+with scope("search index"):
+    from zytlib.search import SearchIndex
+    index = SearchIndex(["apple", "banana", "peach", "Pineapple"])
+    assert list(index.contains("an")) == [1]
+    assert list(index.contains("ana")) == [1]
+    assert list(index.contains("p", case_sensitive=False)) == [0, 2, 3]
+    assert vector("apple", "banana", "peach").fuzzy_search("aple") == "apple"
+    assert list(vector("apple", "banana", "peach").regex_search("a.a", max_k=2)) == ["banana"]
+
+with scope("registered cache"):
+    from zytlib.wrapper import registered_property, registered_method, destory_registered_property, registered_cache_info
+    t = vector(1, 2)
+    assert t.shape == (2,)
+    t.append(3)
+    assert t.shape == (3,)
+    class Cached:
+        calls = 0
+        @registered_property
+        def value(self):
+            Cached.calls += 1
+            return 1
+        @registered_method(n=1, maxsize=2)
+        def double(self, x):
+            Cached.calls += 1
+            return 2 * x
+        @destory_registered_property("value")
+        def reset(self):
+            return
+    c = Cached()
+    assert c.value == 1 and c.value == 1 and Cached.calls == 1
+    c.double(1), c.double(2), c.double(1), c.double(3)
+    assert Cached.double.cache_info(c) == (1, 3, 1, 2, 0)
+    c.reset()
+    assert c.value == 1 and Cached.calls == 5
+    assert registered_cache_info(c)["value"].misses == 2
+
+with scope("override dispatch cache"):
+    from pyoverload import overload, List
+    @overload
+    def dispatched(x: int): return "int"
+    @overload
+    def dispatched(x: List[int]): return "int list"
+    @overload
+    def dispatched(x: list): return "list"
+    for _ in range(2):
+        assert dispatched(1) == "int" and dispatched([1, 2]) == "int list" and dispatched(["a"]) == "list"
+    assert dispatched.dispatch_info() == (4, 2, 2)
+    @overload
+    def dispatched(x: str): return "str"
+    assert dispatched("a") == "str" and dispatched([1]) == "int list" and dispatched.dispatch_info().size == 2
+    from pyoverload import params
+    @params
+    def checked(x: int): return x
+    calls = []
+    @overload
+    def counted(x: int):
+        calls.append(x)
+        return checked(x if x >= 0 else "negative")
+    @overload
+    def counted(x: str): return "str"
+    assert counted(1) == 1 and counted(2) == 2
+    try:
+        counted(-1)
+        assert False
+    except NameError as e:
+        assert "counted(x: int)" in str(e) and "counted(x: str)" in str(e)
+    assert calls == [1, 2, -1]
+
+with scope("params checker"):
+    from pyoverload import params
+    from pyoverload.typehint import TypeHintError, Real, set_check_mode
+    @params
+    def checked(a: int, b: Real, *args: int, d: str = "x", **kwargs: float) -> Real: return a + b
+    assert checked(1, 2.) == 3. and checked(1, 2, 3, d="y", e=1.) == 3
+    for call in [lambda: checked(1., 2), lambda: checked(1, 2, "a"), lambda: checked(1, 2, d=1), lambda: checked(1, 2, e=1), lambda: checked()]:
+        try: call(); assert False
+        except TypeHintError: pass
+    def unchecked(a: int): return a
+    set_check_mode(False)
+    assert params(unchecked) is unchecked
+    set_check_mode(True)
+    try: params(unchecked)(1.); assert False
+    except TypeHintError: pass
+
+with scope("strided"):
+    a = np.arange(24).reshape(2, 3, 4)
+    t = vector.range(24).reshape(2, 3, 4)
+    assert t.tolist() == a.tolist() and t.flatten().tolist() == a.ravel().tolist()
+    assert t.flatten(1).shape == (6, 4)
+    assert list(vector([vector(1, vector(2, 3)), vector(4)]).flatten()) == [1, 2, 3, 4]
+    assert t.permute(2, 0, 1).tolist() == a.transpose(2, 0, 1).tolist()
+    assert t.transpose(0, 2).tolist() == a.swapaxes(0, 2).tolist() and t.transpose(1, 2).tolist() == a.swapaxes(1, 2).tolist()
+    ragged = vector([vector.range(6).reshape(2, 3), vector.range(8).reshape(2, 4)]).transpose(1, 2)
+    assert ragged.tolist() == [np.arange(6).reshape(2, 3).T.tolist(), np.arange(8).reshape(2, 4).T.tolist()]
+    assert t.T.reshape(6, -1).tolist() == a.T.reshape(6, -1).tolist()
+    s = t.strided().T
+    assert s.shape == (4, 3, 2) and s.strides == (1, 4, 12) and not s.is_contiguous
+    assert s[3, 1, 0] == a.T[3, 1, 0] and s[1].tovector().tolist() == a.T[1].tolist()
+    assert s.reshape(-1).is_contiguous and s.reshape(-1).tolist() == a.T.ravel().tolist()
+
+with scope("dim reductions"):
+    a = np.arange(24).reshape(2, 3, 4) % 5
+    t = vector(a.tolist(), recursive=True)
+    for d in range(3):
+        assert t.sum(dim=d).tolist() == a.sum(axis=d).tolist() and t.max(dim=d).tolist() == a.max(axis=d).tolist()
+        assert t.argmin(dim=d).tolist() == a.argmin(axis=d).tolist() and t.prod(dim=d).tolist() == a.prod(axis=d).tolist()
+        assert np.allclose(t.mean(dim=d).tolist(), a.mean(axis=d)) and np.allclose(t.std(dim=d).tolist(), a.std(axis=d))
+    assert t.sum(dim=-1).tolist() == t.sum(dim=2).tolist() == a.sum(axis=-1).tolist()
+    s = vector(vector("a", "b"), vector("c", "d"))
+    assert s.sum(dim=0).tolist() == ["ac", "bd"] and s.argmax(dim=1).tolist() == [1, 1]
+    assert vector([vector(2 ** 62, 2 ** 62), vector(2 ** 62, 1)]).sum(dim=0).tolist() == [2 ** 63, 2 ** 62 + 1]
+
+with scope("versioned cache"):
+    t = vector(3, 1, 2)
+    assert t.sum() == 6 and t.max() == 3 and t.shape == (3,) and list(t.sort()) == [1, 2, 3]
+    t.insert(0, 10)
+    assert t.sum() == 16 and t.max() == 10 and t.shape == (4,)
+    del t[0]
+    assert t.sum() == 6 and t.max() == 3
+    t.map_(lambda x: -x)
+    assert t.sum() == -6 and list(t.sort()) == [-3, -2, -1] and list(t.unique()) == [-3, -1, -2]
+    t += [0.5]
+    assert t.element_type == {int, float} and t.count_all()[0.5] == 1 and 0.5 in t
+    t.sort_()
+    assert list(t) == [-3, -2, -1, 0.5] and t.min() == -3
+    n = vector(vector(1, 2), vector(3, 4))
+    assert n.shape == (2, 2)
+    n.append(vector(5))
+    assert n.shape is None
+
+with scope("groupby"):
+    t = vector(("a", 1), ("b", 2), ("a", 3))
+    r = t.groupby(0).agg(total=(1, "sum"), mean=(lambda x: x[1], "mean"), n="count", top=(1, lambda g: g.max()))
+    assert list(r.key) == ["a", "b"] and list(r.total) == [4, 2] and list(r.mean) == [2., 2.] and list(r.n) == [2, 1] and list(r.top) == [3, 2]
+    assert list(vector(3, 1, 3, 2).groupby(sort=True).agg(n="count").n) == [1, 1, 2]
+    assert {k: list(v) for k, v in dict(vector.range(6).group_by(lambda x: x % 3)).items()} == {0: [0, 3], 1: [1, 4], 2: [2, 5]}
+    assert [type(k) for k in vector(1, 2.5, 1).group_by(lambda x: x).keys()] == [int, float]
+    assert [type(k) for k in vector(True, 1, 0).groupby().agg(n="count").key] == [bool, int] and list(vector(1, 2.5).groupby().agg(f="first").f) == [1, 2.5]
+    rows = vector([dict(subject=s, seed=d, score=float(s * 10 + d + k)) for s in (2, 1) for d in (0, 1) for k in range(2)])
+    r = rows.groupby("subject", "seed").agg(score=("score", "mean"), std=("score", "std"), first=("score", "first"))
+    assert list(r.subject) == [2, 2, 1, 1] and list(r.seed) == [0, 1, 0, 1] and list(r.score) == [20.5, 21.5, 10.5, 11.5] and list(r.std) == [0.5] * 4 and list(r.first) == [20., 21., 10., 11.]
+    assert list(vector([1], [1], [2]).groupby().agg(n="count").n) == [2, 1]
+    assert list(vector((1, 2 ** 62), (1, 2 ** 62), (2, 3)).groupby(0).agg(s=(1, "sum")).s) == [2 ** 63, 3]
+    r = vector(("a", 1), ("b", 2), ("a", 3), ("a", 1)).groupby(0).agg(members=(1, "list"), distinct=(1, "nunique"))
+    assert r.members.map(list).tolist() == [[1, 3, 1], [2]] and list(r.distinct) == [2, 1]
+
+with scope("join"):
+    results = vector(dict(subject=1, acc=0.9), dict(subject=3, acc=0.7))
+    meta = vector(dict(id=1, age=20), dict(id=2, age=30))
+    assert list(results.join(meta, "subject", "id")) == [(results[0], meta[0])]
+    assert list(results.join(meta, "subject", "id", how="outer")) == [(results[0], meta[0]), (results[1], None), (None, meta[1])]
+    assert list(vector(3, 1, 9).join(vector.range(5), how="left")) == [(3, 3), (1, 1), (9, None)]
+    assert list(zytlib.ctgenerator(x for x in range(4)).join([3, 1, 5], how="outer")) == [(0, None), (1, 1), (2, None), (3, 3), (None, 5)]
+    assert vector(1, 2).join(", ") == "1, 2"
+    r = table(subject=vector(1, 3), acc=vector(0.9, 0.7)).join(table(subject=vector(1, 2), age=vector(20, 30)), "subject", how="outer")
+    assert {k: list(v) for k, v in r.items()} == {"subject": [1, 3, 2], "acc": [0.9, 0.7, None], "age": [20, None, 30]}
+    r = table(subject=vector(1, 1), seed=vector(0, 1), acc=vector(0.9, 0.8)).join(table(subject=vector(1), seed=vector(1), loss=vector(0.2)), ["subject", "seed"])
+    assert {k: list(v) for k, v in r.items()} == {"subject": [1], "seed": [1], "acc": [0.8], "loss": [0.2]}
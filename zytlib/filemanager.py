@@ -16,16 +16,17 @@ __all__ = """
     get_search_blacklist
     set_search_blacklist
     get_relative_path
+    FileIndex
 """.split()
 
-import os, re, struct, shutil
+import os, re, struct, shutil, pickle, hashlib
 from .touch import touch
 # from pyoverload import *
 from .wrapper import raw_function, registered_property
 from functools import wraps, reduce, partial
 import typing
 from typing import TextIO, Optional
-from .vector import NoDefault, UnDefined, OutBoundary, vector, generator_wrapper, ctgenerator, IndexMapping, EmptyClass
+from .vector import NoDefault, UnDefined, OutBoundary, vector, generator_wrapper, ctgenerator, IndexMapping, EmptyClass, indexed_search_function
 from rapidfuzz import fuzz
 
 """
@@ -46,6 +47,79 @@ def append_search_blacklist(item):
     global Search_BlackList
     Search_BlackList.append(item)
 
+def _name_ext(file_name):
+    parts = file_name.split(path.extsep)
+    if parts[-1].lower() in ('zip', 'gz', 'rar') and len(parts) > 2: brk = -2
+    elif len(parts) > 1: brk = -1
+    else: brk = 1
+    return path.extsep.join(parts[brk:])
+
+def _scan_directory(folder, all_files, blacklist):
+    """
+    list folder with a single os.scandir pass, return [(name, is_dir)] of directories and files in it
+    the type of an entry comes from its DirEntry, so no extra stat is needed on most file systems
+    """
+    ret = list()
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            name = entry.name
+            if name in blacklist or (not all_files and name.startswith(".")):
+                continue
+            try:
+                if entry.is_dir():
+                    ret.append((name, True))
+                elif entry.is_file():
+                    ret.append((name, False))
+            except OSError:
+                continue
+    return ret
+
+def _scandir_walk(folder, all_files=True, workers=None, include_root=False):
+    """
+    walk the directory tree under folder, every directory is listed exactly once with os.scandir
+    yield (path_str, is_dir, is_leaf) in depth first pre-order, i.e. a directory is yielded right before its content.
+    is_leaf tells whether a directory has no sub-directory (always False for files).
+    names in get_search_blacklist() are skipped, so are hidden names if all_files is False.
+
+    Parameters
+    ----------
+    workers : int
+        if positive, sub-directories are listed ahead of time by a thread pool of this size,
+        which hides the latency of network file systems. The output order doesn't change.
+    include_root : bool
+        whether to yield folder itself first
+    """
+    folder = str(folder)
+    blacklist = set(get_search_blacklist())
+    if workers is not None and workers > 0:
+        from .parallel import get_executor
+        executor = get_executor("thread", workers)
+        request = lambda directory: executor.submit(_scan_directory, directory, all_files, blacklist)
+        receive = lambda pending: pending.result()
+    else:
+        request = lambda directory: directory
+        receive = lambda pending: _scan_directory(pending, all_files, blacklist)
+
+    def expand(directory, entries):
+        return iter([(os.path.join(directory, name), is_dir, request(os.path.join(directory, name)) if is_dir else None) for name, is_dir in entries])
+
+    entries = receive(request(folder))
+    if include_root:
+        yield folder, True, not any(is_dir for _, is_dir in entries)
+    stack = [expand(folder, entries)]
+    while len(stack) > 0:
+        item = next(stack[-1], None)
+        if item is None:
+            stack.pop()
+            continue
+        child, is_dir, pending = item
+        if not is_dir:
+            yield child, False, False
+            continue
+        entries = receive(pending)
+        yield child, True, not any(is_dir for _, is_dir in entries)
+        stack.append(expand(child, entries))
+
 def totuple(num):
     if isinstance(num, str): return (num,)
     try: return tuple(num)
@@ -153,26 +227,11 @@ class pathList(vector):
 
     def regex_search(self, query="", max_k=NoDefault, str_func=get_relative_path, str_display=get_relative_path, display_info=get_main_folder):
 
-        def regex_function(candidate, query):
-            if len(query) == 0:
-                return candidate
-            regex = re.compile(query)
-            selected = candidate.filter(lambda x: regex.search(x), ignore_error=False).sort(len)
-            return selected
-
-        return self.function_search(regex_function, query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info)
+        return self.function_search(indexed_search_function(lambda index, query: (index.regex(query), None)), query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info)
 
     def fuzzy_search(self, query="", max_k=NoDefault, str_func=get_relative_path, str_display=get_relative_path, display_info=get_main_folder):
 
-        def fuzzy_function(candidate, query):
-            if len(query) == 0:
-                return candidate
-            partial_ratio = candidate.map(lambda x: (fuzz.partial_ratio(x.lower(), query.lower()), x))
-            selected = partial_ratio.filter(lambda x: x[0] > 50)
-            score = selected.map(lambda x: x[0] * min(1, len(x[1]) / len(query)) * min(1, len(query) / len(x[1])) ** 0.3, lambda x: round(x * 10) / 10).sort(lambda x: -x)
-            return score
-
-        return self.function_search(fuzzy_function, query=query, max_k=max_k, str_func=str_func, display_info=display_info, str_display=str_display)
+        return self.function_search(indexed_search_function(lambda index, query: index.partial_fuzzy(query)), query=query, max_k=max_k, str_func=str_func, display_info=display_info, str_display=str_display)
 
     def filter(self, func=None, ignore_error=True) -> "pathList":
         if func is None:
@@ -195,41 +254,55 @@ class path(str):
 
     @filepath_generator_wrapper
     @staticmethod
-    def rlistdir(folder, tofolder=False, relative=False, ext='', filter=lambda x: True):
+    def rlistdir(folder, tofolder=False, relative=False, ext='', filter=lambda x: True, workers=None):
+        """
+        recursively list files (or leaf folders, i.e. folders without sub-folder, if tofolder is True) under folder
+
+        Parameters
+        ----------
+        ext : str
+            only yield files with extension ext, '' for all
+        filter : Callable
+            only yield path p with filter(p) True
+        workers : int
+            number of threads listing sub-folders ahead of time, useful for network file systems
+        """
         folder = path(folder)
-        file_list = []
-        for f in os.listdir(str(folder)):
-            if f == '.DS_Store': continue
-            p = folder / f
-            if p.isdir():
-                file_list.extend(path.rlistdir(p, tofolder))
-                for cp in path.rlistdir(p, tofolder, relative=relative, ext=ext, filter=filter):
-                    if filter(cp) and (cp | ext):
-                        yield cp
-            if p.isfile() and not tofolder and filter(p) and (p | ext):
+        for p, is_dir, is_leaf in _scandir_walk(folder, workers=workers, include_root=True):
+            if tofolder:
+                if not is_dir or not is_leaf or ext:
+                    continue
+            elif is_dir or (ext and _name_ext(os.path.basename(p)) != ext):
+                continue
+            p = path(p)
+            if filter(p):
                 yield p
-        if tofolder and not file_list and filter(folder) and (folder | ext):
-            file_list.append(folder)
-            yield folder
-        file_list = pathList(file_list, main_folder=folder)
-        if relative: file_list = -file_list
-        if ext: file_list = file_list[file_list|ext]
-        return file_list[filter]
 
     @filepath_generator_wrapper
-    def recursive_search(self, all_files=False):
-        for f in os.listdir(self):
-            if f in get_search_blacklist():
-                continue
-            if not all_files and f.startswith("."):
-                continue
-            p = self / f
-            if p.isdir():
-                yield p
-                for cp in p.recursive_search(all_files=all_files):
-                    yield cp
-            if p.isfile():
-                yield p
+    def recursive_search(self, all_files=False, workers=None, use_index=False):
+        """
+        recursively list everything under the folder, a folder is listed right before its content
+
+        Parameters
+        ----------
+        workers : int
+            number of threads listing sub-folders ahead of time, useful for network file systems
+        use_index : bool
+            list from the persistent FileIndex of the folder (see path.file_index) instead of crawling the file system
+        """
+        main_folder = self.main_folder
+        if use_index:
+            for relative_path, _ in self.file_index().walk(all_files=all_files):
+                yield path(os.path.join(str(self), relative_path), main_folder=main_folder)
+            return
+        for p, _, _ in _scandir_walk(self, all_files=all_files, workers=workers):
+            yield path(p, main_folder=main_folder)
+
+    def file_index(self, refresh=True) -> "FileIndex":
+        """
+        get the persistent FileIndex of the folder, see FileIndex.of
+        """
+        return FileIndex.of(self, refresh=refresh)
 
     def __new__(cls, *init_texts, main_folder=""):
         if len(init_texts) <= 0 or len(init_texts[0]) <= 0:
@@ -310,12 +383,7 @@ class path(str):
     def ext(self):
         if self.isdir():
             return ""
-        file_name = self.fullname
-        parts = file_name.split(path.extsep)
-        if parts[-1].lower() in ('zip', 'gz', 'rar') and len(parts) > 2: brk = -2
-        elif len(parts) > 1: brk = -1
-        else: brk = 1
-        return path.extsep.join(parts[brk:])
+        return _name_ext(self.fullname)
 
     @registered_property
     def name(self) -> "path":
@@ -382,9 +450,9 @@ class path(str):
     def abs(self) -> "path":
         return path(os.path.abspath(self))
 
-    def listdir(self, recursive=False, all_files=False):
+    def listdir(self, recursive=False, all_files=False, use_index=False):
         if recursive:
-            ret = self.recursive_search(all_files=all_files)
+            ret = self.recursive_search(all_files=all_files, use_index=use_index)
             ret.main_folder = self
             return ret
         else:
@@ -394,8 +462,8 @@ class path(str):
                 return pathList([self / x for x in os.listdir(str(self)) if not x.startswith(".")], main_folder=self)
 
     # changed by zhangyiteng
-    def ls(self, recursive=False, all_files=False, func=None):
-        return self.listdir(recursive=recursive, all_files=all_files).filter(func)
+    def ls(self, recursive=False, all_files=False, func=None, use_index=False):
+        return self.listdir(recursive=recursive, all_files=all_files, use_index=use_index).filter(func)
 
     def assign_mainfolder(self,  main_folder):
         self.main_folder = path(main_folder)
@@ -516,7 +584,7 @@ class path(str):
             return ret
         return self
 
-    def search(self, query="", filter=None, method="fuzzy"):
+    def search(self, query="", filter=None, method="fuzzy", use_index=False):
         """
         search all files in the directory
 
@@ -526,11 +594,14 @@ class path(str):
             which kind of method to search files, it can be:
                 "fuzzy": fuzzy search which means it can tolerate minor input error.
                 "regex": search files with regex repression.
+        use_index: bool
+            search in the persistent FileIndex of the directory (see path.file_index) instead of crawling the file system,
+            repeated searches over the same directory then only check the mtimes of its folders.
         """
         if method == "fuzzy":
-            return self.ls(True).filter(filter).fuzzy_search(query)
+            return self.ls(True, use_index=use_index).filter(filter).fuzzy_search(query)
         elif method == "regex":
-            return self.ls(True).filter(filter).regex_search(query)
+            return self.ls(True, use_index=use_index).filter(filter).regex_search(query)
         else:
             raise TypeError("usage: search(['fuzzy'|'regex'])")
 
@@ -961,6 +1032,184 @@ class filepath_generator(ctgenerator):
     def regex_search(self, query="", max_k=NoDefault, str_func=get_relative_path, str_display=get_relative_path, display_info=get_main_folder):
         return self.vector().regex_search(query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info)
 
+class FileIndex:
+    """
+    persistent index of the file tree under a root folder, stored in FileIndex.cache_folder and keyed by the absolute root.
+
+    for every folder (relative to root) it keeps the mtime of the folder and its entries in listing order as
+    (name, is_dir, size, mtime_ns), size and mtime_ns are 0 for folders.
+    refresh() only re-lists folders whose mtime changed, unchanged folders cost a single stat.
+    note that the mtime of a folder changes when entries are added, removed or renamed, not when a file is rewritten in place,
+    so sizes and mtimes of files are updated when their folder changes or by refresh(full=True).
+
+    Example
+    ----------
+    index = path("dataset").file_index()
+    index.files()
+    index.stat("train/0001.png")
+    path("dataset").search("0001", use_index=True)
+    """
+
+    cache_folder = os.path.join(os.path.expanduser("~"), ".cache", "zytlib", "file_index")
+    _instances = dict()
+
+    def __init__(self, root, cache_file=None):
+        self.root = os.path.abspath(str(root))
+        if cache_file is None:
+            cache_file = os.path.join(FileIndex.cache_folder, hashlib.sha1(self.root.encode("utf-8")).hexdigest() + ".pkl")
+        self.cache_file = cache_file
+        self.directories = dict()
+        self.blacklist = sorted(get_search_blacklist())
+        self.__stat = None
+
+    @staticmethod
+    def of(root, refresh=True) -> "FileIndex":
+        """
+        the FileIndex of root shared in the current process, loaded from the cache file at the first call
+
+        Parameters
+        ----------
+        refresh : bool
+            whether to bring the index up to date (and save it if anything changed)
+        """
+        root = os.path.abspath(str(root))
+        if not os.path.isdir(root):
+            raise NotADirectoryError("{} isn't a directory".format(root))
+        index = FileIndex._instances.get(root, None)
+        if index is None:
+            index = FileIndex(root)
+            index.load()
+            FileIndex._instances[root] = index
+        if refresh and index.refresh():
+            index.save()
+        return index
+
+    def load(self) -> bool:
+        """
+        load the cache file, return whether it is loaded
+        """
+        try:
+            with open(self.cache_file, "rb") as input:
+                content = pickle.load(input)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return False
+        if content.get("root", None) != self.root:
+            return False
+        self.directories = content["directories"]
+        self.blacklist = content["blacklist"]
+        self.__stat = None
+        return True
+
+    def save(self) -> None:
+        os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
+        temp_file = "{}.{}.tmp".format(self.cache_file, os.getpid())
+        with open(temp_file, "wb") as output:
+            pickle.dump({"root": self.root, "blacklist": self.blacklist, "directories": self.directories}, output, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.cache_file)
+
+    @staticmethod
+    def _scan(folder, blacklist):
+        entries = list()
+        with os.scandir(folder) as iterator:
+            for entry in iterator:
+                if entry.name in blacklist:
+                    continue
+                try:
+                    if entry.is_dir():
+                        entries.append((entry.name, True, 0, 0))
+                    elif entry.is_file():
+                        stat = entry.stat()
+                        entries.append((entry.name, False, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+        return entries
+
+    def refresh(self, full=False) -> bool:
+        """
+        bring the index up to date, return whether anything changed
+
+        Parameters
+        ----------
+        full : bool
+            re-list every folder regardless of its mtime
+        """
+        blacklist = sorted(get_search_blacklist())
+        if blacklist != self.blacklist:
+            full = True
+        cached = dict() if full else self.directories
+        directories = dict()
+        changed = full
+        stack = [""]
+        while len(stack) > 0:
+            relative_folder = stack.pop()
+            folder = os.path.join(self.root, relative_folder)
+            try:
+                mtime = os.stat(folder).st_mtime_ns
+                if relative_folder in cached and cached[relative_folder][0] == mtime:
+                    entries = cached[relative_folder][1]
+                else:
+                    entries = FileIndex._scan(folder, set(blacklist))
+                    changed = True
+            except (FileNotFoundError, NotADirectoryError):
+                changed = True
+                continue
+            directories[relative_folder] = (mtime, entries)
+            stack.extend(os.path.join(relative_folder, name) for name, is_dir, _, _ in reversed(entries) if is_dir)
+        if len(directories) != len(self.directories):
+            changed = True
+        self.directories = directories
+        self.blacklist = blacklist
+        if changed:
+            self.__stat = None
+        return changed
+
+    def walk(self, all_files=False):
+        """
+        yield (relative_path, is_dir) of everything under root in the same order as path.recursive_search,
+        hidden entries are skipped unless all_files is True
+        """
+        directories = self.directories
+        blacklist = set(self.blacklist)
+        stack = [iter(directories.get("", (0, []))[1])]
+        prefixes = [""]
+        while len(stack) > 0:
+            item = next(stack[-1], None)
+            if item is None:
+                stack.pop()
+                prefixes.pop()
+                continue
+            name, is_dir = item[0], item[1]
+            if name in blacklist or (not all_files and name.startswith(".")):
+                continue
+            relative_path = os.path.join(prefixes[-1], name)
+            yield relative_path, is_dir
+            if is_dir:
+                stack.append(iter(directories.get(relative_path, (0, []))[1]))
+                prefixes.append(relative_path)
+
+    def files(self, all_files=False) -> list:
+        """
+        relative paths of all files under root
+        """
+        return [relative_path for relative_path, is_dir in self.walk(all_files=all_files) if not is_dir]
+
+    def stat(self, relative_path):
+        """
+        (size, mtime_ns) of the file at relative_path recorded in the index, None if it isn't indexed
+        """
+        if self.__stat is None:
+            self.__stat = {os.path.join(relative_folder, name): (size, mtime) for relative_folder, (_, entries) in self.directories.items() for name, is_dir, size, mtime in entries if not is_dir}
+        return self.__stat.get(os.path.normpath(relative_path), None)
+
+    def __len__(self):
+        return sum(len(entries) for _, entries in self.directories.values())
+
+    def __str__(self):
+        return "FileIndex({}, {} folders, {} entries)".format(self.root, len(self.directories), len(self))
+
+    def __repr__(self):
+        return self.__str__()
+
 rootdir = path(os.path.curdir).abs()[0] + path.sep
 curdir = path(os.path.curdir)
 pardir = path(os.path.pardir)
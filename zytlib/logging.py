@@ -6,12 +6,12 @@ import time
 from datetime import timedelta, datetime
 import atexit
 import sys
-from functools import wraps
+from functools import wraps, partial
 from typing import Callable, Dict, Union, overload
 import random
 import string
 import argparse
-from .wrapper import timeout, TimeoutException
+from .wrapper import TimeoutException
 import re
 from matplotlib import pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
@@ -22,13 +22,21 @@ from notion.client import NotionClient
 import mimetypes
 import requests
 import random
+import threading
+import queue
+import weakref
+import traceback
+import json
+import numbers
+import numpy as np
 from .table import table
+from .parallel import default_workers
 """
 from zytlib import vector, touch
 from zytlib.basicwrapper import timeout, TimeoutException
 """
 
-__all__ = ["DEBUG", "INFO", "WARNING", "CRITICAL", "ERROR", "NOTSET", "Logger", "TimeoutException", "upload_file_to_row_property"]
+__all__ = ["DEBUG", "INFO", "WARNING", "CRITICAL", "ERROR", "NOTSET", "Logger", "TimeoutException", "upload_file_to_row_property", "NotionPageClient", "MockNotionClient", "NotionSyncWorker", "MetricsSidecar", "LogFileParser", "AsyncFileHandler"]
 
 DEBUG = logging.DEBUG
 INFO = logging.INFO
@@ -60,6 +68,121 @@ UnDefined = EmptyClass("Not Defined")
 def empty_func(*args, **kwargs):
     return
 
+class AsyncFileHandler(logging.Handler):
+    """
+    file handler whose records are written by a background thread, so the logging thread never waits for the file system.
+
+    records are formatted in the logging thread and pushed to a bounded queue, the writer thread takes them in batches
+    (at most batch_size lines per write) and flushes the file after each batch.
+    all handlers are closed, thus drained, at exit after the loggers record their elapsed time.
+
+    Parameters
+    ----------
+    filename : str
+    mode : str
+    max_queue : int
+        maximal number of records waiting to be written
+    policy : str
+        what to do when the queue is full
+        "block": wait until the writer thread frees a slot
+        "drop": discard the record, the number of discarded records is in self.dropped and written to the file at close
+    batch_size : int
+    fsync : bool
+        call os.fsync after each batch
+    """
+
+    terminator = "\n"
+
+    def __init__(self, filename, mode="a", encoding=None, max_queue=10000, policy="block", batch_size=256, fsync=False):
+        if policy not in ("block", "drop"):
+            raise ValueError("policy should be 'block' or 'drop', but got {}".format(policy))
+        super().__init__()
+        self.baseFilename = os.path.abspath(str(filename))
+        self.encoding = encoding
+        self.stream = open(self.baseFilename, mode, encoding=encoding)
+        self.policy = policy
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.dropped = 0
+        self.__queue = queue.Queue(maxsize=max_queue)
+        self.__closed = False
+        self.__thread = threading.Thread(target=self.__run, name="zytlib-log-writer", daemon=True)
+        self.__thread.start()
+        _async_file_handlers.add(self)
+
+    def emit(self, record):
+        try:
+            line = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
+        if self.__closed:
+            with open(self.baseFilename, "a", encoding=self.encoding) as stream:
+                stream.write(line)
+        elif self.policy == "block":
+            self.__queue.put(line)
+        else:
+            try:
+                self.__queue.put_nowait(line)
+            except queue.Full:
+                self.dropped += 1
+
+    def __write(self, lines):
+        try:
+            self.stream.write("".join(lines))
+            self.stream.flush()
+            if self.fsync:
+                os.fsync(self.stream.fileno())
+        except Exception:
+            if logging.raiseExceptions:
+                sys.stderr.write("--- Logging error in AsyncFileHandler of {} ---\n".format(self.baseFilename))
+                traceback.print_exc(file=sys.stderr)
+
+    def __run(self):
+        while True:
+            batch = [self.__queue.get()]
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                try:
+                    batch.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = batch[-1] is None
+            self.__write(batch[:-1] if stop else batch)
+            for _ in batch:
+                self.__queue.task_done()
+            if stop:
+                return
+
+    def flush(self):
+        """
+        wait until all queued records are written
+        """
+        if not self.__closed:
+            self.__queue.join()
+
+    def close(self):
+        self.acquire()
+        try:
+            if self.__closed:
+                return
+            self.__closed = True
+            self.__queue.put(None)
+        finally:
+            self.release()
+        self.__thread.join()
+        if self.dropped > 0:
+            self.__write(["AsyncFileHandler: dropped {} records since the queue was full".format(self.dropped) + self.terminator])
+        self.stream.close()
+        super().close()
+
+_async_file_handlers = weakref.WeakSet()
+
+def _close_async_file_handlers():
+    for handler in list(_async_file_handlers):
+        handler.close()
+
+atexit.register(_close_async_file_handlers)
+
 class ElapsedFormatter():
 
     def __init__(self):
@@ -78,17 +201,15 @@ class ColoredFormatter:
         self.deltatime = deltatime
         self.start_time = time.time()
 
+    color_regex = re.compile(r"\(%({}|RESET)\)".format("|".join(color_dict.keys())))
+
     @staticmethod
     def formatter_message(message: str, use_color: bool=True):
+        if "(%" not in message:
+            return message
         if use_color:
-            for color, seq in color_dict.items():
-                message = message.replace("(%{})".format(color), seq)
-            message = message.replace("(%RESET)", "\033[0m")
-        else:
-            for color, seq in color_dict.items():
-                message = message.replace("(%{})".format(color), "")
-            message = message.replace("(%RESET)", "")
-        return message
+            return ColoredFormatter.color_regex.sub(lambda m: color_dict.get(m.group(1), "\033[0m"), message)
+        return ColoredFormatter.color_regex.sub("", message)
 
     def format(self, record):
         if self.deltatime:
@@ -117,9 +238,521 @@ def upload_file_to_row_property(client, row, path, property_name):
     op2 = build_operation(id=row.id, path=["file_ids"], args={"id": file_id}, table="block", command="listAfter")
     client.submit_transaction([op1, op2])
 
+class NotionPageClient:
+    """
+    client of one notion page used by NotionSyncWorker, the connection is made at the first call
+    """
+
+    def __init__(self, page_link, token_v2=None):
+        self.page_link = page_link
+        self.token_v2 = token_v2 if token_v2 is not None else os.environ["NOTION_TOKEN_V2"]
+        self.client = None
+        self.page = None
+
+    def connect(self):
+        if self.page is None:
+            self.client = NotionClient(token_v2=self.token_v2)
+            self.page = self.client.get_block(self.page_link)
+
+    def set_properties(self, properties: dict):
+        """
+        set all properties in a single notion transaction
+        """
+        self.connect()
+        with self.client.as_atomic_transaction():
+            for property_name, variable in properties.items():
+                self.page.set_property(property_name, variable)
+
+    def upload_file(self, property_name, file_path):
+        self.connect()
+        upload_file_to_row_property(self.client, self.page, file_path, property_name)
+
+class MockNotionClient:
+    """
+    local stand-in of NotionPageClient for tests, it records properties and uploaded files in memory
+
+    Parameters
+    ----------
+    fail_times : int
+        number of calls that raise ConnectionError before the client starts to succeed
+    latency : float
+        seconds each call takes
+    """
+
+    def __init__(self, fail_times=0, latency=0):
+        self.properties = dict()
+        self.files = dict()
+        self.calls = list()
+        self.fail_times = fail_times
+        self.latency = latency
+
+    def __call(self, name, content):
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls.append((name, content))
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise ConnectionError("mock notion failure")
+
+    def set_properties(self, properties: dict):
+        self.__call("set_properties", dict(properties))
+        self.properties.update(properties)
+
+    def upload_file(self, property_name, file_path):
+        self.__call("upload_file", (property_name, file_path))
+        self.files[property_name] = file_path
+
+class NotionSyncWorker:
+    """
+    background thread uploading notion properties and files for Logger.
+
+    submit() only records the value in the buffer and returns, only the latest value of each property is kept.
+    the thread waits batch_interval seconds after the first pending update to coalesce the following ones (flush and close end the wait),
+    then sends all pending properties in one call to client.set_properties
+    and uploads pending files one by one. Failed items go back to the buffer (unless a newer value arrives meanwhile) and are retried
+    after an exponential backoff: base_backoff * 2 ** failures seconds, bounded by max_backoff.
+
+    Parameters
+    ----------
+    client_factory : Callable
+        return the client (NotionPageClient / MockNotionClient), called in the background thread at the first upload
+    buffer, file_buffer : dict
+        property buffers to drain, new dicts are created if None
+    """
+
+    def __init__(self, client_factory, buffer=None, file_buffer=None, logger=None, batch_interval=1., base_backoff=1., max_backoff=60.):
+        self.client_factory = client_factory
+        self.buffer = buffer if buffer is not None else dict()
+        self.file_buffer = file_buffer if file_buffer is not None else dict()
+        self.logger = logger
+        self.batch_interval = batch_interval
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        self.client = None
+        self.__condition = threading.Condition()
+        self.__thread = None
+        self.__in_flight = False
+        self.__closing = False
+        self.__flush_requested = False
+
+    def submit(self, property_name, variable, isfile=False) -> None:
+        with self.__condition:
+            idle = not self.pending
+            if isfile:
+                self.file_buffer[property_name] = variable
+            else:
+                self.buffer[property_name] = variable
+            if self.__thread is None or not self.__thread.is_alive():
+                self.__closing = False
+                self.__thread = threading.Thread(target=self.__run, name="zytlib-notion-sync", daemon=True)
+                self.__thread.start()
+            elif idle:
+                self.__condition.notify_all()
+
+    @property
+    def pending(self) -> bool:
+        return self.__in_flight or len(self.buffer) > 0 or len(self.file_buffer) > 0
+
+    def flush(self, timeout=None) -> bool:
+        """
+        wake the thread and wait until every buffered item is uploaded, return whether the buffers are empty
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self.__condition:
+            self.__flush_requested = True
+            self.__condition.notify_all()
+            while self.pending and self.__thread is not None and self.__thread.is_alive():
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    break
+                self.__condition.wait(remaining)
+            self.__flush_requested = False
+            return not self.pending
+
+    def close(self, timeout=None) -> bool:
+        """
+        drain the buffers (at most timeout seconds) and stop the thread, return whether the buffers are empty
+        """
+        with self.__condition:
+            self.__closing = True
+        ret = self.flush(timeout=timeout)
+        with self.__condition:
+            self.__condition.notify_all()
+        return ret
+
+    def __log(self, method, *msgs):
+        if self.logger is not None:
+            getattr(self.logger, method)(*msgs)
+
+    def __upload(self, properties, files):
+        failed_properties, failed_files = dict(), dict()
+        try:
+            if self.client is None:
+                self.client = self.client_factory()
+            if properties:
+                self.client.set_properties(properties)
+                self.__log("info", "update notion properties: {}".format(properties))
+        except Exception as e:
+            self.__log("warning", "update notion properties {} failed: {}".format(properties, repr(e)))
+            failed_properties = properties
+        for property_name, file_path in files.items():
+            try:
+                if self.client is None:
+                    self.client = self.client_factory()
+                self.client.upload_file(property_name, file_path)
+                self.__log("info", "upload file {} to notion property {}".format(file_path, property_name))
+            except Exception as e:
+                self.__log("warning", "upload file {} to notion property {} failed: {}".format(file_path, property_name, repr(e)))
+                failed_files[property_name] = file_path
+        return failed_properties, failed_files
+
+    def __run(self):
+        with self.__condition:
+            while True:
+                while not self.pending and not self.__closing:
+                    self.__condition.wait()
+                if not self.pending:
+                    return
+                deadline = time.monotonic() + self.batch_interval
+                while not self.__closing and not self.__flush_requested:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+                self.__flush_requested = False
+                properties, files = dict(self.buffer), dict(self.file_buffer)
+                self.buffer.clear()
+                self.file_buffer.clear()
+                self.__in_flight = True
+                self.__condition.release()
+                try:
+                    failed_properties, failed_files = self.__upload(properties, files)
+                finally:
+                    self.__condition.acquire()
+                    self.__in_flight = False
+                for property_name, variable in failed_properties.items():
+                    self.buffer.setdefault(property_name, variable)
+                for property_name, variable in failed_files.items():
+                    self.file_buffer.setdefault(property_name, variable)
+                self.__condition.notify_all()
+                if failed_properties or failed_files:
+                    backoff = min(self.max_backoff, self.base_backoff * 2 ** self.failures)
+                    self.failures += 1
+                    self.__condition.wait(backoff * (0.5 + random.random() / 2))
+                else:
+                    self.failures = 0
+
+class MetricsSidecar:
+    """
+    structured sidecar of a logging file recording every Logger.variable / Logger.hyper call, so that metrics can be reloaded without parsing the text log.
+
+    it consists of two append-only files next to the logging file "x.log":
+        x.metrics.bin: fixed size records (name id: int32, step: int64, value: float64) of scalar variables, read back at once by numpy
+        x.metrics.jsonl: one json object per line, defining name ids ({"id", "name"}) and holding hypers ({"hyper", "value"})
+            and non-scalar variables ({"name", "step", "value"})
+    step is the number of previous records of the same variable.
+    """
+
+    record_dtype = np.dtype([("name", "<i4"), ("step", "<i8"), ("value", "<f8")])
+
+    def __init__(self, log_path):
+        self.bin_path, self.jsonl_path = MetricsSidecar.paths(log_path)
+        self.__bin = open(self.bin_path, "wb")
+        self.__jsonl = open(self.jsonl_path, "w")
+        self.__names = dict()
+        self.__steps = dict()
+        self.__lock = threading.Lock()
+
+    @staticmethod
+    def paths(log_path):
+        log_path = str(log_path)
+        if log_path.endswith(".log"):
+            log_path = log_path[:-4]
+        return log_path + ".metrics.bin", log_path + ".metrics.jsonl"
+
+    @staticmethod
+    def exists(log_path) -> bool:
+        return all(os.path.isfile(x) for x in MetricsSidecar.paths(log_path))
+
+    @staticmethod
+    def _plain(variable):
+        """
+        convert variable to float / list / json value, numpy arrays and tensors are converted by tolist
+        """
+        if isinstance(variable, numbers.Real) and not isinstance(variable, bool):
+            return float(variable)
+        if hasattr(variable, "tolist"):
+            variable = variable.tolist()
+            if isinstance(variable, numbers.Real) and not isinstance(variable, bool):
+                return float(variable)
+        if isinstance(variable, (list, tuple)):
+            return [MetricsSidecar._plain(x) for x in variable]
+        if variable is None or isinstance(variable, (bool, str, dict)):
+            return variable
+        return str(variable)
+
+    def __write_json(self, content):
+        self.__jsonl.write(json.dumps(content) + "\n")
+
+    def variable(self, variable_name, variable):
+        variable = MetricsSidecar._plain(variable)
+        with self.__lock:
+            step = self.__steps.get(variable_name, 0)
+            self.__steps[variable_name] = step + 1
+            if isinstance(variable, float):
+                name_id = self.__names.get(variable_name, None)
+                if name_id is None:
+                    name_id = self.__names[variable_name] = len(self.__names)
+                    self.__write_json({"id": name_id, "name": variable_name})
+                    self.__jsonl.flush()
+                self.__bin.write(np.array((name_id, step, variable), dtype=MetricsSidecar.record_dtype).tobytes())
+            else:
+                self.__write_json({"name": variable_name, "step": step, "value": variable})
+
+    def hyper(self, name, value):
+        with self.__lock:
+            self.__write_json({"hyper": name, "value": MetricsSidecar._plain(value)})
+            self.__jsonl.flush()
+
+    def flush(self):
+        with self.__lock:
+            self.__bin.flush()
+            self.__jsonl.flush()
+
+    def close(self):
+        with self.__lock:
+            self.__bin.close()
+            self.__jsonl.close()
+
+    @staticmethod
+    def _read_jsonl(jsonl_path):
+        with open(jsonl_path, "r") as finput:
+            for line in finput:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
+
+    @staticmethod
+    def load_hyper(log_path) -> table:
+        hyper = table()
+        for content in MetricsSidecar._read_jsonl(MetricsSidecar.paths(log_path)[1]):
+            if "hyper" in content:
+                value = content["value"]
+                if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                    value = float(value)
+                elif isinstance(value, list) and all(isinstance(x, numbers.Real) for x in value):
+                    value = vector(value).map(float)
+                else:
+                    value = str(value)
+                hyper[content["hyper"]] = value
+        return hyper
+
+    @staticmethod
+    def load_variable(log_path, names=None) -> Dict[str, Union[np.ndarray, list]]:
+        """
+        read the sidecar of log_path, return {variable_name: (steps, values)} in logging order
+
+        Parameters
+        ----------
+        names : list
+            only read variables whose name, or group name for name like "group[name]", is in names
+        """
+        bin_path, jsonl_path = MetricsSidecar.paths(log_path)
+        selected = None if names is None else set(names)
+        def is_selected(variable_name):
+            if selected is None or variable_name in selected:
+                return True
+            m = re.match(r"([^\[\]]+)\[([^\[\]]+)\]", variable_name)
+            return m is not None and m.group(1) in selected
+        id_names = dict()
+        others = dict()
+        # the first json line of a variable (its id or its first non-scalar value) follows the logging order
+        first_seen = dict()
+        for content in MetricsSidecar._read_jsonl(jsonl_path):
+            if "name" in content:
+                first_seen.setdefault(content["name"], len(first_seen))
+            if "id" in content:
+                id_names[content["id"]] = content["name"]
+            elif "step" in content and is_selected(content["name"]):
+                others.setdefault(content["name"], list()).append((content["step"], content["value"]))
+        with open(bin_path, "rb") as finput:
+            raw = finput.read()
+        itemsize = MetricsSidecar.record_dtype.itemsize
+        records = np.frombuffer(raw[:len(raw) // itemsize * itemsize], dtype=MetricsSidecar.record_dtype)
+        ret = dict()
+        name_ids = np.array([name_id for name_id, variable_name in id_names.items() if is_selected(variable_name)], dtype=np.int32)
+        records = records[np.isin(records["name"], name_ids)]
+        order = np.argsort(records["name"], kind="stable")
+        records = records[order]
+        boundaries = np.flatnonzero(np.diff(records["name"])) + 1
+        for chunk in np.split(records, boundaries):
+            if len(chunk) > 0:
+                ret[id_names[int(chunk["name"][0])]] = (chunk["step"], chunk["value"])
+        for variable_name, items in others.items():
+            if variable_name in ret:
+                steps, values = ret[variable_name]
+                merged = sorted(list(zip(steps.tolist(), values.tolist())) + items, key=lambda x: x[0])
+                ret[variable_name] = (np.array([x[0] for x in merged], dtype=np.int64), [x[1] for x in merged])
+            else:
+                ret[variable_name] = (np.array([x[0] for x in items], dtype=np.int64), [x[1] for x in items])
+        return {variable_name: ret[variable_name] for variable_name in first_seen if variable_name in ret}
+
+_call_site_cache = dict()
+
+def _call_site(frame) -> str:
+    """
+    "filename[line:lineno] - " of frame, cached by code object and line number
+    """
+    key = (frame.f_code, frame.f_lineno)
+    ret = _call_site_cache.get(key, None)
+    if ret is None:
+        ret = "{}[line:{}] - ".format(frame.f_code.co_filename, frame.f_lineno)
+        _call_site_cache[key] = ret
+    return ret
+
+class LazyMessage:
+    """
+    message of a log record, it is formatted at the first time a handler calls str on it,
+    so nothing is formatted for records filtered out by the handlers
+
+    location + template.format(*args), or location + template.format(sep.join(str(x) for x in args)) if sep is given
+    """
+
+    __slots__ = ("location", "template", "args", "sep", "message")
+
+    def __init__(self, location, template, args, sep=None):
+        self.location = location
+        self.template = template
+        self.args = args
+        self.sep = sep
+        self.message = None
+
+    def __str__(self):
+        if self.message is None:
+            if self.sep is None:
+                self.message = self.location + self.template.format(*self.args)
+            else:
+                self.message = self.location + self.template.format(self.sep.join(str(x) for x in self.args))
+        return self.message
+
+class LogFileParser:
+    """
+    single pass parser of a logging file written by Logger, it collects
+        hyper: table of HYPER<name>: value lines
+        parser: table(specified=..., default=...) of the argument parser block
+        variable: variable_dict of VARIABLE<name>: value lines
+
+    Example
+    ----------
+    content = LogFileParser(names=["loss"]).parse("run.log")
+    content.hyper, content.parser, content.variable
+    """
+
+    variable_regex = re.compile(r"([^\[\]]+)\[([^\[\]]+)\]")
+
+    def __init__(self, hyper=True, parser=True, variable=True, names=None):
+        self.collect_hyper = hyper
+        self.collect_parser = parser
+        self.collect_variable = variable
+        self.names = None if names is None else set(names)
+        self.hyper = table()
+        self.parser = table(specified=table(), default=table())
+        self.variable = dict()
+        self.__parser_state = "start"
+        self.__parser_width = 0
+
+    @staticmethod
+    def parse_value(variable_str):
+        """
+        number, vector of numbers for "[...]", otherwise the string itself
+        """
+        if variable_str[0].isdigit() or variable_str[0] == "-":
+            return float(variable_str)
+        elif variable_str[0] == "[" and variable_str[-1] == "]":
+            return vector([float(x) for x in variable_str[1:-1].replace(",", " ").split(" ") if x])
+        return variable_str
+
+    def parse(self, f_name) -> "LogFileParser":
+        with open(f_name, "r") as finput:
+            for line in finput:
+                self.feed(line)
+        return self
+
+    def feed(self, line: str) -> None:
+        if self.collect_parser and (self.__parser_state != "start" or line.rstrip().endswith("Argument Parser:")):
+            self.__feed_parser(line.strip())
+        elif self.collect_variable and "VARIABLE<" in line:
+            self.__feed_variable(line)
+        elif self.collect_hyper and "HYPER<" in line:
+            self.__feed_hyper(line)
+
+    def __feed_hyper(self, line):
+        match = re.search(r"HYPER<(.+)>: (.+)", line.rstrip())
+        if match:
+            variable_name = match.group(1)
+            variable_str = match.group(2)
+            if not variable_name or not variable_str:
+                return
+            self.hyper[variable_name] = LogFileParser.parse_value(variable_str)
+
+    def __feed_variable(self, line):
+        match = re.search(r"VARIABLE<(.+)>: (.+)", line.rstrip())
+        if match:
+            variable_name = match.group(1)
+            variable_str = match.group(2)
+            if not variable_name or not variable_str:
+                return
+            if self.names is not None and variable_name not in self.names and variable_name.partition("[")[0] not in self.names:
+                return
+            variable = LogFileParser.parse_value(variable_str)
+            if isinstance(variable, str):
+                print("unknown variable", variable_str)
+                return
+            m = LogFileParser.variable_regex.match(variable_name)
+            if not m:
+                Logger._update_variable_dict(self.variable, variable_name, variable)
+            else:
+                group_name = m.group(1)
+                variable_name = m.group(2)
+                if group_name not in self.variable:
+                    self.variable[group_name] = dict()
+                Logger._update_variable_dict(self.variable[group_name], variable_name, variable)
+
+    def __feed_parser(self, line):
+        content = self.__parser_state
+        width = self.__parser_width
+        if content == "start" and line.endswith("Argument Parser:"):
+            content = "start@1"
+            width = len(line) - len("Argument Parser:")
+        elif content == "start@1":
+            content = "start@2"
+        elif content == "start@2":
+            assert line.endswith("> Specified Vars:")
+            content = "specified"
+        elif content == "specified":
+            line = line[width:]
+            if line.startswith(">"):
+                content = "default"
+            else:
+                assert line.startswith(" " * 4)
+                item, _, value = line.strip().partition("=")
+                self.parser.specified[item] = value
+        elif content == "default":
+            line = line[width:]
+            if line.startswith("-" * 30):
+                content = "start"
+            else:
+                assert line.startswith(" " * 4)
+                item, _, value = line.strip().partition("=")
+                self.parser.default[item] = value
+        self.__parser_state = content
+        self.__parser_width = width
+
 class Logger:
 
-    def __init__(self, stream_log_level=logging.DEBUG, file_log_level=None, deltatime: bool=False, name: str="logger", c_format=None, file_path=None, file_name=None, f_format=None, disable=False, autoplot_variable=False, notion_page_link=None, overwrite=True):
+    def __init__(self, stream_log_level=logging.DEBUG, file_log_level=None, deltatime: bool=False, name: str="logger", c_format=None, file_path=None, file_name=None, f_format=None, disable=False, autoplot_variable=False, notion_page_link=None, overwrite=True, notion_client=None, async_file=False, async_queue_size=10000, async_policy="block", notion_batch_interval=1., notion_backoff=1.):
         self.name = name
         if stream_log_level is True:
             self.stream_log_level = logging.DEBUG
@@ -145,6 +778,11 @@ class Logger:
         self.overwrite = True
         self.__update_notion_buffer = dict()
         self.__update_notion_file_buffer = dict()
+        self.notion_client = notion_client
+        self.async_file = async_file
+        self.async_queue_size = async_queue_size
+        self.async_policy = async_policy
+        self.__notion_worker = NotionSyncWorker(self.__get_notion_client, buffer=self.__update_notion_buffer, file_buffer=self.__update_notion_file_buffer, logger=self, batch_interval=notion_batch_interval, base_backoff=notion_backoff)
         atexit.register(self.record_elapsed)
 
     @property
@@ -259,11 +897,27 @@ class Logger:
         if self.file_log_level is None:
             self._f_handler = None
             return None
-        self._f_handler = logging.FileHandler(self.get_f_fullpath(), "w")
+        if self.async_file:
+            self._f_handler = AsyncFileHandler(self.get_f_fullpath(), "w", max_queue=self.async_queue_size, policy=self.async_policy)
+        else:
+            self._f_handler = logging.FileHandler(self.get_f_fullpath(), "w")
         self._f_handler.setLevel(self.file_log_level)
         self._f_handler.setFormatter(self.f_format)
         return self._f_handler
 
+    @property
+    def metrics_sidecar(self) -> Union[MetricsSidecar, None]:
+        """
+        MetricsSidecar of the logging file, None if the logger doesn't write a logging file
+        """
+        if touch(lambda: self._metrics_sidecar, UnDefined) is not UnDefined:
+            return self._metrics_sidecar
+        if self.f_handler is None:
+            self._metrics_sidecar = None
+        else:
+            self._metrics_sidecar = MetricsSidecar(self.get_f_fullpath())
+        return self._metrics_sidecar
+
     @property
     def c_format(self):
         if touch(lambda: self._c_format, None) is not None:
@@ -379,106 +1033,58 @@ class Logger:
         if logging_level == CRITICAL:
             return self.logger.critical
 
-    def debug(self, *msgs, sep=" ", loc_bias=0):
+    def isEnabledFor(self, level) -> bool:
+        """
+        whether a message of level would be emitted by any handler, checked before any message is formatted
+        """
         if self.disabled:
-            return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-            while loc_bias > 0:
-                f = f.f_back
-                loc_bias -= 1
+            return False
+        logger = self.logger
+        if not logger.isEnabledFor(level):
+            return False
+        for handler in logger.handlers:
+            if level >= handler.level:
+                return True
+        return False
+
+    def _log(self, level, label, msgs, sep, frame, exc_info=False):
+        location = _call_site(frame)
         if sep == "\n":
             for msg in msgs:
-                self.logger.debug("{}[line:{}] - DEBUG: {}".format(f.f_code.co_filename, f.f_lineno, msg))
+                self.logger.log(level, LazyMessage(location, label + "{}", (msg,)), exc_info=exc_info)
         else:
-            self.logger.debug("{}[line:{}] - DEBUG: {}".format(f.f_code.co_filename, f.f_lineno, sep.join(str(x) for x in msgs)))
+            self.logger.log(level, LazyMessage(location, label + "{}", msgs, sep=sep), exc_info=exc_info)
+
+    def debug(self, *msgs, sep=" ", loc_bias=0):
+        if self.isEnabledFor(DEBUG):
+            self._log(DEBUG, "DEBUG: ", msgs, sep, sys._getframe(1 + loc_bias))
 
     def info(self, *msgs, sep=" ", loc_bias=0):
-        if self.disabled:
+        if not self.isEnabledFor(INFO):
             return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-            while loc_bias > 0:
-                f = f.f_back
-                loc_bias -= 1
-        if sep == "\n":
-            if len(msgs) == 1 and isinstance(msgs[0], dict):
-                d: dict = msgs[0]
-                for key, value in d.items():
-                    self.logger.info("{}[line:{}] - (%WHITE)INFO(%RESET): {}: {}".format(f.f_code.co_filename, f.f_lineno, key, value))
-            else:
-                for msg in msgs:
-                    self.logger.info("{}[line:{}] - (%WHITE)INFO(%RESET): {}".format(f.f_code.co_filename, f.f_lineno, msg))
+        f = sys._getframe(1 + loc_bias)
+        if sep == "\n" and len(msgs) == 1 and isinstance(msgs[0], dict):
+            location = _call_site(f)
+            for key, value in msgs[0].items():
+                self.logger.info(LazyMessage(location, "(%WHITE)INFO(%RESET): {}: {}", (key, value)))
         else:
-            self.logger.info("{}[line:{}] - (%WHITE)INFO(%RESET): {}".format(f.f_code.co_filename, f.f_lineno, sep.join(str(x) for x in msgs)))
+            self._log(INFO, "(%WHITE)INFO(%RESET): ", msgs, sep, f)
 
     def warning(self, *msgs, sep=" ", loc_bias=0):
-        if self.disabled:
-            return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-            while loc_bias > 0:
-                f = f.f_back
-                loc_bias -= 1
-        if sep == "\n":
-            for msg in msgs:
-                self.logger.warning("{}[line:{}] - (%YELLOW)WARNING(%RESET): {}".format(f.f_code.co_filename, f.f_lineno, msg))
-        else:
-            self.logger.warning("{}[line:{}] - (%YELLOW)WARNING(%RESET): {}".format(f.f_code.co_filename, f.f_lineno, sep.join(str(x) for x in msgs)))
+        if self.isEnabledFor(WARNING):
+            self._log(WARNING, "(%YELLOW)WARNING(%RESET): ", msgs, sep, sys._getframe(1 + loc_bias))
 
     def critical(self, *msgs, sep=" ", loc_bias=0):
-        if self.disabled:
-            return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-            while loc_bias > 0:
-                f = f.f_back
-                loc_bias -= 1
-        if sep == "\n":
-            for msg in msgs:
-                self.logger.critical("{}[line:{}] - CRITICAL: {}".format(f.f_code.co_filename, f.f_lineno, msg))
-        else:
-            self.logger.critical("{}[line:{}] - CRITICAL: {}".format(f.f_code.co_filename, f.f_lineno, sep.join(str(x) for x in msgs)))
+        if self.isEnabledFor(CRITICAL):
+            self._log(CRITICAL, "CRITICAL: ", msgs, sep, sys._getframe(1 + loc_bias))
 
     def error(self, *msgs, sep=" ", loc_bias=0):
-        if self.disabled:
-            return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-            while loc_bias > 0:
-                f = f.f_back
-                loc_bias -= 1
-        if sep == "\n":
-            for msg in msgs:
-                self.logger.error("{}[line:{}] - ERROR: {}".format(f.f_code.co_filename, f.f_lineno, msg))
-        else:
-            self.logger.error("{}[line:{}] - ERROR: {}".format(f.f_code.co_filename, f.f_lineno, sep.join(str(x) for x in msgs)))
+        if self.isEnabledFor(ERROR):
+            self._log(ERROR, "ERROR: ", msgs, sep, sys._getframe(1 + loc_bias))
 
     def exception(self, *msgs, sep=" ", loc_bias=0):
-        if self.disabled:
-            return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-            while loc_bias > 0:
-                f = f.f_back
-                loc_bias -= 1
-        if sep == "\n":
-            for msg in msgs:
-                self.logger.exception("{}[line:{}] - (%RED)EXCEPTION(%RESET): {}".format(f.f_code.co_filename, f.f_lineno, msg))
-        else:
-            self.logger.exception("{}[line:{}] - (%RED)EXCEPTION(%RESET): {}".format(f.f_code.co_filename, f.f_lineno, sep.join(str(x) for x in msgs)))
+        if self.isEnabledFor(ERROR):
+            self._log(ERROR, "(%RED)EXCEPTION(%RESET): ", msgs, sep, sys._getframe(1 + loc_bias), exc_info=True)
 
     @staticmethod
     def _update_variable_dict(variable_dict, variable_name, variable):
@@ -496,28 +1102,26 @@ class Logger:
     def hyper(self, *args, **kwargs):
         if self.disabled:
             return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
+        location = _call_site(sys._getframe(1))
         if len(args) == 1:
             hyper = dict(args[0])
         else:
             hyper = dict()
         hyper.update(kwargs)
         for key, value in hyper.items():
-            self.logger.info("{}[line:{}] - HYPER<(%MAGENTA){}(%RESET)>: (%CYAN){}(%RESET)".format(f.f_code.co_filename, f.f_lineno, key, value))
+            self.logger.info(LazyMessage(location, "HYPER<(%MAGENTA){}(%RESET)>: (%CYAN){}(%RESET)", (key, value)))
+            if self.metrics_sidecar is not None:
+                self.metrics_sidecar.hyper(key, value)
 
     def variable(self, variable_name: str, variable):
         if self.disabled:
             return
-        try:
-            raise Exception
-        except:
-            f = sys.exc_info()[2].tb_frame.f_back
-        self.logger.info("{}[line:{}] - VARIABLE<(%MAGENTA){}(%RESET)>: (%CYAN){}(%RESET)".format(f.f_code.co_filename, f.f_lineno, variable_name, variable))
-        regex = re.compile(r"([^\[\]]+)\[([^\[\]]+)\]")
-        m = regex.match(variable_name)
+        if self.isEnabledFor(INFO):
+            self.logger.info(LazyMessage(_call_site(sys._getframe(1)), "VARIABLE<(%MAGENTA){}(%RESET)>: (%CYAN){}(%RESET)", (variable_name, variable)))
+        metrics_sidecar = self.metrics_sidecar
+        if metrics_sidecar is not None:
+            metrics_sidecar.variable(variable_name, variable)
+        m = LogFileParser.variable_regex.match(variable_name)
         if not m:
             Logger._update_variable_dict(self.variable_dict, variable_name, variable)
         else:
@@ -528,228 +1132,128 @@ class Logger:
             Logger._update_variable_dict(self.variable_dict[group_name], variable_name, variable)
 
     def notion_buffer_flush(self, T=10):
-        if len(self.__update_notion_buffer) == 0 and len(self.__update_notion_file_buffer) == 0:
+        """
+        wait until the notion buffers are uploaded by the background worker, at most T rounds of retry (10 seconds each)
+        """
+        if len(self.__update_notion_buffer) == 0 and len(self.__update_notion_file_buffer) == 0 and not self.__notion_worker.pending:
             return
-        if "NOTION_TOKEN_V2" not in os.environ:
-            self.warning("there is no $NOTION_TOKEN_V2 in system path. Please check it")
-        if self.notion_page_link is None or self.notion_page_link == "":
-            self.warning("plz provide notion_page_link for logger object to use notion_update")
-            return
-        flag = False
-        for _ in range(3):
-            try:
-                flag = self.__get_notion_client_and_page()
-            except TimeoutException:
-                pass
-            if flag:
-                break
-        if not flag:
-            self.warning("failed to get notion client and page, exit")
-            return
-        for _ in range(T):
-            temp_set_variable = set()
-            temp_set_file = set()
-            for property_name, variable in self.__update_notion_buffer.items():
-                try:
-                    self.__update_notion(property_name, variable)
-                except TimeoutException:
-                    self.warning("update notion database Timeout, notion buffer: <{}>, notion file buffer: <{}>".format(self.__update_notion_buffer, self.__update_notion_file_buffer))
-                except Exception as e:
-                    self.exception(property_name, variable, " cause exception: ", e)
-                else:
-                    temp_set_variable.add(property_name)
-            for property_name, variable in self.__update_notion_file_buffer.items():
-                try:
-                    self.__upload_notion_file(property_name, variable)
-                except TimeoutException:
-                    self.warning("upload file to notion database Timeout, notion buffer: <{}>, notion file buffer: <{}>".format(self.__update_notion_buffer, self.__update_notion_file_buffer))
-                except Exception as e:
-                    self.exception(property_name, variable, " cause exception: ", e)
-                else:
-                    temp_set_file.add(property_name)
-            for vm in temp_set_variable:
-                del self.__update_notion_buffer[vm]
-            for vm in temp_set_file:
-                del self.__update_notion_file_buffer[vm]
-            if len(self.__update_notion_buffer) == 0 and len(self.__update_notion_file_buffer) == 0:
-                break
-            time.sleep(10)
-        return
+        if not self.__notion_worker.close(timeout=10 * T):
+            self.warning("failed to update notion, left with variable buffer <(%RED)" + str(self.__update_notion_buffer) + "(%RESET)> and file buffer <(%RED)" + str(self.__update_notion_file_buffer) + "(%RESET)>")
 
     def update_notion(self, property_name: str, variable, isfile=False):
-        if "NOTION_TOKEN_V2" not in os.environ:
+        """
+        update property of the notion page (notion_page_link) to variable, or upload file variable to the property if isfile is True
+
+        the update is sent by a background thread and this function returns immediately,
+        updates of the same property submitted close together are merged so only the latest value is sent
+        """
+        if self.notion_client is None and "NOTION_TOKEN_V2" not in os.environ:
             self.warning("there is no $notion_token_v2 in system path. please check it")
             return
-        if self.notion_page_link is None or self.notion_page_link == "":
+        if self.notion_client is None and (self.notion_page_link is None or self.notion_page_link == ""):
             self.warning("plz provide notion_page_link for logger object to use notion_update")
             return
-        if not isfile:
-            self.__update_notion_buffer[property_name] = variable
-        else:
-            self.__update_notion_file_buffer[property_name] = variable
-        flag = False
-        self.info("start update notion property: {}, with value {}".format(property_name, variable))
-        for _ in range(3):
-            try:
-                flag = self.__get_notion_client_and_page()
-            except TimeoutException:
-                self.warning("get notion clinent and page Timeout, try again")
-                pass
-            if flag:
-                break
-        if not flag:
-            return
-        temp_set_variable = set()
-        temp_set_file = set()
-        for property_name, variable in self.__update_notion_buffer.items():
-            try:
-                self.__update_notion(property_name, variable)
-            except TimeoutException:
-                self.warning("update notion database Timeout, notion buffer: <{}>, notion file buffer: <{}>".format(self.__update_notion_buffer, self.__update_notion_file_buffer))
-            except Exception as e:
-                self.exception(property_name, variable, " cause exception: ", e)
-            else:
-                temp_set_variable.add(property_name)
-        if isfile:
-            for property_name, variable in self.__update_notion_file_buffer.items():
-                try:
-                    self.__upload_notion_file(property_name, variable)
-                except TimeoutException:
-                    self.warning("upload file to notion database Timeout, notion buffer: <{}>, notion file buffer: <{}>".format(self.__update_notion_buffer, self.__update_notion_file_buffer))
-                except Exception as e:
-                    self.exception(property_name, variable, " cause exception: ", e)
-                else:
-                    temp_set_file.add(property_name)
-        for vm in temp_set_variable:
-            del self.__update_notion_buffer[vm]
-        for vm in temp_set_file:
-            del self.__update_notion_file_buffer[vm]
-        self.info("finish update notion, left with variable buffer <(%RED)" + str(self.__update_notion_buffer) + "(%RESET)> and file buffer <(%RED)" + str(self.__update_notion_buffer) + "(%RESET)>")
-        return
-
-    @timeout(10)
-    def __get_notion_client_and_page(self):
-        if not hasattr(self, "_notion_client") or not hasattr(self, "_notion_page"):
-            try:
-                self.debug("trying to connect to notion client")
-                self._notion_client = NotionClient(token_v2=os.environ["NOTION_TOKEN_V2"])
-                self.debug("successfully connect to notion client", self._notion_client)
-                self._notion_page = self._notion_client.get_block(self.notion_page_link)
-                self.debug("successfully get notion page")
-            except TimeoutException:
-                self.debug("get notion page Timeout")
-                return False
-            except Exception as e:
-                self.debug("cannot get notion page", type(e), e)
-                return False
-            else:
-                return True
-        else:
-            return True
+        self.debug("submit notion property: {}, with value {}".format(property_name, variable))
+        self.__notion_worker.submit(property_name, variable, isfile=isfile)
 
-    @timeout(5)
-    def __update_notion(self, variable_name, variable):
-        self.info("start update notion page, property name (%MAGENTA){}(%RESET), to {}".format(variable_name, variable))
-        old_variable = self._notion_page.get_property(variable_name)
-        self._notion_page.set_property(variable_name, variable)
-        self.info("update notion page, property name (%MAGENTA){}(%RESET), from {} to {}".format(variable_name, old_variable, variable))
-
-    @timeout(360)
-    def __upload_notion_file(self, variable_name, variable):
-        self.info("start upload file (%BLUE){}(%RESET) to notion property (%MAGENTA){}(%RESET), file size: (%MAGENTA){}(%RESET)".format(variable, variable_name, path(variable).file_size()))
-        upload_file_to_row_property(self._notion_client, self._notion_page, variable, variable_name)
-        self.info("successfully update file (%BLUE){}(%RESET)".format(variable_name))
+    def __get_notion_client(self):
+        if self.notion_client is None:
+            self.notion_client = NotionPageClient(self.notion_page_link)
+        return self.notion_client
 
     @staticmethod
     def hyper_from_logging_file(f_name):
-        hyper = table()
-        with open(f_name, "r") as finput:
-            for line in finput.readlines():
-                if "HYPER<" in line:
-                    match = re.search(r"HYPER<(.+)>: (.+)", line.rstrip())
-                    if match:
-                        variable_name = match.group(1)
-                        variable_str = match.group(2)
-                        if not variable_name or not variable_str:
-                            continue
-                        if variable_str[0].isdigit() or variable_str[0] == "-":
-                            variable = float(variable_str)
-                        elif variable_str[0] == "[" and variable_str[-1] == "]":
-                            numbers = vector(variable_str[1: -1].split(","))
-                            numbers = numbers.map(lambda x: x.split(" ")).map(vector).flatten()
-                            numbers = numbers.filter(lambda x: len(x)).map(lambda x: float(x.strip()))
-                            variable = numbers
-                        else:
-                            variable = variable_str
-                        hyper[variable_name] = variable
-        return hyper
+        if MetricsSidecar.exists(f_name):
+            return MetricsSidecar.load_hyper(f_name)
+        return LogFileParser(parser=False, variable=False).parse(f_name).hyper
 
     @staticmethod
     def parser_from_logging_file(f_name):
-        parser_dict = table(specified=table(), default=table())
-        width = 0
-        with open(f_name, "r") as finput:
-            content = "start"
-            for line in finput.readlines():
-                line = line.strip()
-                if content == "start" and line.endswith("Argument Parser:"):
-                    content = "start@1"
-                    width = len(line) - len("Argument Parser:")
-                elif content == "start@1":
-                    content = "start@2"
-                elif content == "start@2":
-                    assert line.endswith("> Specified Vars:")
-                    content = "specified"
-                elif content == "specified":
-                    line = line[width:]
-                    if line.startswith(">"):
-                        content = "default"
-                    else:
-                        assert line.startswith(" " * 4)
-                        item, _, value = line.strip().partition("=")
-                        parser_dict.specified[item] = value
-                elif content == "default":
-                    line = line[width:]
-                    if line.startswith("-" * 30):
-                        content = "start"
-                    else:
-                        assert line.startswith(" " * 4)
-                        item, _, value = line.strip().partition("=")
-                        parser_dict.default[item] = value
-        return parser_dict
+        return LogFileParser(hyper=False, variable=False).parse(f_name).parser
+
+    @staticmethod
+    def variable_from_logging_file(f_name, names=None):
+        """
+        rebuild variable_dict from the logging file f_name, the metrics sidecar (see MetricsSidecar) is read instead of the text if it exists
+
+        Parameters
+        ----------
+        names : list
+            only load variables whose name, or group name for name like "group[name]", is in names
+        """
+        if MetricsSidecar.exists(f_name):
+            return Logger._variable_dict_from_sidecar(f_name, names=names)
+        return LogFileParser(hyper=False, parser=False, names=names).parse(f_name).variable
+
+    @staticmethod
+    def load_run(f_name, variables=None) -> table:
+        """
+        load hyper, parser and variable_dict of one logging file in a single pass over the text
+        (hyper and variables come from the metrics sidecar if it exists)
+
+        Returns
+        ----------
+        table(name=f_name, hyper=..., parser=..., variable=...)
+        """
+        has_sidecar = MetricsSidecar.exists(f_name)
+        content = LogFileParser(hyper=not has_sidecar, variable=not has_sidecar, names=variables).parse(f_name)
+        if has_sidecar:
+            hyper = MetricsSidecar.load_hyper(f_name)
+            variable = Logger._variable_dict_from_sidecar(f_name, names=variables)
+        else:
+            hyper = content.hyper
+            variable = content.variable
+        return table(name=str(f_name), hyper=hyper, parser=content.parser, variable=variable)
+
+    @staticmethod
+    def load_runs(files, variables=None, workers=None, backend="process", processing_bar=False) -> vector:
+        """
+        load many logging files (for example all runs of a sweep) at once, each file is read in a single pass (see load_run)
+        and the files are distributed over the persistent executor of zytlib.parallel.
+
+        Parameters
+        ----------
+        files : list
+            paths of logging files
+        variables : list
+            only load variables whose name, or group name, is in variables. None means all variables
+        workers : int
+            number of workers, None means os.cpu_count()
+        backend : str
+            "process" or "thread"
+
+        Returns
+        ----------
+        vector of table(name, hyper, parser, variable), the i-th element is the run of files[i]
+
+        Example
+        ----------
+        runs = Logger.load_runs(path("logs").ls())
+        runs.map(lambda run: run.hyper["lr"])
+        """
+        files = vector(files).map(str)
+        workers = default_workers(workers)
+        if len(files) <= 1 or workers == 1:
+            return files.map(lambda f_name: Logger.load_run(f_name, variables=variables), processing_bar=processing_bar)
+        return files.map(partial(Logger.load_run, variables=variables), workers=workers, backend=backend, processing_bar=processing_bar)
 
     @staticmethod
-    def variable_from_logging_file(f_name):
+    def _variable_dict_from_sidecar(f_name, names=None):
         variable_dict = dict()
-        with open(f_name, "r") as finput:
-            for line in finput.readlines():
-                if "VARIABLE<" in line:
-                    match = re.search(r"VARIABLE<(.+)>: (.+)", line.rstrip())
-                    if match:
-                        variable_name = match.group(1)
-                        variable_str = match.group(2)
-                        if not variable_name or not variable_str:
-                            continue
-                        if variable_str[0].isdigit() or variable_str[0] == "-":
-                            variable = float(variable_str)
-                        elif variable_str[0] == "[" and variable_str[-1] == "]":
-                            numbers = vector(variable_str[1:-1].split(","))
-                            numbers = numbers.map(lambda x: x.split(" ")).map(vector).flatten()
-                            numbers = numbers.filter(lambda x: len(x)).map(lambda x: float(x.strip()))
-                            variable = numbers
-                        else:
-                            print("unknown variable", variable_str)
-                            continue
-                        regex = re.compile(r"([^\[\]]+)\[([^\[\]]+)\]")
-                        m = regex.match(variable_name)
-                        if not m:
-                            Logger._update_variable_dict(variable_dict, variable_name, variable)
-                        else:
-                            group_name = m.group(1)
-                            variable_name = m.group(2)
-                            if group_name not in variable_dict:
-                                variable_dict[group_name] = dict()
-                            Logger._update_variable_dict(variable_dict[group_name], variable_name, variable)
+        regex = re.compile(r"([^\[\]]+)\[([^\[\]]+)\]")
+        for variable_name, (_, values) in MetricsSidecar.load_variable(f_name, names=names).items():
+            if isinstance(values, np.ndarray):
+                values = values.tolist()
+            values = [vector(x) if isinstance(x, list) else x for x in values]
+            if len(values) == 1:
+                variable = vector([values[0]]) if isinstance(values[0], list) else values[0]
+            else:
+                variable = vector(values)
+            m = regex.match(variable_name)
+            if not m:
+                variable_dict[variable_name] = variable
+            else:
+                variable_dict.setdefault(m.group(1), dict())[m.group(2)] = variable
         return variable_dict
 
     def upload_variable_dict_to_notion(self, property_name, title=None, smooth=0, ignore=None, multi_vector=None, tight_layout=False, hline=None):
@@ -818,12 +1322,9 @@ class Logger:
             func = args[0]
             @wraps(func)
             def wrapper(*args, **kwargs):
-                if self.disabled:
+                if not self.isEnabledFor(logging_level):
                     return func(*args, **kwargs)
-                try:
-                    raise Exception
-                except:
-                    f = sys.exc_info()[2].tb_frame.f_back
+                f = sys._getframe(1)
                 logging_func = self.from_level(logging_level)
                 random_id = ''.join(random.sample(string.ascii_letters + string.digits, 8))
                 logging_func("{}[line:{}] - {}: function [{}] start execution function {}".format(f.f_code.co_filename, f.f_lineno, level_to_name[logging_level], random_id, func.__name__))
@@ -837,12 +1338,9 @@ class Logger:
             def temp_wrapper_function_input_output(func):
                 @wraps(func)
                 def wrapper(*args, **kwargs):
-                    if self.disabled:
+                    if not self.isEnabledFor(logging_level):
                         return func(*args, **kwargs)
-                    try:
-                        raise Exception
-                    except:
-                        f = sys.exc_info()[2].tb_frame.f_back
+                    f = sys._getframe(1)
                     logging_func = self.from_level(logging_level)
                     random_id = ''.join(random.sample(string.ascii_letters + string.digits, 8))
                     logging_func("{}[line:{}] - {}: function [{}] start execution function {}".format(f.f_code.co_filename, f.f_lineno, level_to_name[logging_level], random_id, func.__name__))
@@ -894,6 +1392,8 @@ class Logger:
             return
 
         self.notion_buffer_flush()
+        if touch(lambda: self._metrics_sidecar, None) is not None:
+            self._metrics_sidecar.close()
 
         if self.autoplot_variable:
             saved_plot_path = self.get_f_fullpath().with_ext("pdf")
@@ -0,0 +1,148 @@
+#! python3.8 -u
+#  -*- coding: utf-8 -*-
+
+##############################
+## Project PyCTLib
+## Package <main>
+##############################
+__all__ = """
+    default_workers
+    get_executor
+    shutdown_executors
+    parallel_map
+    ParallelFailure
+""".split()
+
+import os
+import math
+import atexit
+import traceback
+from threading import Lock
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+_executors = dict()
+_executors_lock = Lock()
+
+def default_workers(workers=None) -> int:
+    """
+    number of workers actually used for workers, None or non-positive value means os.cpu_count()
+    """
+    if workers is None or workers <= 0:
+        return os.cpu_count() or 1
+    return workers
+
+def get_executor(backend="thread", workers=None):
+    """
+    get the persistent executor for (backend, workers), it is created at the first call and reused afterwards
+
+    Parameters
+    ----------
+    backend : str
+        "thread" or "process"
+    workers : int
+        number of workers, None or non-positive value means os.cpu_count()
+    """
+    workers = default_workers(workers)
+    key = (backend, workers)
+    with _executors_lock:
+        executor = _executors.get(key, None)
+        if executor is None:
+            if backend == "thread":
+                executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="zytlib")
+            elif backend == "process":
+                executor = ProcessPoolExecutor(max_workers=workers)
+            else:
+                raise ValueError("backend should be 'thread' or 'process', but got {}".format(backend))
+            _executors[key] = executor
+    return executor
+
+def shutdown_executors(wait=True) -> None:
+    """
+    shutdown all persistent executors, it is automatically called at exit
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+atexit.register(shutdown_executors)
+
+def _discard_executor(backend, workers) -> None:
+    with _executors_lock:
+        _executors.pop((backend, default_workers(workers)), None)
+
+class ParallelFailure:
+    """
+    placeholder of the result of an element whose function call raises an error in parallel_map
+    """
+
+    __slots__ = ("error", "trace")
+
+    def __init__(self, error: str, trace: str):
+        self.error = error
+        self.trace = trace
+
+    def __str__(self):
+        return "ParallelFailure({})".format(self.error)
+
+    def __repr__(self):
+        return self.__str__()
+
+def _apply_chunk(func, split_tuple, chunk):
+    ret = list()
+    for x in chunk:
+        try:
+            if split_tuple and isinstance(x, tuple):
+                ret.append(func(*x))
+            else:
+                ret.append(func(x))
+        except Exception as e:
+            ret.append(ParallelFailure(repr(e), traceback.format_exc()))
+    return ret
+
+def parallel_map(func, items, workers=None, backend="thread", chunksize=None, split_tuple=False, processing_bar=False) -> list:
+    """
+    apply func to each item with the persistent executor, results are returned in order.
+    element whose call raises an error gets a ParallelFailure in its position instead of stopping the whole map.
+
+    Parameters
+    ----------
+    func : callable
+        for backend "process", func and items should be picklable
+    items : list
+    workers : int
+    backend : str
+        "thread" or "process"
+    chunksize : int
+        number of items sent to a worker at once, default is len(items) / (4 * workers)
+    split_tuple : bool
+        if True, tuple item x will be called as func(*x)
+    processing_bar : bool
+    """
+    items = list(items)
+    if len(items) == 0:
+        return list()
+    n_workers = default_workers(workers)
+    if chunksize is None:
+        chunksize = max(1, math.ceil(len(items) / (4 * n_workers)))
+    chunks = [items[index: index + chunksize] for index in range(0, len(items), chunksize)]
+    executor = get_executor(backend, n_workers)
+    try:
+        results = executor.map(partial(_apply_chunk, func, split_tuple), chunks)
+        if processing_bar:
+            from tqdm import tqdm
+            bar = tqdm(total=len(items))
+        ret = list()
+        for chunk in results:
+            ret.extend(chunk)
+            if processing_bar:
+                bar.update(len(chunk))
+        if processing_bar:
+            bar.close()
+        return ret
+    except BrokenProcessPool:
+        _discard_executor(backend, n_workers)
+        raise
@@ -0,0 +1,160 @@
+#! python3.8 -u
+#  -*- coding: utf-8 -*-
+
+##############################
+## Project PyCTLib
+## Package <main>
+##############################
+__all__ = """
+    SearchIndex
+""".split()
+
+import re
+import numpy as np
+from rapidfuzz import fuzz, process
+
+class SearchIndex:
+    """
+    search index over the string representations of a sequence, built once and reused for every query.
+
+    it keeps:
+        the strings and their lowercase forms (computed at the first case insensitive query)
+        the lengths of the strings as np.ndarray
+        character n-gram postings: positions of strings containing the n-gram, computed at the first query using the n-gram and cached.
+            the posting of an n-gram is computed from the posting of its prefix, so extending a query only scans the strings that are still matched.
+
+    Example
+    ----------
+    index = SearchIndex(["apple", "banana", "peach"])
+    index.contains("an")
+    will produce array([1])
+    index.fuzzy("aple")
+    will produce (array([0]), array([...]))
+    """
+
+    def __init__(self, strings):
+        self.strings = list(strings)
+        self.lengths = np.fromiter((len(x) for x in self.strings), dtype=np.int64, count=len(self.strings))
+        self.__lower = None
+        self.__postings = {True: dict(), False: dict()}
+
+    def __len__(self):
+        return len(self.strings)
+
+    @property
+    def lower(self) -> list:
+        if self.__lower is None:
+            self.__lower = [x.lower() for x in self.strings]
+        return self.__lower
+
+    def corpus(self, case_sensitive=True) -> list:
+        return self.strings if case_sensitive else self.lower
+
+    def contains(self, gram: str, case_sensitive=True) -> np.ndarray:
+        """
+        positions (in increasing order) of strings containing gram as a substring
+        """
+        postings = self.__postings[case_sensitive]
+        if gram in postings:
+            return postings[gram]
+        corpus = self.corpus(case_sensitive)
+        if len(gram) == 0:
+            ret = np.arange(len(corpus), dtype=np.int64)
+        else:
+            prefix = max((gram[:k] for k in range(1, len(gram)) if gram[:k] in postings), key=len, default=None)
+            if prefix is None:
+                ret = np.fromiter((index for index, x in enumerate(corpus) if gram in x), dtype=np.int64)
+            else:
+                ret = np.fromiter((index for index in postings[prefix].tolist() if gram in corpus[index]), dtype=np.int64)
+        postings[gram] = ret
+        return ret
+
+    def contains_all(self, grams, case_sensitive=True) -> np.ndarray:
+        """
+        positions of strings containing every gram in grams
+        """
+        ret = None
+        for gram in sorted(set(grams), key=len, reverse=True):
+            positions = self.contains(gram, case_sensitive=case_sensitive)
+            ret = positions if ret is None else np.intersect1d(ret, positions, assume_unique=True)
+            if len(ret) == 0:
+                break
+        if ret is None:
+            return np.arange(len(self), dtype=np.int64)
+        return ret
+
+    def score(self, query: str, positions=None, scorer=fuzz.ratio, case_sensitive=True, score_cutoff=None, workers=-1) -> np.ndarray:
+        """
+        score query against the strings at positions (all strings if positions is None) in one batch with rapidfuzz.process.cdist
+        """
+        corpus = self.corpus(case_sensitive)
+        if positions is not None:
+            corpus = [corpus[index] for index in np.asarray(positions).tolist()]
+        if len(corpus) == 0:
+            return np.zeros(0, dtype=np.float64)
+        return process.cdist([query], corpus, scorer=scorer, dtype=np.float64, score_cutoff=score_cutoff, workers=workers)[0]
+
+    def extract(self, query: str, limit=5, scorer=fuzz.WRatio, case_sensitive=True):
+        """
+        best limit (position, score) pairs by rapidfuzz.process.extract
+        """
+        return [(index, score) for _, score, index in process.extract(query, self.corpus(case_sensitive), scorer=scorer, limit=limit)]
+
+    def fuzzy(self, query: str):
+        """
+        the fuzzy match used by vector.fuzzy_search, return (positions, scores) sorted by descending score.
+        the search is case sensitive only if query contains upper case letter.
+
+        strings are prefiltered by the posting of query[0] and, for large candidate sets, of query[:2] or query[1],
+        then scored by fuzz.ratio / eta ** 0.8 where eta penalizes length difference, and kept if score > 49.
+        """
+        if len(query) == 0:
+            return np.arange(len(self), dtype=np.int64), np.zeros(len(self), dtype=np.float64)
+        case_sensitive = any(x.isupper() for x in query)
+        positions = self.contains(query[0], case_sensitive=case_sensitive)
+        if len(positions) >= 1000:
+            if len(query) == 1:
+                return positions, np.full(len(positions), 100, dtype=np.float64)
+            if len(positions) > 5000:
+                positions = self.contains(query[:2], case_sensitive=case_sensitive)
+            else:
+                positions = self.contains_all(query[:2], case_sensitive=case_sensitive)
+        length = self.lengths[positions]
+        length_query = len(query)
+        eta = np.where(length > length_query, 1 - (length - length_query) / (length + length_query), 1 - (length_query - length) / (length + length_query) / 2)
+        scores = self.score(query, positions, scorer=fuzz.ratio, case_sensitive=case_sensitive) / eta ** 0.8
+        kept = scores > 49
+        positions, scores = positions[kept], scores[kept]
+        order = np.argsort(-scores, kind="stable")
+        return positions[order], scores[order]
+
+    def partial_fuzzy(self, query: str, threshold=50):
+        """
+        the case insensitive fuzz.partial_ratio match used by pathList.fuzzy_search, return (positions, scores) sorted by descending score
+        scores are fuzz.partial_ratio weighted by the length ratio between candidate and query
+        """
+        if len(query) == 0:
+            return np.arange(len(self), dtype=np.int64), np.zeros(len(self), dtype=np.float64)
+        query = query.lower()
+        ratio = self.score(query, scorer=fuzz.partial_ratio, case_sensitive=False)
+        positions = np.flatnonzero(ratio > threshold)
+        ratio = ratio[positions]
+        length = self.lengths[positions]
+        scores = ratio * np.minimum(1, length / len(query)) * np.minimum(1, len(query) / np.maximum(length, 1)) ** 0.3
+        scores = np.round(scores * 10) / 10
+        order = np.argsort(-scores, kind="stable")
+        return positions[order], scores[order]
+
+    def regex(self, query: str) -> np.ndarray:
+        """
+        positions of strings matched by regex query, sorted by length of the strings.
+        query without regex special characters is searched with the substring postings.
+        """
+        if len(query) == 0:
+            return np.arange(len(self), dtype=np.int64)
+        if re.escape(query) == query:
+            positions = self.contains(query)
+        else:
+            pattern = re.compile(query)
+            positions = np.fromiter((index for index, x in enumerate(self.strings) if pattern.search(x)), dtype=np.int64)
+        return positions[np.argsort(self.lengths[positions], kind="stable")]
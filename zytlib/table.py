@@ -259,6 +259,49 @@ class table(dict):
     def items(self) -> vector:
         return vector(super().items())
 
+    def join(self, other: dict, on, how="inner") -> "table":
+        """
+        join two tables of columns (vectors of equal length, one element per row) on key columns,
+        with a hash index of the shorter table, see vector.join
+
+        Parameters
+        ----------
+        other :
+            table (or dict) of columns
+        on :
+            name of the key column, or list of names, present in both tables
+        how :
+            "inner", "left" or "outer", missing values are None.
+            with "outer", the key columns of unmatched rows of other are filled from other
+
+        Example
+        ----------
+        results = table(subject=vector(1, 3), acc=vector(0.9, 0.7))
+        meta = table(subject=vector(1, 2), age=vector(20, 30))
+        results.join(meta, "subject", how="outer")
+        will produce {'subject': [1, 3, 2], 'acc': [0.9, 0.7, None], 'age': [20, None, 30]}
+        """
+        from .vector import _join_positions
+        other = table(other)
+        on = list(totuple(on))
+        columns = [key for key in other.keys() if key not in on]
+        if set(columns) & set(self.keys()):
+            raise ValueError("table.join requires keys in two table are different except the key columns")
+        left_keys = list(zip(*(self[key] for key in on)))
+        right_keys = list(zip(*(other[key] for key in on)))
+        positions = _join_positions(left_keys, right_keys, how)
+        ret = table()
+        for key, column in super().items():
+            if key in on:
+                index = on.index(key)
+                ret[key] = vector([right_keys[j][index] if i is None else column[i] for i, j in positions])
+            else:
+                ret[key] = vector([None if i is None else column[i] for i, _ in positions])
+        for key in columns:
+            column = other[key]
+            ret[key] = vector([None if j is None else column[j] for _, j in positions])
+        return ret
+
     def dict(self) -> dict:
         base = {}
         for key, value in self.items():
@@ -288,4 +331,4 @@ class table(dict):
         return ret
 
     def __dir__(self):
-        return ["keys", "items", "copy", "dict", "values", "rvalues", "map", "rmap", "hieratical", "flatten", "merge", "update_exist", "update_where", "update_notexist", "key_not_here", "lock_key", "unlock_key", "load", "pset", "filter", "pretty_print"] + self.keys()
+        return ["keys", "items", "copy", "dict", "values", "rvalues", "map", "rmap", "hieratical", "flatten", "merge", "update_exist", "update_where", "update_notexist", "key_not_here", "lock_key", "unlock_key", "load", "pset", "filter", "join", "pretty_print"] + self.keys()
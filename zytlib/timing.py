@@ -14,9 +14,16 @@ __all__ = """
     JUMP
     Process
     periodic
+    Profiler
+    ProfileNode
+    profiler
 """.split()
 
+import os
+import json
 import time
+import random
+import threading
 from functools import wraps
 from threading import Timer
 
@@ -39,6 +46,9 @@ class timer(object):
         self.name = name
         self.nround = 0
     def __enter__(self):
+        self.profiled = profiler.enabled and bool(self.name)
+        if self.profiled:
+            profiler.start(self.name)
         self.start = time.time()
         self.prevtime = self.start
         return self
@@ -50,6 +60,8 @@ class timer(object):
             print("[%s takes %lfs]"%(name, self.end - self.prevtime))
         self.prevtime = self.end
     def __exit__(self, exc_type, exc_value, traceback):
+        if self.profiled:
+            profiler.stop()
         if exc_type == RuntimeError and str(exc_value) == "JUMP": return True
         if self.name:
             print("[%s%s takes %lfs]"%
@@ -75,6 +87,303 @@ class Process:
     @property
     def jump(self): return JUMP(self.key not in self.process)
 
+class ProfileNode:
+    """
+    node of the call tree of Profiler, durations are in nanoseconds
+
+    total is the inclusive time, child_total is the inclusive time of its children, so the self time is total - child_total.
+    at most max_samples durations are kept (by reservoir sampling) for percentiles.
+    """
+
+    __slots__ = ("name", "parent", "children", "calls", "total", "child_total", "min", "max", "samples")
+
+    def __init__(self, name, parent=None):
+        self.name = name
+        self.parent = parent
+        self.children = dict()
+        self.calls = 0
+        self.total = 0
+        self.child_total = 0
+        self.min = None
+        self.max = None
+        self.samples = list()
+
+    def child(self, name) -> "ProfileNode":
+        node = self.children.get(name, None)
+        if node is None:
+            node = self.children[name] = ProfileNode(name, self)
+        return node
+
+    def add(self, duration, max_samples) -> None:
+        self.calls += 1
+        self.total += duration
+        if self.calls == 1:
+            self.min = self.max = duration
+        elif duration < self.min:
+            self.min = duration
+        elif duration > self.max:
+            self.max = duration
+        if len(self.samples) < max_samples:
+            self.samples.append(duration)
+        else:
+            index = int(random.random() * self.calls)
+            if index < max_samples:
+                self.samples[index] = duration
+        if self.parent is not None:
+            self.parent.child_total += duration
+
+    @property
+    def self_total(self):
+        return self.total - self.child_total
+
+    def path(self) -> list:
+        ret = list()
+        node = self
+        while node.parent is not None:
+            ret.append(node.name)
+            node = node.parent
+        return ret[::-1]
+
+    def walk(self):
+        yield self
+        for child in self.children.values():
+            yield from child.walk()
+
+class _ProfileScope:
+
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler.start(self.name)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.profiler.stop()
+
+class _NullScope:
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return None
+
+_null_scope = _NullScope()
+
+class Profiler:
+    """
+    hierarchical profiler, it builds a call tree (one per thread) of named scopes and timed functions with time.perf_counter_ns
+
+    Parameters
+    ----------
+    enabled : bool
+        a disabled profiler records nothing, its scope returns a shared no-op context manager
+    trace : bool
+        keep every (name, start, duration) event for chrome_trace, at most max_events events are kept
+    max_samples : int
+        durations kept per node for percentiles
+
+    Example
+    ----------
+    p = Profiler()
+    @p.function
+    def f():
+        ...
+    with p.scope("epoch"):
+        with p.scope("data"):
+            ...
+        f()
+    p.table()
+    p.chrome_trace("trace.json")
+    p.folded("stacks.folded")
+    """
+
+    def __init__(self, enabled=True, trace=False, max_samples=1000, max_events=1000000):
+        self.enabled = enabled
+        self.trace = trace
+        self.max_samples = max_samples
+        self.max_events = max_events
+        self.__local = threading.local()
+        self.__lock = threading.Lock()
+        self.__roots = dict()
+        self.__events = list()
+        self.__scopes = dict()
+        self.__origin = time.perf_counter_ns()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        """
+        forget all records, should not be called inside an open scope
+        """
+        with self.__lock:
+            self.__roots = dict()
+            self.__events = list()
+            self.__local = threading.local()
+            self.__origin = time.perf_counter_ns()
+
+    def __stack(self) -> list:
+        try:
+            return self.__local.stack
+        except AttributeError:
+            thread = threading.current_thread()
+            root = ProfileNode(thread.name)
+            with self.__lock:
+                self.__roots[thread.ident] = root
+            stack = self.__local.stack = [(root, 0)]
+            return stack
+
+    def start(self, name) -> None:
+        stack = self.__stack()
+        parent = stack[-1][0]
+        node = parent.children.get(name, None)
+        if node is None:
+            node = parent.child(name)
+        stack.append((node, time.perf_counter_ns()))
+
+    def stop(self) -> None:
+        end = time.perf_counter_ns()
+        stack = self.__stack()
+        if len(stack) <= 1:
+            raise RuntimeError("Profiler.stop is called without a started scope")
+        node, start = stack.pop()
+        node.add(end - start, self.max_samples)
+        if self.trace and len(self.__events) < self.max_events:
+            self.__events.append((node.name, threading.get_ident(), start, end - start))
+
+    def scope(self, name):
+        """
+        context manager recording the time of its block as node name under the current node
+        """
+        if not self.enabled:
+            return _null_scope
+        ret = self.__scopes.get(name, None)
+        if ret is None:
+            ret = self.__scopes[name] = _ProfileScope(self, name)
+        return ret
+
+    def function(self, func):
+        """
+        decorator recording each call of func as node func.__qualname__ under the current node
+        """
+        name = getattr(func, "__qualname__", getattr(func, "__name__", str(func)))
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return func(*args, **kwargs)
+            self.start(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.stop()
+        return wrapper
+
+    @property
+    def roots(self) -> dict:
+        """
+        root ProfileNode of each thread, keyed by thread ident
+        """
+        with self.__lock:
+            return dict(self.__roots)
+
+    def table(self, unit=1e-9):
+        """
+        statistics of every scope, keyed by "/" joined path of names, records of different threads with the same path are merged
+
+        each value is table(calls, total, self_total, mean, min, max, p50, p90, p99), durations are in seconds (multiply the nanoseconds by unit)
+        """
+        from .table import table
+        merged = dict()
+        for root in self.roots.values():
+            for node in root.walk():
+                if node is root or node.calls == 0:
+                    continue
+                key = "/".join(node.path())
+                if key not in merged:
+                    merged[key] = [0, 0, 0, node.min, node.max, list()]
+                record = merged[key]
+                record[0] += node.calls
+                record[1] += node.total
+                record[2] += node.self_total
+                record[3] = min(record[3], node.min)
+                record[4] = max(record[4], node.max)
+                record[5].extend(node.samples)
+        ret = table()
+        for key, (calls, total, self_total, minimum, maximum, samples) in merged.items():
+            samples = sorted(samples)
+            percentile = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] * unit
+            ret[key] = table(calls=calls, total=total * unit, self_total=self_total * unit, mean=total / calls * unit, min=minimum * unit, max=maximum * unit, p50=percentile(0.5), p90=percentile(0.9), p99=percentile(0.99))
+        return ret
+
+    def chrome_trace(self, filepath=None) -> dict:
+        """
+        trace in the chrome trace event format (open it with chrome://tracing or https://ui.perfetto.dev)
+
+        if trace is True, every recorded event is exported,
+        otherwise each node of the call tree is exported as one event whose duration is its total time, placed after its previous sibling
+        """
+        pid = os.getpid()
+        events = list()
+        if self.trace:
+            for name, tid, start, duration in list(self.__events):
+                events.append(dict(name=name, ph="X", ts=(start - self.__origin) / 1e3, dur=duration / 1e3, pid=pid, tid=tid))
+        else:
+            def place(node, tid, start):
+                for child in node.children.values():
+                    events.append(dict(name=child.name, ph="X", ts=start / 1e3, dur=child.total / 1e3, pid=pid, tid=tid, args=dict(calls=child.calls)))
+                    place(child, tid, start)
+                    start += child.total
+            for tid, root in self.roots.items():
+                place(root, tid, 0)
+        for tid, root in self.roots.items():
+            events.append(dict(name="thread_name", ph="M", pid=pid, tid=tid, args=dict(name=root.name)))
+        ret = dict(traceEvents=events, displayTimeUnit="ms")
+        if filepath is not None:
+            with open(filepath, "w") as output:
+                json.dump(ret, output)
+        return ret
+
+    def folded(self, filepath=None) -> str:
+        """
+        folded stacks for flamegraph.pl / speedscope: one line "thread;scope;...;scope self_time_in_microseconds" per node
+        """
+        lines = list()
+        for root in self.roots.values():
+            for node in root.walk():
+                if node is root or node.calls == 0:
+                    continue
+                lines.append("{} {}".format(";".join([root.name] + node.path()), node.self_total // 1000))
+        ret = "\n".join(lines)
+        if filepath is not None:
+            with open(filepath, "w") as output:
+                output.write(ret + "\n")
+        return ret
+
+    def __str__(self):
+        lines = list()
+        def show(node, depth):
+            for child in node.children.values():
+                lines.append("{}{}: calls={}, total={:.6f}s, self={:.6f}s".format("    " * depth, child.name, child.calls, child.total / 1e9, child.self_total / 1e9))
+                show(child, depth + 1)
+        for root in self.roots.values():
+            lines.append("[{}]".format(root.name))
+            show(root, 1)
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return self.__str__()
+
+profiler = Profiler(enabled=False)
+
 class TimerCtrl(Timer):
 
     def __init__(self, seconds, function):
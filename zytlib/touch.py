@@ -18,6 +18,8 @@ __all__ = """
 
 import sys
 from time import sleep
+from functools import lru_cache
+from collections import ChainMap
 from typing import Callable, Union
 
 def _mid(x): return x[1] if len(x) > 1 else x[0]
@@ -102,12 +104,46 @@ class get_environ_vars(dict):
         for varset in self.all_vars[::-1]: collector.update(varset)
         return collector
 
+class _LazyEnvironVars:
+    """
+    read-only mapping over get_environ_vars(), the stack is only walked at the first lookup
+    """
+
+    __slots__ = ("vars",)
+
+    def __init__(self):
+        self.vars = None
+
+    def __environ(self):
+        if self.vars is None:
+            try: self.vars = get_environ_vars()
+            except TypeError: self.vars = {}
+        return self.vars
+
+    def __getitem__(self, k):
+        environ = self.__environ()
+        if k in environ: return environ[k]
+        raise KeyError(k)
+
+    def __contains__(self, k):
+        return k in self.__environ()
+
+@lru_cache(maxsize=1024)
+def _compile_expression(v: str):
+    return compile(v, "<touch>", "eval")
+
 def touch(v: Union[Callable, str], default=None):
+    """
+    touch(func, default) -> func() or default if func raises an error
+    touch(expr, default) -> value of the expression string expr or default if it raises an error
+
+    expr is compiled once and cached, names in expr are looked up in the locals and globals of the caller,
+    then in the environment given by get_environ_vars (only searched if the name is not found before).
+    """
     if isinstance(v, str):
-        local_vars = get_environ_vars()
-        local_vars.update(locals())
-        locals().update(local_vars.simplify())
-        try: return eval(v)
+        try:
+            frame = sys._getframe(1)
+            return eval(_compile_expression(v), globals(), ChainMap(frame.f_locals, frame.f_globals, _LazyEnvironVars()))
         except: return default
     else:
         try: return v()
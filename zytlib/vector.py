@@ -10,6 +10,9 @@ __all__ = """
     vector
     generator_wrapper
     ctgenerator
+    lazy_vector
+    strided_vector
+    grouped_vector
     IndexMapping
     NoDefault
     UnDefined
@@ -25,10 +28,13 @@ from collections import Counter
 from functools import wraps, reduce, partial
 from .touch import touch, crash, once
 import copy
+import itertools
+import operator
 import numpy as np
 from pyoverload import iterable
 from tqdm import tqdm, trange
 from rapidfuzz import fuzz
+from .search import SearchIndex
 import curses
 import re
 import sys
@@ -39,7 +45,7 @@ import traceback
 import inspect
 import os
 from .strtools import delete_surround
-from .wrapper import empty_wrapper, registered_method, registered_property, destory_registered_property
+from .wrapper import empty_wrapper
 import os.path
 import time
 import pydoc
@@ -47,7 +53,6 @@ from collections.abc import Hashable
 from matplotlib.axes._subplots import Axes
 from .utils import constant, str_type, totuple
 import functools
-import multiprocessing
 try:
     import numba as nb
     jit = nb.jit
@@ -166,6 +171,105 @@ def _need_split_tuple(func):
     except:
         return False
 
+def _map_with_default(func, content, default, split_tuple=False, filter_function=None) -> list:
+    """
+    [func(x) for x in content], with default in place of the result of an element whose call raises an error.
+    if filter_function is given, element x at index with filter_function(index, x) False is kept unchanged.
+    """
+    ret = list()
+    append = ret.append
+    if filter_function is None:
+        if split_tuple:
+            for a in content:
+                try:
+                    append(func(*a))
+                except Exception:
+                    append(default)
+        else:
+            for a in content:
+                try:
+                    append(func(a))
+                except Exception:
+                    append(default)
+    else:
+        for index, a in enumerate(content):
+            if not filter_function(index, a):
+                append(a)
+                continue
+            try:
+                append(func(*a) if split_tuple else func(a))
+            except Exception:
+                append(default)
+    return ret
+
+def _int_sum_is_exact(array, count) -> bool:
+    """
+    whether the sums of at most count elements of the numpy array are exact in int64, always True for floats
+    """
+    if array.dtype.kind not in "iu" or array.size == 0:
+        return True
+    return max(int(array.max()), -int(array.min())) * int(count) < 2 ** 63
+
+_join_methods = ("inner", "left", "outer")
+
+def _hash_index(keys) -> dict:
+    """
+    dict from each key to the list of its positions in keys
+    """
+    index = dict()
+    for position, k in enumerate(keys):
+        positions = index.get(k, None)
+        if positions is None:
+            index[k] = [position]
+        else:
+            positions.append(position)
+    return index
+
+def _join_positions(left_keys, right_keys, how="inner") -> list:
+    """
+    pairs (i, j) of positions with left_keys[i] == right_keys[j], the hash index is built on the shorter side.
+    pairs are ordered by i, then by j; with how "left" or "outer", an unmatched i gives (i, None)
+    and with how "outer", (None, j) of the unmatched j follow in order of j.
+    """
+    if how not in _join_methods:
+        raise ValueError("how should be one of {}, but got {}".format(", ".join(_join_methods), how))
+    ret = list()
+    if len(left_keys) <= len(right_keys):
+        index = _hash_index(left_keys)
+        matches = [None] * len(left_keys)
+        unmatched = list()
+        for j, k in enumerate(right_keys):
+            positions = index.get(k, None)
+            if positions is None:
+                unmatched.append(j)
+                continue
+            for i in positions:
+                if matches[i] is None:
+                    matches[i] = [j]
+                else:
+                    matches[i].append(j)
+        for i, m in enumerate(matches):
+            if m is not None:
+                ret.extend((i, j) for j in m)
+            elif how != "inner":
+                ret.append((i, None))
+    else:
+        index = _hash_index(right_keys)
+        matched = bytearray(len(right_keys))
+        for i, k in enumerate(left_keys):
+            positions = index.get(k, None)
+            if positions is None:
+                if how != "inner":
+                    ret.append((i, None))
+                continue
+            for j in positions:
+                ret.append((i, j))
+                matched[j] = 1
+        unmatched = [j for j, m in enumerate(matched) if not m] if how == "outer" else list()
+    if how == "outer":
+        ret.extend((None, j) for j in unmatched)
+    return ret
+
 class _Vector_Dict(dict):
 
     def values(self):
@@ -205,6 +309,21 @@ class EmptyClass:
 NoDefault = EmptyClass("No Default Value")
 OutBoundary = EmptyClass("Out of Boundary")
 UnDefined = EmptyClass("Not Defined")
+_Uncached = EmptyClass("Uncached")
+_mutation_counter = itertools.count(1)
+
+def versioned_property(func):
+    """versioned_property.
+    property of vector cached by vector._set_cache, it is computed again once the vector is mutated in place
+    """
+    name = func.__name__
+    @wraps(func)
+    def wrapper(self):
+        value = self._get_cache(name, _Uncached)
+        if value is _Uncached:
+            value = self._set_cache(name, func(self))
+        return value
+    return property(wrapper)
 
 def chain_function(*funcs):
     """chain_function.
@@ -306,6 +425,74 @@ def slice_to_list(index: Union[slice, None], length, forward=False):
             current_index += step
         return ret
 
+_dense_dtype = {int: np.int64, float: np.float64}
+_dense_kind = {int: "biu", float: "biuf"}
+
+def dense_buffer(data, content_type) -> np.ndarray:
+    """
+    convert data to the contiguous 1-d numpy buffer used by dense vector
+
+    Parameters
+    ----------
+    data :
+        list / tuple / np.ndarray / iterable of numbers
+    content_type :
+        int or float
+    """
+    if not isinstance(data, (np.ndarray, list, tuple)):
+        data = list(data)
+    buffer = np.asarray(data)
+    if buffer.ndim != 1:
+        raise TypeError("dense vector only support 1-d data, but got data with shape {}".format(buffer.shape))
+    if buffer.size > 0 and buffer.dtype.kind not in _dense_kind[content_type]:
+        raise TypeError("dense vector with content_type {} can not store elements of dtype {}".format(content_type.__name__, buffer.dtype))
+    return np.ascontiguousarray(buffer, dtype=_dense_dtype[content_type])
+
+_columnar_magic = b"\x93ZYTVEC\x01"
+_columnar_dtype = {bool: np.bool_, int: np.int64, float: np.float64}
+
+def _write_npy(fp, array: np.ndarray) -> None:
+    np.lib.format.write_array(fp, np.ascontiguousarray(array), allow_pickle=False)
+
+def _read_npy_header(fp):
+    """
+    read the header of the npy segment at the current position of fp, return (shape, fortran_order, dtype)
+    """
+    version = np.lib.format.read_magic(fp)
+    return getattr(np.lib.format, "read_array_header_{}_{}".format(*version))(fp)
+
+def _write_index_mapping(fp, index_mapping) -> None:
+    """
+    write the index mapping as npy segments: a meta array [kind, domain_size, range_size, start/has_forward, step/has_reverse] followed by the stored maps
+    kind: 0 for identity, 1 for slice, 2 for general mapping
+    """
+    if index_mapping.isidentity:
+        _write_npy(fp, np.array([0, 0, 0, 0, 0], dtype=np.int64))
+    elif index_mapping.isslice:
+        start, step, _ = index_mapping._slice_arguments
+        _write_npy(fp, np.array([1, index_mapping.domain_size, index_mapping.range_size, start, step], dtype=np.int64))
+    else:
+        forward, backward = index_mapping._index_map, index_mapping._index_map_reverse
+        _write_npy(fp, np.array([2, index_mapping.domain_size, index_mapping.range_size, forward is not None, backward is not None], dtype=np.int64))
+        for index_map in (forward, backward):
+            if index_map is not None:
+                _write_npy(fp, IndexMapping._as_array(index_map))
+
+def _read_index_mapping(fp):
+    kind, domain_size, range_size, first, second = np.lib.format.read_array(fp).tolist()
+    if kind == 0:
+        return IndexMapping()
+    if kind == 1:
+        return IndexMapping._from_slice_arguments(first, second, range_size, domain_size)
+    forward = np.lib.format.read_array(fp) if first else None
+    backward = np.lib.format.read_array(fp) if second else None
+    if forward is None:
+        return IndexMapping._from_array(backward, domain_size, range_size, reverse=True)
+    ret = IndexMapping._from_array(forward, domain_size, range_size, reverse=False)
+    if backward is not None:
+        ret._IndexMapping__index_map_reverse = backward
+    return ret
+
 @jit(nopython=True, cache=True)
 def numba_cumsum(x):
     return np.cumsum(x)
@@ -375,11 +562,13 @@ def numba_minimum(x, a):
 
 class IndexMapping:
 
-    def __init__(self, index_map: Union[list, slice]=None, range_size: int=-1, reverse: bool=False):
+    def __init__(self, index_map: Union[list, slice, np.ndarray]=None, range_size: int=-1, reverse: bool=False):
         """
         Paramters:
         -----------
-        index_map: list
+        index_map: list, slice or 1-d integer np.ndarray
+            a slice is kept symbolically as (start, step, length) and never expanded unless the forward map is asked for,
+            other index maps are stored as int64 np.ndarray
         range_size: int
             if reverse is True, range_size means domain size
                 # domain: range_size
@@ -400,20 +589,21 @@ class IndexMapping:
         if isinstance(index_map, slice):
             assert reverse is True
             assert range_size > 0
-            self.slice = slice_complete(index_map, length=range_size)
-            self.__index_map = None
-            self.__index_map_reverse = None
-            self.__domain_size = range_size
-            self.__range_size = slice_length(self.slice)
-            self.__isslice = True
+            index_range = range(*index_map.indices(range_size))
+            if len(index_range) == 0:
+                self.__index_map = None
+                self.__index_map_reverse = np.zeros(0, dtype=np.int64)
+                self.__domain_size = range_size
+                self.__range_size = 0
+                return
+            self.__set_slice(index_range.start, index_range.step, len(index_range), range_size)
             return
-        if isinstance(index_map, vector):
-            index_map = list(index_map)
+        index_map = IndexMapping._as_array(index_map)
         if range_size == -1:
             if len(index_map) == 0:
                 range_size = 0
             else:
-                range_size = max(index_map) + 1
+                range_size = int(index_map.max()) + 1
         if not reverse:
             self.__range_size = range_size
             self.__domain_size = len(index_map)
@@ -427,10 +617,72 @@ class IndexMapping:
             self.__index_map_reverse = index_map
             self.__index_map = None
 
+    def __set_slice(self, start: int, step: int, length: int, domain_size: int) -> None:
+        stop = start + step * length
+        if stop < 0:
+            stop = -1
+        self.slice = slice(start, stop, step)
+        self.__index_map = None
+        self.__index_map_reverse = None
+        self.__domain_size = domain_size
+        self.__range_size = length
+        self.__isslice = True
+
+    @staticmethod
+    def _as_array(index_map) -> np.ndarray:
+        if isinstance(index_map, np.ndarray):
+            return index_map.astype(np.int64, copy=False).reshape(-1)
+        if isinstance(index_map, vector) and index_map.isdense:
+            return index_map.to_numpy().astype(np.int64, copy=False)
+        return np.asarray(list(index_map), dtype=np.int64).reshape(-1)
+
+    @staticmethod
+    def _from_slice_arguments(start: int, step: int, length: int, domain_size: int) -> "IndexMapping":
+        ret = IndexMapping()
+        ret.__set_slice(start, step, length, domain_size)
+        return ret
+
+    @staticmethod
+    def _from_array(index_map: np.ndarray, domain_size: int, range_size: int, reverse: bool) -> "IndexMapping":
+        ret = IndexMapping()
+        ret.__domain_size = domain_size
+        ret.__range_size = range_size
+        if reverse:
+            ret.__index_map_reverse = index_map
+        else:
+            ret.__index_map = index_map
+        return ret
+
     @property
     def isslice(self):
         return self.__isslice
 
+    @property
+    def _slice_arguments(self) -> Tuple[int, int, int]:
+        """
+        (start, step, length) of a slice mapping
+        """
+        return self.slice.start, self.slice.step, self.range_size
+
+    @property
+    def slice_index(self) -> slice:
+        """
+        the slice of a slice mapping which can be directly used to index a sequence of length domain_size
+        """
+        start, step, _ = self._slice_arguments
+        if step < 0 and self.slice.stop < 0:
+            return slice(start, None, step)
+        return slice(start, self.slice.stop, step)
+
+    def _reverse_positions(self) -> np.ndarray:
+        """
+        index_map_reverse as np.ndarray, a slice mapping is expanded
+        """
+        if self.isslice:
+            start, step, length = self._slice_arguments
+            return start + step * np.arange(length, dtype=np.int64)
+        return IndexMapping._as_array(self.index_map_reverse)
+
     def reverse(self):
         if self.isidentity:
             return self
@@ -442,13 +694,17 @@ class IndexMapping:
             ret.__domain_size = self.__range_size
             return ret
         else:
-            ret = IndexMapping(slice_to_list(self.slice, self.domain_size), range_size=self.domain_size, reverse=True, isslice=False)
-            return ret.reverse()
+            ret = IndexMapping()
+            ret.__index_map = self._reverse_positions()
+            ret.__index_map_reverse = self.__index_map
+            ret.__range_size = self.__domain_size
+            ret.__domain_size = self.__range_size
+            return ret
 
     @staticmethod
     def from_slice(index: slice, length, tolist=False):
         if tolist:
-            return IndexMapping(slice_to_list(index, length), range_size=length, reverse=True)
+            return IndexMapping(np.arange(length, dtype=np.int64)[index], range_size=length, reverse=True)
         else:
             return IndexMapping(index, range_size=length, reverse=True)
 
@@ -471,9 +727,10 @@ class IndexMapping:
         return self.__index_map_reverse
 
     @property
-    def index_map(self) -> Union[list, None]:
+    def index_map(self) -> Union[np.ndarray, None]:
         if self.isslice:
-            self.__index_map = slice_to_list(self.slice, length=self.domain_size, forward=True)
+            if self.__index_map is None:
+                self.__index_map = self._reverse_mapping(self.slice_index, range_size=self.domain_size)
             return self._index_map
         if self._index_map is None and self._index_map_reverse is None:
             return None
@@ -484,7 +741,7 @@ class IndexMapping:
             return self._index_map
 
     @property
-    def index_map_reverse(self) -> Union[list, slice, None]:
+    def index_map_reverse(self) -> Union[np.ndarray, slice, None]:
         if self._index_map is None and self._index_map_reverse is None:
             return None
         if self._index_map_reverse is not None:
@@ -494,48 +751,41 @@ class IndexMapping:
             return self._index_map_reverse
 
     def map(self, other):
+        """
+        compose two index mappings: self maps [domain] -> [range], other maps [range] -> [new range].
+        mappings are treated as immutable, so the result may share storage with self or other.
+        composition of two slice mappings is a slice mapping and costs O(1).
+        """
         assert isinstance(other, IndexMapping)
         if self.isidentity:
-            return copy.deepcopy(other)
+            return other
         if other.isidentity:
-            return copy.deepcopy(self)
+            return self
         assert self.range_size == other.domain_size
         if self.range_size == 0 or other.range_size == 0:
             return IndexMapping([], range_size=self.domain_size, reverse=True)
-        if self._index_map is not None and other._index_map is not None:
-            forward = True
-        elif self._index_map_reverse is not None and other._index_map_reverse is not None:
-            forward = False
-        elif self._index_map is not None and other._index_map_reverse is not None:
-            forward = True
-        elif self._index_map_reverse is not None and other._index_map is not None:
-            forward = False
-
-        if forward:
-            temp = [-1] * self.domain_size
-            for index, to in enumerate(self.index_map):
-                if 0 <= to < other.domain_size:
-                    temp[index] = other.index_map[to]
-            return IndexMapping(temp, range_size=other.range_size, reverse=False)
-        elif self.isslice and other.isslice:
-            start = self.slice.start + self.slice.step * other.slice.start
-            stop = self.slice.start + self.slice.step * other.slice.stop
-            step = self.slice.step * other.slice.step
-            return IndexMapping(slice(start, stop, step), range_size=self.domain_size, reverse=True)
-        elif self.isslice and not other.isslice:
-            temp = [-1] * other.range_size
-            for index, to in enumerate(other.index_map_reverse):
-                if 0 <= to < self.range_size:
-                    temp[index] = self.slice.start + self.slice.step * to
-            return IndexMapping(temp, range_size=self.domain_size, reverse=True)
-        elif not self.isslice and other.isslice:
-            return IndexMapping(self.index_map_reverse[other.slice], range_size=self.domain_size, reverse=True)
+        if self.isslice and other.isslice:
+            start, step, _ = self._slice_arguments
+            other_start, other_step, other_length = other._slice_arguments
+            return IndexMapping._from_slice_arguments(start + step * other_start, step * other_step, other_length, self.domain_size)
+        if not self.isslice and self._index_map is not None and not other.isslice:
+            forward = IndexMapping._as_array(self.index_map)
+            other_forward = IndexMapping._as_array(other.index_map)
+            temp = np.full(self.domain_size, -1, dtype=np.int64)
+            valid = (forward >= 0) & (forward < other.domain_size)
+            temp[valid] = other_forward[forward[valid]]
+            return IndexMapping._from_array(temp, self.domain_size, other.range_size, reverse=False)
+        if other.isslice:
+            return IndexMapping._from_array(IndexMapping._as_array(self.index_map_reverse)[other.slice_index].copy(), self.domain_size, other.range_size, reverse=True)
+        other_reverse = other._reverse_positions()
+        temp = np.full(other.range_size, -1, dtype=np.int64)
+        valid = (other_reverse >= 0) & (other_reverse < self.range_size)
+        if self.isslice:
+            start, step, _ = self._slice_arguments
+            temp[valid] = start + step * other_reverse[valid]
         else:
-            temp = [-1] * other.range_size
-            for index, to in enumerate(other.index_map_reverse):
-                if 0 <= to < self.range_size:
-                    temp[index] = self.index_map_reverse[to]
-            return IndexMapping(temp, range_size=self.domain_size, reverse=True)
+            temp[valid] = IndexMapping._as_array(self.index_map_reverse)[other_reverse[valid]]
+        return IndexMapping._from_array(temp, self.domain_size, other.range_size, reverse=True)
 
     def copy(self):
         return copy.deepcopy(self)
@@ -543,16 +793,16 @@ class IndexMapping:
     @staticmethod
     def _reverse_mapping(mapping, range_size=0):
         if isinstance(mapping, slice):
-            return slice_to_list(mapping, range_size, forward=True)
+            mapping = np.arange(range_size, dtype=np.int64)[mapping]
+        mapping = IndexMapping._as_array(mapping)
         if len(mapping) == 0:
-            return [-1] * range_size
-        range_size = max(range_size, max(mapping) + 1)
-        ret = [-1] * range_size
-        for index, to in enumerate(mapping):
-            if to == -1:
-                continue
-            assert ret[to] == -1
-            ret[to] = index
+            return np.full(range_size, -1, dtype=np.int64)
+        range_size = max(range_size, int(mapping.max()) + 1)
+        ret = np.full(range_size, -1, dtype=np.int64)
+        valid = np.flatnonzero(mapping != -1)
+        targets = mapping[valid]
+        ret[targets] = valid
+        assert np.count_nonzero(ret != -1) == len(valid)
         return ret
 
     @property
@@ -572,35 +822,44 @@ class IndexMapping:
         return self.__str__()
 
     def check_valid(self):
+        if self.isslice:
+            return True
         if self._index_map is None:
             return True
         if self._index_map_reverse is None:
             return True
-        for index, to in enumerate(self._index_map):
-            if to != -1:
-                if self._index_map_reverse[to] != index:
-                    return False
-        for index, to in enumerate(self._index_map):
-            if to != -1:
-                if self._index_map[to] != index:
-                    return False
+        forward = IndexMapping._as_array(self._index_map)
+        backward = IndexMapping._as_array(self._index_map_reverse)
+        for source, target in ((forward, backward), (backward, forward)):
+            valid = np.flatnonzero(source != -1)
+            if np.any(source[valid] >= len(target)):
+                return False
+            if np.any(target[source[valid]] != valid):
+                return False
         return True
 
     def __getitem__(self, index):
-        assert isinstance(index, int)
+        assert isinstance(index, (int, np.integer))
         if self.isidentity:
             return index
         if self.range_size == 0:
             return -1
+        if index < 0 or index >= self.domain_size:
+            return -1
         if self.isslice:
-            return self.index_map[index]
+            start, step, length = self._slice_arguments
+            offset = index - start
+            if offset % step != 0 or not 0 <= offset // step < length:
+                return -1
+            return offset // step
         if self._index_map is None:
             if self.domain_size > self.range_size * 4:
-                return self._index_map_reverse.index(index)
-        return self.index_map[index]
+                position = np.flatnonzero(IndexMapping._as_array(self._index_map_reverse) == index)
+                return int(position[0]) if len(position) > 0 else -1
+        return int(self.index_map[index])
 
     def reverse_getitem(self, index: int) -> int:
-        assert isinstance(index, int)
+        assert isinstance(index, (int, np.integer))
         if index < 0 or index >= self.range_size:
             return -1
         if self.isidentity:
@@ -609,9 +868,32 @@ class IndexMapping:
             return self.slice.start + self.slice.step * index
         if self._index_map_reverse is None:
             if self.range_size > self.domain_size * 4:
-                return self._index_map.index(index)
-        return self.index_map_reverse[index]
+                position = np.flatnonzero(IndexMapping._as_array(self._index_map) == index)
+                return int(position[0]) if len(position) > 0 else -1
+        return int(self.index_map_reverse[index])
 
+def indexed_search_function(search: Callable) -> Callable:
+    """
+    wrap search(index: SearchIndex, query) -> (positions, scores) into search_func(candidate, query) used by vector.function_search.
+    the SearchIndex over candidate is built at the first non-empty query and reused as long as the same candidate is passed,
+    so an interactive search session only builds it once.
+    if scores is None, the selected candidates themselves are returned, otherwise the scores are returned.
+    """
+    cache = dict()
+
+    def search_func(candidate, query):
+        if len(query) == 0:
+            return candidate
+        if cache.get("candidate", None) is not candidate:
+            cache["candidate"] = candidate
+            cache["index"] = SearchIndex(candidate)
+        positions, scores = search(cache["index"], query)
+        index_mapping = IndexMapping(positions, range_size=candidate.length, reverse=True)
+        if scores is None:
+            return candidate.map_index(index_mapping)
+        return vector(scores.tolist(), index_mapping=candidate.index_mapping.map(index_mapping))
+
+    return search_func
 
 class vector(list):
     """vector
@@ -646,6 +928,9 @@ class vector(list):
         vec = vector([1,2,3])
         vec = vector((1,2,3))
         will all get [1,2,3]
+
+        vec = vector([1,2,3], content_type=float)
+        will get a dense vector [1.0,2.0,3.0] backed by a numpy buffer
         """
         self._recursive=recursive
         self.allow_undefined_value = allow_undefined_value
@@ -659,6 +944,17 @@ class vector(list):
             self._index_mapping = index_mapping
         else:
             self._index_mapping = IndexMapping()
+        if self.isdense:
+            if len(args) == 1 and args[0] is None:
+                args = tuple()
+            data = args[0] if len(args) == 1 and iterable(args[0]) else args
+            if isinstance(data, vector):
+                self._index_mapping = data._index_mapping
+                if data.isdense:
+                    data = data.to_numpy()
+            buffer = self._set_cache("numpy", dense_buffer(data, content_type))
+            list.__init__(self, buffer.tolist())
+            return
         if len(args) == 0:
             list.__init__(self)
         elif len(args) == 1:
@@ -874,16 +1170,35 @@ class vector(list):
         return self.filter(lambda x: not touch(lambda: (func(x), True)[-1], False))
 
     def map_async(self, func, processes=None, split_tuple=None) -> "vector":
-        if split_tuple is None:
-            split_tuple = _need_split_tuple(func)
-        if not split_tuple:
-            with multiprocessing.Pool(processes) as pool:
-                return vector(pool.map_async(func, self).get())
+        """
+        map with the persistent process pool, equivalent to
+        self.map(func, workers=processes, backend="process", split_tuple=split_tuple)
+        """
+        return self.map(func, split_tuple=split_tuple, workers=processes if processes else -1, backend="process")
+
+    def _parallel_map(self, func, default, split_tuple, filter_function, processing_bar, workers, backend, chunksize) -> list:
+        from .parallel import parallel_map, ParallelFailure
+        content = list(super().__iter__())
+        if filter_function is None:
+            selected = range(len(content))
         else:
-            with multiprocessing.Pool(processes) as pool:
-                return vector(pool.starmap_async(func, self).get())
+            selected = [index for index, a in enumerate(content) if filter_function(index, a)]
+        results = parallel_map(func, [content[index] for index in selected], workers=workers, backend=backend, chunksize=chunksize, split_tuple=split_tuple, processing_bar=processing_bar)
+        ret = content if filter_function is not None else [None] * len(content)
+        for index, result in zip(selected, results):
+            if isinstance(result, ParallelFailure):
+                if isinstance(default, EmptyClass):
+                    try:
+                        error_information = "Error info: {}. ".format(result.error) + "\nException raised in map function at location [{}] for element [{}] with function [{}]".format(index, content[index], func)
+                    except:
+                        error_information = "Error info: {}. ".format(result.error) + "\nException raised in map function at location [{}] for element [{}] with function [{}]".format(index, "<unknown>", func)
+                    error_information += "\n" + "-" * 50 + "\n" + result.trace + "-" * 50
+                    raise RuntimeError(error_information)
+                result = default
+            ret[index] = result
+        return ret
 
-    def map(self, func: Callable, *args, func_self=None, default=NoDefault, processing_bar=False, register_result=False, split_tuple=None, filter_function=None) -> "vector":
+    def map(self, func: Callable, *args, func_self=None, default=NoDefault, processing_bar=False, register_result=False, split_tuple=None, filter_function=None, workers=None, backend="thread", chunksize=None) -> "vector":
         """
         generate a new vector with each element x are replaced with func(x)
 
@@ -908,11 +1223,19 @@ class vector(list):
                        2. v.map(lambda x: x + 1, register_result="plus 1")
         filter_function:
             if filter_function(index, element) is False, map will not be executed.
+        workers:
+            if workers is not None, func is executed in parallel by a persistent pool with `workers` workers (non-positive value means all cores).
+            results are kept in order, default / filter_function / processing_bar have the same meaning.
+        backend:
+            "thread" or "process", the kind of pool used when workers is set. for "process", func and elements should be picklable.
+        chunksize:
+            number of elements sent to a worker at once when workers is set.
 
         Example:
         ----------
         vector([0, 1, 2]).map(lambda x: x ** 2)
         will produce[0, 1, 4]
+        vector(file_list).map(extract_feature, workers=8, backend="process")
         """
         if func is None:
             return self
@@ -939,29 +1262,16 @@ class vector(list):
             func = chain_function((func, *args))
             def new_func(x):
                 return func(x, input_from_self)
+        if workers is not None:
+            ret = vector(self._parallel_map(new_func, default, split_tuple and self.check_type(tuple), filter_function, processing_bar, workers, backend, chunksize), recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
+            if register_result is True:
+                self.__map_register[(func, *args, default, filter_function)] = ret
+            elif isinstance(register_result, str) and register_result:
+                self.__map_register[register_result] = ret
+            return ret
         if not isinstance(default, EmptyClass):
-            if filter_function is None:
-                if processing_bar:
-                    if split_tuple and self.check_type(tuple):
-                        ret = vector([touch(lambda: new_func(*a), default=default) for a in tqdm(super().__iter__(), total=self.length)], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-                    else:
-                        ret = vector([touch(lambda: new_func(a), default=default) for a in tqdm(super().__iter__(), total=self.length)], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-                else:
-                    if split_tuple and self.check_type(tuple):
-                        ret = vector([touch(lambda: new_func(*a), default=default) for a in super().__iter__()], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-                    else:
-                        ret = vector([touch(lambda: new_func(a), default=default) for a in super().__iter__()], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-            else:
-                if processing_bar:
-                    if split_tuple and self.check_type(tuple):
-                        ret = vector([touch(lambda: new_func(*a), default=default) if filter_function(index, a) else a for index, a in tqdm(enumerate(super().__iter__()), total=self.length)], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-                    else:
-                        ret = vector([touch(lambda: new_func(a), default=default) if filter_function(index, a) else a for index, a in tqdm(enumerate(super().__iter__()), total=self.length)], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-                else:
-                    if split_tuple and self.check_type(tuple):
-                        ret = vector([touch(lambda: new_func(*a), default=default) if filter_function(index, a) else a for index, a in enumerate(super().__iter__())], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
-                    else:
-                        ret = vector([touch(lambda: new_func(a), default=default) if filter_function(index, a) else a for index, a in enumerate(super().__iter__())], recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
+            content = tqdm(super().__iter__(), total=self.length) if processing_bar else super().__iter__()
+            ret = vector(_map_with_default(new_func, content, default, split_tuple and self.check_type(tuple), filter_function), recursive=self._recursive, index_mapping=self.index_mapping, allow_undefined_value=self.allow_undefined_value)
             if register_result is True:
                 self.__map_register[(func, *args, default, filter_function)] = ret
             elif isinstance(register_result, str) and register_result:
@@ -1113,12 +1423,11 @@ class vector(list):
             def new_func(x):
                 return func(x, input_from_self)
         if not isinstance(default, EmptyClass):
-            if processing_bar:
-                for index in trange(self.length):
-                    self[index] = touch(lambda: new_func(self[index]), default=default)
-            else:
-                for index in range(self.length):
-                    self[index] = touch(lambda: new_func(self[index]), default=default)
+            for index in (trange(self.length) if processing_bar else range(self.length)):
+                try:
+                    self[index] = new_func(self[index])
+                except Exception:
+                    self[index] = default
             return
         try:
             if processing_bar:
@@ -1337,37 +1646,35 @@ class vector(list):
     def element_type(self):
         if self.length == 0:
             return None
-        if hasattr(self, "_vector__type"):
-            return self.__type
+        ret = self._get_cache("type", _Uncached)
+        if ret is not _Uncached:
+            return ret
         def add_element(x, y):
             x.add(type(y))
             return x
         ret = self.reduce(add_element, first=set())
         if len(ret) == 0:
-            self.__type == None
+            return self._set_cache("type", None)
         elif len(ret) == 1:
-            self.__type = ret.pop()
-        else:
-            self.__type = ret
-        return self.__type
+            return self._set_cache("type", ret.pop())
+        return self._set_cache("type", ret)
 
     @property
     def element_type_recursive(self):
         if self.length == 0:
             return None
-        if hasattr(self, "_vector__type_recursive"):
-            return self.__type_recursive
+        ret = self._get_cache("type_recursive", _Uncached)
+        if ret is not _Uncached:
+            return ret
         def add_element(x, y):
             x.add(type(y))
             return x
         ret = self.reduce(add_element, first=set(), recursive=True)
         if len(ret) == 0:
-            self.__type_recursive == None
+            return self._set_cache("type_recursive", None)
         elif len(ret) == 1:
-            self.__type_recursive = ret.pop()
-        else:
-            self.__type_recursive = ret
-        return self.__type_recursive
+            return self._set_cache("type_recursive", ret.pop())
+        return self._set_cache("type_recursive", ret)
 
     def check_type(self, instance, recursive=False) -> bool:
         """check_type
@@ -1381,7 +1688,7 @@ class vector(list):
         if self.length == 0:
             return False
         if not recursive:
-            if not hasattr(self, "_vector__type"):
+            if self._get_cache("type", _Uncached) is _Uncached:
                 if not isinstance(super(vector, self).__getitem__(0), instance):
                     return False
         if not recursive:
@@ -1397,6 +1704,72 @@ class vector(list):
             return True
         return instance in element_type.__mro__
 
+    @property
+    def isdense(self) -> bool:
+        """
+        whether the vector is a dense numeric vector, i.e. content_type is int or float.
+        dense vector keeps a contiguous numpy buffer and numeric methods run on the buffer directly.
+        """
+        content_type = getattr(self, "content_type", NoDefault)
+        return content_type is int or content_type is float
+
+    def dense(self, content_type=None) -> "vector":
+        """
+        get the dense version of the vector (see isdense)
+
+        Parameters
+        ----------
+        content_type :
+            int / float / None, if None, it will be infered from element_type
+
+        Example
+        ----------
+        vector(1, 2, 3.5).dense()
+        will produce dense vector [1.0, 2.0, 3.5]
+        """
+        if content_type is None:
+            if self.isdense:
+                return self
+            element_type = self.element_type
+            if element_type is None:
+                content_type = float
+            else:
+                element_type = element_type if isinstance(element_type, set) else {element_type}
+                if all(int in t.__mro__ for t in element_type):
+                    content_type = int
+                elif all(int in t.__mro__ or float in t.__mro__ for t in element_type):
+                    content_type = float
+                else:
+                    raise TypeError("only vector of int / float can be dense, but element_type is {}".format(self.element_type))
+        if content_type is getattr(self, "content_type", NoDefault):
+            return self
+        return vector(self, content_type=content_type, recursive=self._recursive)
+
+    def _dense_operand(self, other):
+        """
+        numpy buffer of other if binary operation between self and other can run on the dense buffer, else None
+        """
+        if not self.isdense:
+            return None
+        if isinstance(other, (int, float, np.number)):
+            return other
+        if isinstance(other, vector) and other.isdense and other.length == self.length:
+            return other.to_numpy()
+        if isinstance(other, np.ndarray) and other.ndim == 1 and len(other) == self.length and other.dtype.kind in "biuf":
+            return other
+        return None
+
+    @staticmethod
+    def _from_buffer(buffer, index_mapping=IndexMapping()) -> "vector":
+        """
+        wrap numpy buffer into a dense vector (or a vector of bool with buffer cached)
+        """
+        if buffer.dtype.kind == "b":
+            ret = vector(buffer.tolist(), index_mapping=index_mapping)
+            ret._set_cache("numpy", buffer)
+            return ret
+        return vector(buffer, content_type=float if buffer.dtype.kind == "f" else int, index_mapping=index_mapping)
+
     @property
     def enumerate(self) -> "vector":
         return vector(enumerate(self))
@@ -1575,6 +1948,8 @@ class vector(list):
         other : list
             other
         """
+        if self.isdense and isinstance(other, vector) and other.content_type is self.content_type:
+            return vector(np.concatenate([self.to_numpy(), other.to_numpy()]), content_type=self.content_type)
         return vector(super().__add__(other))
 
     def __radd__(self, left) -> "vector":
@@ -1609,6 +1984,8 @@ class vector(list):
         other :
             other
         """
+        if (operand:= self._dense_operand(other)) is not None:
+            return vector._from_buffer(np.equal(self.to_numpy(), operand))
         if isinstance(other, list):
             return vector(zip(self, other)).map(lambda x: x[0] == x[1])
         else:
@@ -1635,6 +2012,8 @@ class vector(list):
         element :
             element
         """
+        if (operand:= self._dense_operand(element)) is not None:
+            return vector._from_buffer(np.less(self.to_numpy(), operand))
         if isinstance(element, list):
             return vector(zip(self, element)).map(lambda x: x[0] < x[1])
         else:
@@ -1648,6 +2027,8 @@ class vector(list):
         element :
             element
         """
+        if (operand:= self._dense_operand(element)) is not None:
+            return vector._from_buffer(np.greater(self.to_numpy(), operand))
         if isinstance(element, list):
             return vector(zip(self, element)).map(lambda x: x[0] > x[1])
         else:
@@ -1661,10 +2042,12 @@ class vector(list):
         element :
             element
         """
+        if (operand:= self._dense_operand(element)) is not None:
+            return vector._from_buffer(np.less_equal(self.to_numpy(), operand))
         if isinstance(element, list):
             return vector(zip(self, element)).map(lambda x: x[0] <= x[1])
         else:
-            return self.map(lambda x: x < element)
+            return self.map(lambda x: x <= element)
 
     def __ge__(self, element) -> "vector":
         """__ge__.
@@ -1674,6 +2057,8 @@ class vector(list):
         element :
             element
         """
+        if (operand:= self._dense_operand(element)) is not None:
+            return vector._from_buffer(np.greater_equal(self.to_numpy(), operand))
         if isinstance(element, list):
             return vector(zip(self, element)).map(lambda x: x[0] >= x[1])
         else:
@@ -1703,24 +2088,13 @@ class vector(list):
         if isinstance(index, list):
             if self.length == 0:
                 return vector()
-            if len(self) != len(index) and vector(index).check_type(int) and vector(index).all(lambda x: -self.length <= x < self.length):
-                index = vector(index).map(lambda x: x if x >= 0 else x + self.length)
-                return self.map_index(IndexMapping(index, self.length, True))
-            elif len(self) == len(index):
-                if vector(index).all(lambda x: 0 <= int(x) <= 1):
-                    return vector(zip(self, index), recursive=self._recursive, allow_undefined_value=self.allow_undefined_value).filter(lambda x: x[1]).map(lambda x: x[0])
-                elif vector(index).check_type(int) and vector(index).all(lambda x: -self.length <= x < self.length):
-                    index = vector(index).map(lambda x: x if x >= 0 else x + self.length)
-                    return self.map_index(IndexMapping(index, self.length, True))
-            raise RuntimeError()
+            return self.map_index(IndexMapping(self._selected_positions(index), self.length, True))
         if isinstance(index, np.ndarray) and len(index.shape) == 1:
-            assert len(self) == len(index)
-            return vector(zip(self, index), recursive=self._recursive, allow_undefined_value=self.allow_undefined_value).filter(lambda x: x[1]).map(lambda x: x[0])
+            return self.map_index(IndexMapping(self._selected_positions(index), self.length, True))
         if str_type(index) == "torch.Tensor":
             import torch
             if isinstance(index, torch.Tensor) and len(index.shape) == 1:
-                assert len(self) == len(index)
-                return vector(zip(self, index), recursive=self._recursive, allow_undefined_value=self.allow_undefined_value).filter(lambda x: x[1]).map(lambda x: x[0])
+                return self.map_index(IndexMapping(self._selected_positions(index.detach().cpu().numpy()), self.length, True))
         if isinstance(index, tuple):
             if len(index) == 0:
                 return vector()
@@ -1746,6 +2120,40 @@ class vector(list):
             return vector([self])
         return super().__getitem__(index)
 
+    def _selected_positions(self, index) -> np.ndarray:
+        """
+        positions selected by a 1-d mask or integer index, validated in one vectorized pass
+
+        Parameters
+        ----------
+        index : list, vector or np.ndarray
+            a boolean mask, or a 0/1 mask of the same length as self, is converted to the positions of its true elements;
+            otherwise integer index (negative index counts from the end) is returned with negative index wrapped
+        """
+        if isinstance(index, vector) and index._get_cache("numpy") is not None:
+            index = index.to_numpy()
+        elif isinstance(index, list) and len(index) == self.length and len(index) > 0 and type(index[0]) is bool:
+            index = np.fromiter(index, dtype=np.bool_, count=len(index))
+        else:
+            index = np.asarray(index)
+        if index.ndim != 1:
+            raise RuntimeError("index should be 1-d, but got shape {}".format(index.shape))
+        if len(index) == 0:
+            return np.zeros(0, dtype=np.int64)
+        if index.dtype == np.bool_:
+            if len(index) != self.length:
+                raise RuntimeError("length of mask ({}) doesn't match length of vector ({})".format(len(index), self.length))
+            return np.flatnonzero(index)
+        if np.issubdtype(index.dtype, np.integer):
+            if len(index) == self.length and np.all((index == 0) | (index == 1)):
+                return np.flatnonzero(index)
+            if np.any((index < -self.length) | (index >= self.length)):
+                raise RuntimeError("index out of range for vector of length {}".format(self.length))
+            return np.where(index < 0, index + self.length, index)
+        if np.issubdtype(index.dtype, np.number) and len(index) == self.length:
+            return np.flatnonzero(index)
+        raise RuntimeError("unsupported index of dtype {}".format(index.dtype))
+
     def select_index(self, index_list) -> "vector":
         return self.map_index(IndexMapping(index_list, self.length, True))
 
@@ -1827,10 +2235,10 @@ class vector(list):
         """ishashable.
         chech whether every element in the vector is hashable
         """
-        if hasattr(self, "_vector__hashable"):
-            return self.__hashable
-        self.__hashable = self.all(hashable)
-        return self.__hashable
+        ret = self._get_cache("hashable")
+        if ret is not None:
+            return ret
+        return self._set_cache("hashable", self.all(hashable))
 
     def __hash__(self):
         """__hash__.
@@ -1839,7 +2247,10 @@ class vector(list):
         if not self.ishashable():
             raise Exception("not all elements in the vector is hashable, the index of first unhashable element is %d" % self.index(lambda x: not hashable(x)))
         else:
-            return hash(tuple(self))
+            ret = self._get_cache("hash")
+            if ret is None:
+                ret = self._set_cache("hash", hash(tuple(self)))
+            return ret
 
     def combinations(self, L):
         import itertools
@@ -1856,7 +2267,12 @@ class vector(list):
         """
         if len(self) == 0:
             return vector([], recursive=False)
+        if key is None:
+            unique_elements = self._get_cache("unique")
+            if unique_elements is not None:
+                return vector(unique_elements, recursive=False)
         hashable = self.ishashable()
+        default_key = key is None
         if key is not None:
             hashable = isinstance(key(self[0]), Hashable)
         else:
@@ -1868,6 +2284,8 @@ class vector(list):
             if key(x) not in explored:
                 unique_elements.append(x)
                 pushfunc(key(x))
+        if default_key:
+            self._set_cache("unique", unique_elements)
         return vector(unique_elements, recursive=False)
 
     def count_all(self) -> Counter:
@@ -1881,11 +2299,14 @@ class vector(list):
         """
         if len(self) == 0:
             return Counter()
-        hashable = self.ishashable()
-        if hashable:
-            return Counter(self)
-        else:
-            return Counter(dict(self.unique().map(lambda x: (x, self.count(x)))))
+        ret = self._get_cache("count_all")
+        if ret is None:
+            if self.ishashable():
+                ret = Counter(self)
+            else:
+                ret = Counter(dict(self.unique().map(lambda x: (x, self.count(x)))))
+            self._set_cache("count_all", ret)
+        return Counter(ret)
 
     def count(self, *args) -> int:
         """count.
@@ -2008,7 +2429,7 @@ class vector(list):
                 return True
         return False
 
-    def max(self, key=None, with_index=False, recursive=False):
+    def max(self, key=None, with_index=False, recursive=False, dim=None):
         """max.
 
         Parameters
@@ -2017,17 +2438,24 @@ class vector(list):
             key
         with_index :
             with_index
+        dim :
+            for a regular nested vector, the max along dim as a vector (with the vector of indices if with_index)
         """
         if len(self) == 0:
             return None
+        if self._is_dim_reduce(dim):
+            ret = self._reduce_dim(dim, lambda array, dim: array.max(axis=dim) if key is None else None, lambda x: x.max(key=key))
+            if with_index:
+                return ret, self.argmax(dim=dim, key=key)
+            return ret
         if recursive:
             return self.flatten().max(key=key, with_index=False)
         if key is None and not with_index:
-            if hasattr(self, "_vector__max"):
-                return self.__max
-            if self.check_type(int) or self.check_type(float):
-                self.__max = numba_max(np.array(self))
-                return self.__max
+            ret = self._get_cache("max", _Uncached)
+            if ret is not _Uncached:
+                return ret
+            if self.isdense or self.check_type(int) or self.check_type(float):
+                return self._set_cache("max", numba_max(self.to_numpy()))
         m_index = 0
         m_key = self._transform(self[0], key)
         for index in range(1, len(self)):
@@ -2036,13 +2464,13 @@ class vector(list):
                 m_key = i_key
                 m_index = index
         if key is None:
-            self.__max = self[m_index]
+            self._set_cache("max", self[m_index])
         if with_index:
             return self[m_index], m_index
         return self[m_index]
 
 
-    def min(self, key=None, with_index=False, recursive=False):
+    def min(self, key=None, with_index=False, recursive=False, dim=None):
         """min.
 
         Parameters
@@ -2051,17 +2479,24 @@ class vector(list):
             key
         with_index :
             with_index
+        dim :
+            for a regular nested vector, the min along dim as a vector (with the vector of indices if with_index)
         """
         if len(self) == 0:
             return None
+        if self._is_dim_reduce(dim):
+            ret = self._reduce_dim(dim, lambda array, dim: array.min(axis=dim) if key is None else None, lambda x: x.min(key=key))
+            if with_index:
+                return ret, self.argmin(dim=dim, key=key)
+            return ret
         if recursive:
             return self.flatten().min(key=key, with_index=False)
         if key is None and not with_index:
-            if hasattr(self, "_vector__min"):
-                return self.__min
-            if self.check_type(int) or self.check_type(float):
-                self.__min = numba_min(np.array(self))
-                return self.__min
+            ret = self._get_cache("min", _Uncached)
+            if ret is not _Uncached:
+                return ret
+            if self.isdense or self.check_type(int) or self.check_type(float):
+                return self._set_cache("min", numba_min(self.to_numpy()))
         m_index = 0
         m_key = self._transform(self[0], key)
         for index in range(1, len(self)):
@@ -2073,7 +2508,82 @@ class vector(list):
             return self[m_index], m_index
         return self[m_index]
 
+    def argmax(self, dim=None, key=None):
+        """argmax.
+        index of the max element, or for a regular nested vector and dim given, the vector of indices of the max along dim
+
+        Parameters
+        ----------
+        dim :
+            dim
+        key :
+            key
+        """
+        if self._is_dim_reduce(dim):
+            return self._reduce_dim(dim, lambda array, dim: array.argmax(axis=dim) if key is None else None, lambda x: x.max(key=key, with_index=True)[1])
+        if len(self) == 0:
+            return None
+        return self.max(key=key, with_index=True)[1]
+
+    def argmin(self, dim=None, key=None):
+        """argmin.
+        index of the min element, or for a regular nested vector and dim given, the vector of indices of the min along dim
+
+        Parameters
+        ----------
+        dim :
+            dim
+        key :
+            key
+        """
+        if self._is_dim_reduce(dim):
+            return self._reduce_dim(dim, lambda array, dim: array.argmin(axis=dim) if key is None else None, lambda x: x.min(key=key, with_index=True)[1])
+        if len(self) == 0:
+            return None
+        return self.min(key=key, with_index=True)[1]
+
+    def _is_dim_reduce(self, dim) -> bool:
+        return dim is not None and self.shape is not None and self.ndim > 1
+
+    def _reduce_dim(self, dim, numpy_reduce, slice_reduce) -> "vector":
+        """_reduce_dim.
+        reduce a regular nested vector along dim, the result has the shape of self without dim.
+        numeric content is reduced at once by numpy_reduce(array, dim) on the flat buffer of self.strided(),
+        otherwise (or if numpy_reduce returns None) slice_reduce is applied to the vector of each slice along dim.
+
+        Parameters
+        ----------
+        dim :
+            dim
+        numpy_reduce :
+            numpy_reduce
+        slice_reduce :
+            slice_reduce
+        """
+        if dim < 0:
+            dim = self.ndim + dim
+        assert 0 <= dim < self.ndim
+        layout = self.strided()
+        try:
+            array = np.array(layout.buffer)
+        except ValueError:
+            array = None
+        if array is not None and array.ndim == 1 and array.dtype.kind in "biuf":
+            ret = numpy_reduce(array.reshape(layout.shape), dim)
+            if ret is not None:
+                return strided_vector(ret.ravel().tolist(), ret.shape).tovector()
+        shape = layout.shape[:dim] + layout.shape[dim + 1:]
+        n = layout.shape[dim]
+        buffer = layout.permute(*[d for d in range(self.ndim) if d != dim], dim).tolist()
+        count = reduce(lambda x, y: x * y, shape, 1)
+        return strided_vector([slice_reduce(vector(buffer[i * n:(i + 1) * n])) for i in range(count)], shape).tovector()
+
     def map_numba_function(self, numba_function, *args) -> "vector":
+        if self.isdense:
+            ret = numba_function(self.to_numpy(), *args)
+            if isinstance(ret, np.ndarray):
+                return vector._from_buffer(ret)
+            return ret
         assert self.check_type(int, recursive=True) or self.check_type(float, recursive=True)
         ret = numba_function(self.to_numpy(), *args)
         if isinstance(ret, np.ndarray):
@@ -2139,22 +2649,14 @@ class vector(list):
         if dim is None or self.shape is None or self.ndim <= 1:
             if self.length == 0:
                 return default
-            if hasattr(self, "_vector__sum"):
-                return self.__sum
-            if self.check_type(int) or self.check_type(float):
-                self.__sum = numba_sum(self.to_numpy())
-            else:
-                self.__sum = self.reduce(lambda x, y: x + y, default)
-            return self.__sum
+            ret = self._get_cache("sum", _Uncached)
+            if ret is not _Uncached:
+                return ret
+            if self.isdense or self.check_type(int) or self.check_type(float):
+                return self._set_cache("sum", numba_sum(self.to_numpy()))
+            return self._set_cache("sum", self.reduce(lambda x, y: x + y, default))
         else:
-            if dim < 0:
-                dim = self.ndim + dim
-            assert 0 <= dim < self.ndim
-            new_shape = tuple([*self.shape[:dim], *self.shape[dim + 1:]])
-            ret = vector.constant_vector(None, new_shape)
-            for index in self.meshgrid(new_shape):
-                ret[index] = self[tuple([*index[:dim], slice(None, None, None), *index[dim:]])].sum()
-            return ret
+            return self._reduce_dim(dim, lambda array, dim: array.sum(axis=dim) if _int_sum_is_exact(array, array.shape[dim]) else None, lambda x: x.reduce(lambda a, b: a + b, default))
 
     def mean(self, dim=None, default=NoDefault):
         if self.length == 0:
@@ -2163,29 +2665,33 @@ class vector(list):
             return default
         if dim is None:
             return self.sum() / self.length
-        else:
-            ret = self.sum(dim=dim)
-            N = self.shape[dim]
-            return ret.rmap(lambda x: x / N)
+        if self._is_dim_reduce(dim):
+            return self._reduce_dim(dim, lambda array, dim: array.mean(axis=dim), lambda x: x.mean())
+        ret = self.sum(dim=dim)
+        N = self.shape[dim]
+        return ret.rmap(lambda x: x / N)
 
-    def variance(self, default=NoDefault) -> float:
+    def variance(self, default=NoDefault, dim=None) -> float:
         if self.length == 0:
             if isinstance(default, EmptyClass):
                 raise TypeError("vector is empty, plz set default to prevent error")
             return default
-        if hasattr(self, "_vector__variance"):
-            return self.__variance
-        if self.check_type(int) or self.check_type(float):
-            self.__variance = numba_variance(np.array(self))
-        else:
-            self.__variance = self.map(lambda x: x ** 2).mean() - (self.mean()) ** 2
-        return self.__variance
+        if self._is_dim_reduce(dim):
+            return self._reduce_dim(dim, lambda array, dim: array.var(axis=dim), lambda x: x.variance())
+        ret = self._get_cache("variance", _Uncached)
+        if ret is not _Uncached:
+            return ret
+        if self.isdense or self.check_type(int) or self.check_type(float):
+            return self._set_cache("variance", numba_variance(self.to_numpy()))
+        return self._set_cache("variance", self.map(lambda x: x ** 2).mean() - (self.mean()) ** 2)
 
-    def std(self, default=NoDefault) -> float:
+    def std(self, default=NoDefault, dim=None) -> float:
         if self.length == 0:
             if isinstance(default, EmptyClass):
                 raise TypeError("vector is empty, plz set default to prevent error")
             return default
+        if self._is_dim_reduce(dim):
+            return self._reduce_dim(dim, lambda array, dim: array.std(axis=dim), lambda x: x.std())
         return self.variance() ** 0.5
 
     @overload
@@ -2237,6 +2743,8 @@ class vector(list):
         """
         if self.length == 0:
             return vector()
+        if self.isdense:
+            return vector._from_buffer(numba_cumsum(self.to_numpy()))
         if self.check_type(int) or self.check_type(float):
             return vector(numba_cumsum(self.to_numpy()))
         return self.cumulative_reduce(lambda x, y: x + y)
@@ -2279,14 +2787,15 @@ class vector(list):
         if window_len<3:
             return self
 
-        self = self.map(lambda x: float(x))
-
         assert window_len % 2 == 1
 
         if not window in ['flat', 'hanning', 'hamming', 'bartlett', 'blackman']:
             raise ValueError("Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'")
 
-        x = self.to_numpy()
+        if self.isdense:
+            x = self.to_numpy().astype(np.float64, copy=False)
+        else:
+            x = self.map(lambda x: float(x)).to_numpy()
         s = np.r_[x[window_len // 2:0:-1], x, x[-2:-(window_len // 2) - 2:-1]]
         if window == 'flat': #moving average
             w = np.ones(window_len, 'd')
@@ -2294,6 +2803,8 @@ class vector(list):
             w = np.__getattribute__(window)(window_len)
 
         y = np.convolve(w / w.sum(), s, mode='valid')
+        if self.isdense:
+            return vector._from_buffer(y)
         return vector(y)
 
     def norm(self, p=2):
@@ -2307,19 +2818,32 @@ class vector(list):
         p: float
             p can be a positive number or 0 or "inf"
         """
-        if touch(lambda: self.__norm[p], None):
-            return self.__norm[p]
-        if not hasattr(self, "_vector__norm"):
-            self.__norm = dict()
-        if p == "inf":
-            self.__norm[p] = self.map(abs).max()
+        norm = self._get_cache("norm")
+        if norm is None:
+            norm = self._set_cache("norm", dict())
+        if norm.get(p, None):
+            return norm[p]
+        if self.isdense:
+            x = np.abs(self.to_numpy()).astype(np.float64, copy=False)
+            if p == "inf":
+                norm[p] = x.max()
+            elif p == 0:
+                norm[p] = int(np.count_nonzero(x))
+            elif p == 2:
+                norm[p] = math.sqrt(np.dot(x, x))
+            elif p > 0:
+                norm[p] = math.pow(np.sum(np.power(x, p, dtype=np.float64)), 1/p)
+            else:
+                raise TypeError("p can be a positive number or 0 or 'inf'")
+        elif p == "inf":
+            norm[p] = self.map(abs).max()
         elif p > 0:
-            self.__norm[p] = math.pow(self.map(lambda x: math.pow(abs(x), p)).sum(), 1/p)
+            norm[p] = math.pow(self.map(lambda x: math.pow(abs(x), p)).sum(), 1/p)
         elif p == 0:
-            self.__norm[p] = self.count(lambda x: x != 0)
+            norm[p] = self.count(lambda x: x != 0)
         else:
             raise TypeError("p can be a positive number or 0 or 'inf'")
-        return self.__norm[p]
+        return norm[p]
 
     def normalization(self, p=1) -> "vector":
         """
@@ -2351,6 +2875,10 @@ class vector(list):
 
         the i-th element is $\frac{\exp(\beta a_i )}{\sum_{j} \exp(\beta a_j)}$
         """
+        if self.isdense:
+            x = self.to_numpy()
+            e = np.exp((x - x.max()) * beta)
+            return vector._from_buffer(e / e.sum())
         return self.map(lambda x, y: x - y, func_self=lambda x: x.max()).map(lambda x: math.exp(x * beta)).map(lambda x, y: x / y, func_self = lambda x: x.sum())
 
     def entropy(self):
@@ -2361,14 +2889,19 @@ class vector(list):
             return - x * math.log(x)
         return self.map(negative_xlogx).sum()
 
-    def prod(self, default=None):
+    def prod(self, default=None, dim=None):
         """prod.
 
         Parameters
         ----------
         default :
             default
+        dim :
+            for a regular nested vector, the product along dim as a vector
         """
+        if self._is_dim_reduce(dim):
+            # products of ints overflow int64 easily, they are computed exactly with python ints
+            return self._reduce_dim(dim, lambda array, dim: array.prod(axis=dim) if array.dtype.kind == "f" else None, lambda x: x.prod(default=default))
         return self.reduce(lambda x, y: x * y, default)
 
     def group_by(self, key=lambda x: x[0]) -> dict:
@@ -2384,14 +2917,61 @@ class vector(list):
         vector([1,2], [1,3], [2,3], [2,2], [2,1], [3,1]).group_by()
         will produce {1: [[1, 2], [1, 3]], 2: [[2, 3], [2, 2], [2, 1]], 3: [[3, 1]]}
         """
-        result = _Vector_Dict()
-        for x in self:
-            k_x = key(x)
-            if k_x not in result:
-                result[k_x] = vector([x], recursive=False)
-            else:
-                result[k_x].append(x)
-        return result
+        return self.groupby(key).groups()
+
+    def join(self, other, key=None, other_key=NoDefault, how="inner") -> Union["vector", str]:
+        """join.
+        pairs (x, y) of elements x of self and y of other with equal keys, found by a hash index of the shorter vector
+
+        Parameters
+        ----------
+        other :
+            the vector (or iterable) to join with
+        key :
+            a function of the element, or an index / a name used as element[key]; None uses the element itself.
+            keys must be hashable
+        other_key :
+            key for the elements of other, the same as key by default
+        how :
+            "inner": only matched pairs
+            "left": also (x, None) for every x of self without a match
+            "outer": also (None, y) for every y of other without a match, after the pairs of self
+
+        Example
+        ----------
+        results = vector(dict(subject=1, acc=0.9), dict(subject=3, acc=0.7))
+        meta = vector(dict(id=1, age=20), dict(id=2, age=30))
+        results.join(meta, "subject", "id", how="left")
+        will produce [({'subject': 1, 'acc': 0.9}, {'id': 1, 'age': 20}), ({'subject': 3, 'acc': 0.7}, None)]
+
+        vector.join(sep: str) joins the elements as strings: vector(1, 2).join(", ") will produce "1, 2"
+        """
+        if isinstance(other, str):
+            return other.join(self.map(str))
+        if not isinstance(other, list):
+            other = list(other)
+        if isinstance(other_key, EmptyClass):
+            other_key = key
+        positions = _join_positions(grouped_vector._values(self, key), grouped_vector._values(other, other_key), how)
+        return vector([(None if i is None else self[i], None if j is None else other[j]) for i, j in positions], recursive=False)
+
+    def groupby(self, *keys, sort=False) -> "grouped_vector":
+        """groupby.
+        group the elements by one or more keys, see grouped_vector
+
+        Parameters
+        ----------
+        keys :
+            each key is a function of the element, or an index / a name used as element[key]; no key groups equal elements
+        sort :
+            whether the groups are sorted by key, otherwise they are in order of first occurrence
+
+        Example
+        ----------
+        vector(("a", 1), ("b", 2), ("a", 3)).groupby(0).agg(total=(1, "sum"), n="count")
+        will produce {'key': ['a', 'b'], 'total': [4, 2], 'n': [2, 1]}
+        """
+        return grouped_vector(self, keys if len(keys) > 0 else (None, ), sort=sort)
 
     def reduce(self, func, default=NoDefault, first=NoDefault, recursive=False):
         """reduce.
@@ -2466,9 +3046,6 @@ class vector(list):
         return enumerate(self)
 
 
-    def join(self, sep: str) -> str:
-        return sep.join(self.map(str))
-
     def flatten(self, depth=-1) -> "vector":
         """flatten.
         flatten the vector
@@ -2483,26 +3060,19 @@ class vector(list):
         vector([[1,2], [3,4,5], 6]).flatten()
         will produce [1,2,3,4,5,6]
         """
-        def temp_flatten(array, depth=-1):
-            """temp_flatten.
-
-            Parameters
-            ----------
-            array :
-                array
-            depth :
-                depth
-            """
-            if depth == 0:
-                return array
-            if not isinstance(array, list):
-                return array
-            if not isinstance(array, vector):
-                array = vector(array)
-            if array.isleaf:
-                return array
-            return array.map(lambda x: temp_flatten(x, depth - 1)).reduce(lambda x, y: x + y)
-        return temp_flatten(self, depth)
+        if depth == 0 or self.isleaf:
+            return self
+        ret = list()
+        def extend(array, depth):
+            for x in array:
+                if not isinstance(x, list):
+                    ret.append(x)
+                elif depth == 1 or (x.isleaf if isinstance(x, vector) else all(not isinstance(y, vector) for y in x)):
+                    ret.extend(x)
+                else:
+                    extend(x, depth - 1)
+        extend(self, depth)
+        return vector(ret)
 
     def permute(self, *args) -> "vector":
         args = totuple(args)
@@ -2510,13 +3080,7 @@ class vector(list):
             return self
         assert len(args) == len(self.shape)
         assert vector(args).sort() == vector.range(len(args))
-        def permute_tuple(t, order):
-            return tuple(t[order[index]] for index in range(len(t)))
-        new_shape = permute_tuple(self.shape, args)
-        ret = vector.constant_vector(None, new_shape)
-        for index in vector.meshgrid(self.shape):
-            ret[permute_tuple(index, args)] = self[index]
-        return ret
+        return self.strided().permute(args).tovector()
 
     @property
     def T(self) -> "vector":
@@ -2528,12 +3092,8 @@ class vector(list):
         if dim1 > dim2:
             return self.transpose(dim2, dim1)
         if dim1 > 0:
-            return self.rmap(lambda x: x.transpose(0, dim2-dim1), max_depth=dim1-1, split_tuple=False)
-        shape = self.shape[:(dim2 + 1)]
-        ret = vector.constant_vector(None, tuple([shape[-1], *shape[1:-1], shape[0]]))
-        for index in vector.meshgrid(shape):
-            ret[tuple([index[-1], *index[1:-1], index[0]])] = self[index]
-        return ret
+            return self.rmap(lambda x: x.strided(dim2 - dim1 + 1).transpose(0, dim2 - dim1).tovector(), max_depth=dim1-1, split_tuple=False)
+        return self.strided(dim2 + 1).transpose(0, dim2).tovector()
 
     def reshape(self, *args) -> "vector":
         """reshape.
@@ -2562,27 +3122,7 @@ class vector(list):
         assert reduce(lambda x, y: x * y, args) == reduce(lambda x, y: x * y, self.shape)
         if args == self.shape:
             return self
-        def _reshape(value, target_shape):
-            """_reshape.
-
-            Parameters
-            ----------
-            value :
-                value
-            target_shape :
-                target_shape
-            """
-            if len(target_shape) == 1:
-                if not isinstance(value, vector):
-                    return vector(value)
-                else:
-                    return value
-            piece_length = len(value) // target_shape[0]
-            next_target_shape = target_shape[1:]
-            # ret = vector(_reshape(super(vector, value).__getitem__(slice(piece_length * index, piece_length * (index + 1))), next_target_shape) for index in range(target_shape[0]))
-            ret = vector(_reshape(value[piece_length * index: piece_length * (index + 1)], next_target_shape) for index in range(target_shape[0]))
-            return ret
-        return _reshape(self.flatten(), args)
+        return self.strided().reshape(args).tovector()
 
     def generator(self):
         """generator.
@@ -2590,6 +3130,30 @@ class vector(list):
         """
         return ctgenerator(self)
 
+    def strided(self, ndim=None) -> "strided_vector":
+        """strided.
+        view the first ndim levels (all levels by default) of a regular nested vector as a strided_vector,
+        whose reshape / flatten / permute / transpose only change shape and strides
+
+        Example
+        ----------
+        vector.range(6).reshape(2, 3).strided().T.reshape(-1).tovector()
+        will produce [0, 3, 1, 4, 2, 5]
+        """
+        return strided_vector.from_vector(self, ndim)
+
+    def lazy(self) -> "lazy_vector":
+        """lazy.
+        change vector to lazy_vector, following map / filter / test / testnot / replace / map_where
+        are recorded and run in one single pass when collect() is called
+
+        Example
+        ----------
+        vector(0, 1, 2, 3).lazy().test(lambda x: 1 / x).map(lambda x: x * 2).collect()
+        will produce [2, 4, 6]
+        """
+        return lazy_vector(self)
+
     @property
     def head(self):
         return self.get(0, None)
@@ -2663,24 +3227,40 @@ class vector(list):
             return self
         if self.length == 0:
             return self
-        temp = sorted(vector.zip(self, vector.range(self.length)), key=lambda x: key(x[0]), reverse=reverse)
-        index_mapping_reverse = [x[1] for x in temp]
-        index_mapping = IndexMapping(index_mapping_reverse, reverse=True)
-        return self.map_index(index_mapping)
+        return self.map_index(IndexMapping(self._sort_order(key, reverse), reverse=True))
 
     def sort_(self, key=lambda x: x, reverse: bool=False) -> None:
         if key == None:
             return
         if self.length == 0:
             return
-        temp = sorted(vector.zip(self, vector.range(self.length)), key=lambda x: key(x[0]), reverse=reverse)
-        index_mapping_reverse = [x[1] for x in temp]
-        index_mapping = IndexMapping(index_mapping_reverse, reverse=True)
-        self.map_index_(index_mapping)
+        self.map_index_(IndexMapping(self._sort_order(key, reverse), reverse=True))
 
-    def sort_by_index(self, key=lambda index: index) -> "vector":
-        """sort_by_index.
-        sort vector by function of index
+    def _sort_order(self, key, reverse: bool) -> list:
+        """_sort_order.
+        indices of the elements in sorted order (stable), cached for each (key, reverse) until the vector is mutated in place
+
+        Parameters
+        ----------
+        key :
+            key
+        reverse :
+            reverse
+        """
+        orders = self._get_cache("sort_order")
+        if orders is None:
+            orders = self._set_cache("sort_order", dict())
+        order = orders.get((key, reverse), None)
+        if order is None:
+            if len(orders) >= 8:
+                orders.clear()
+            getitem = super().__getitem__
+            order = orders[(key, reverse)] = sorted(range(self.length), key=lambda index: key(getitem(index)), reverse=reverse)
+        return order
+
+    def sort_by_index(self, key=lambda index: index) -> "vector":
+        """sort_by_index.
+        sort vector by function of index
 
         Parameters
         ----------
@@ -2794,9 +3374,12 @@ class vector(list):
             return vector(array.tolist())
 
     def to_numpy(self) -> np.ndarray:
-        if hasattr(self, "_vector__numpy"):
-            return self.__numpy
-        if self.length == 0:
+        ret = self._get_cache("numpy")
+        if ret is not None:
+            return ret
+        if self.isdense:
+            ret = np.fromiter(super().__iter__(), dtype=_dense_dtype[self.content_type], count=self.length)
+        elif self.length == 0:
             return np.array([])
         elif self.check_type(int):
             ret = np.fromiter(self, dtype=np.int64)
@@ -2804,8 +3387,7 @@ class vector(list):
             ret = np.fromiter(self, dtype=np.float64)
         else:
             ret = np.array(self)
-        self.__numpy = ret
-        return ret
+        return self._set_cache("numpy", ret)
 
     def to_dict(self, key_func, value_func) -> Dict:
         return {key_func(x): value_func(x) for x in super().__iter__()}
@@ -3162,21 +3744,19 @@ class vector(list):
     def iid(self, sample_func, length, args=()) -> "vector":
         return vector([sample_func(*args) for _ in range(length)])
 
-    @registered_property
+    @versioned_property
     def isleaf(self) -> bool:
         return all(not isinstance(_, vector) for _ in self)
 
     @isleaf.setter
     def isleaf(self, p: bool) -> bool:
-        if not hasattr(self, "__registered_property"):
-            self.__registered_property = dict()
-        self.__registered_property["isleaf"] = p
+        self._set_cache("isleaf", p)
 
-    @registered_property
+    @versioned_property
     def ndim(self) -> int:
         return len(self.shape)
 
-    @registered_property
+    @versioned_property
     def shape(self) -> tuple:
         """shape.
         """
@@ -3259,62 +3839,98 @@ class vector(list):
             assert isinstance(element, self.content_type)
         self._index_mapping = IndexMapping()
 
-        super().insert(*args)
+        super().insert(location, element)
         return self
 
-    @destory_registered_property
+    _version = 0
+
+    def _get_cache(self, name, default=None):
+        """_get_cache.
+        the value stored by _set_cache under name if the vector has not been mutated in place since, default otherwise
+
+        Parameters
+        ----------
+        name :
+            name
+        default :
+            default
+        """
+        cache = self.__dict__.get("_vector__cache", None)
+        if cache is not None:
+            entry = cache.get(name, None)
+            if entry is not None and entry[0] == self._version:
+                return entry[1]
+        return default
+
+    def _set_cache(self, name, value):
+        """_set_cache.
+        cache a value derived from the content of the vector, tagged with the current version of the vector
+
+        Parameters
+        ----------
+        name :
+            name
+        value :
+            value
+        """
+        cache = self.__dict__.get("_vector__cache", None)
+        if cache is None:
+            cache = self.__cache = dict()
+        cache[name] = (self._version, value)
+        return value
+
     def clear_appendix(self):
-        # touch(lambda: delattr(self, "_vector__shape"))
-        touch(lambda: delattr(self, "_vector__hashable"))
-        touch(lambda: delattr(self, "_vector__set"))
-        touch(lambda: delattr(self, "_vector__sum"))
-        touch(lambda: delattr(self, "_vector__max"))
-        touch(lambda: delattr(self, "_vector__min"))
-        touch(lambda: delattr(self, "_vector__variance"))
-        touch(lambda: delattr(self, "_vector__norm"))
-        touch(lambda: delattr(self, "_vector__type"))
-        touch(lambda: delattr(self, "_vector__type_recursive"))
-        touch(lambda: delattr(self, "_vector__numpy"))
-
-    @destory_registered_property
+        """clear_appendix.
+        mark the vector as mutated in place: every in-place method calls it, which gives the vector a new version
+        (unique among all vectors) so values cached for older versions (sum, shape, element_type, hash, ...) are not used anymore
+        """
+        self._version = next(_mutation_counter)
+
     def update_appendix(self, element):
+        """update_appendix.
+        mark the vector as mutated by appending element, the cached values that can be updated in O(1) are carried to the new version
+
+        Parameters
+        ----------
+        element :
+            element
+        """
         if self.length == 0:
-            self.__hashable = hashable(element)
-            if self.__hashable:
-                self.__set = set([element])
+            self.clear_appendix()
+            is_hashable = self._set_cache("hashable", hashable(element))
+            if is_hashable:
+                self._set_cache("set", set([element]))
             if isinstance(element, int) or isinstance(element, float):
-                self.__sum = element
-                self.__max = element
-                self.__min = element
-            self.__type = type(element)
+                self._set_cache("sum", element)
+                self._set_cache("max", element)
+                self._set_cache("min", element)
+            self._set_cache("type", type(element))
             return
-        # touch(lambda: delattr(self, "_vector__shape"))
-        if hasattr(self, "_vector__hashable"):
-            self.__hashable = self.__hashable and hashable(element)
-        if hasattr(self, "_vector__set"):
-            if hashable(element):
-                self.__set.add(element)
+        cached = {name: self._get_cache(name, _Uncached) for name in ("hashable", "set", "sum", "max", "min", "type")}
+        self.clear_appendix()
+        if cached["hashable"] is not _Uncached:
+            self._set_cache("hashable", cached["hashable"] and hashable(element))
+        if cached["set"] is not _Uncached:
+            if cached["set"] is not None and hashable(element):
+                cached["set"].add(element)
+                self._set_cache("set", cached["set"])
             else:
-                self.__set = None
-        if hasattr(self, "_vector__sum"):
-            self.__sum = touch(lambda: self.__sum + element)
-        if hasattr(self, "_vector__max"):
-            self.__max = touch(lambda: max(self.__max, element))
-        if hasattr(self, "_vector__min"):
-            self.__min = touch(lambda: min(self.__min, element))
-        touch(lambda: delattr(self, "_vector__variance"))
-        touch(lambda: delattr(self, "_vector__norm"))
-        if hasattr(self, "_vector__type"):
-            if isinstance(self.__type, set):
-                self.__type.add(type(element))
-            elif self.__type is not type(element):
-                self.__type = set([self.__type, type(element)])
-        if hasattr(self, "_vector__type") and not isinstance(self.__type, set) and self.__type is not vector:
-            self.__type_recursive = self.__type
-        else:
-            touch(lambda: delattr(self, "_vector__type_recursive"))
-        touch(lambda: delattr(self, "_vector__norm"))
-        touch(lambda: delattr(self, "_vector__numpy"))
+                self._set_cache("set", None)
+        if cached["sum"] is not _Uncached:
+            self._set_cache("sum", touch(lambda: cached["sum"] + element))
+        if cached["max"] is not _Uncached:
+            self._set_cache("max", touch(lambda: max(cached["max"], element)))
+        if cached["min"] is not _Uncached:
+            self._set_cache("min", touch(lambda: min(cached["min"], element)))
+        element_type = cached["type"]
+        if element_type is not _Uncached:
+            if isinstance(element_type, set):
+                element_type.add(type(element))
+            elif element_type is not type(element):
+                element_type = set([element_type, type(element)])
+            self._set_cache("type", element_type)
+            if not isinstance(element_type, set) and element_type is not vector:
+                self._set_cache("type_recursive", element_type)
 
     def clear(self) -> "vector":
         """clear
@@ -3336,6 +3952,19 @@ class vector(list):
         super().remove(*args)
         return self
 
+    def __delitem__(self, index):
+        self.clear_appendix()
+        self._index_mapping = IndexMapping()
+        super().__delitem__(index)
+
+    def __iadd__(self, other) -> "vector":
+        return self.extend(other)
+
+    def __imul__(self, n) -> "vector":
+        self.clear_appendix()
+        self._index_mapping = IndexMapping()
+        return super().__imul__(n)
+
     def all_equal(self, func=None):
         """
             test if all element in a vector are equal or not
@@ -3537,18 +4166,22 @@ class vector(list):
         assert self.length == index_mapping.domain_size
         if index_mapping.range_size == 0:
             return vector([], index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=self.allow_undefined_value)
+        if self.isdense and (index_mapping.isslice or not self.allow_undefined_value):
+            if index_mapping.isslice:
+                buffer = self.to_numpy()[index_mapping.slice_index]
+            else:
+                buffer = self.to_numpy()[IndexMapping._as_array(index_mapping.index_map_reverse)]
+            return vector(buffer, recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), content_type=self.content_type)
         if index_mapping.isslice:
-            slice_index = index_mapping.slice
-            if slice_index.step < 0 and slice_index.stop == -1:
-                slice_index = slice(slice_index.start, None, slice_index.step)
-            ret = vector(super(vector, self).__getitem__(slice_index), recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=False)
+            ret = vector(super(vector, self).__getitem__(index_mapping.slice_index), recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=False)
             return ret
         if not self.allow_undefined_value:
             # assert all(0 <= index < self.length for index in index_mapping.index_map_reverse)
-            ret = vector([super(vector, self).__getitem__(index) for index in index_mapping.index_map_reverse], recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=False)
+            ret = vector(map(super(vector, self).__getitem__, IndexMapping._as_array(index_mapping.index_map_reverse).tolist()), recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=False)
             return ret
         else:
-            ret = vector([super(vector, self).__getitem__(index) if index >= 0 else UnDefined for index in index_mapping.index_map_reverse], recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=True)
+            getitem = super(vector, self).__getitem__
+            ret = vector([getitem(index) if index >= 0 else UnDefined for index in IndexMapping._as_array(index_mapping.index_map_reverse).tolist()], recursive=self._recursive, index_mapping=self.index_mapping.map(index_mapping), allow_undefined_value=True)
             return ret
 
     def map_index_(self, index_mapping: "IndexMapping") -> None:
@@ -3620,11 +4253,11 @@ class vector(list):
         self.clear_index_mapping_()
 
     def roll(self, shift=1) -> "vector":
-        index_mapping = IndexMapping([(index - shift) % self.length for index in range(self.length)], range_size=self.length, reverse=True)
+        index_mapping = IndexMapping((np.arange(self.length) - shift) % self.length, range_size=self.length, reverse=True)
         return self.map_index(index_mapping)
 
     def roll_(self, shift=1):
-        index_mapping = IndexMapping([(index - shift) % self.length for index in range(self.length)], range_size=self.length, reverse=True)
+        index_mapping = IndexMapping((np.arange(self.length) - shift) % self.length, range_size=self.length, reverse=True)
         return self.map_index_(index_mapping)
 
     def __str__(self):
@@ -3670,14 +4303,14 @@ class vector(list):
         return ret
 
     def set(self):
-        if hasattr(self, "_vector__set"):
-            if self.__set is None:
+        ret = self._get_cache("set", _Uncached)
+        if ret is not _Uncached:
+            if ret is None:
                 raise RuntimeError("this vector is not hashable")
-            return self.__set
+            return ret
         if not self.ishashable():
             raise RuntimeError("this vector is not hashable")
-        self.__set = set(self)
-        return self.__set
+        return self._set_cache("set", set(self))
 
     def __contains__(self, item):
         if self.ishashable():
@@ -3926,47 +4559,11 @@ class vector(list):
 
     def regex_search(self, query="", max_k=NoDefault, str_func=str, str_display=None, display_info=None, sorted_function=None, pre_sorted_function=None, history=None, show_line_number=False, return_tuple=False, stdscr=None):
 
-        def regex_function(candidate, query):
-            if len(query) == 0:
-                return candidate
-            regex = re.compile(query)
-            selected = candidate.filter(lambda x: regex.search(x), ignore_error=False).sort(len)
-            return selected
-
-        return self.function_search(regex_function, query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info, sorted_function=sorted_function, pre_sorted_function=pre_sorted_function, history=history, show_line_number=show_line_number, return_tuple=return_tuple, stdscr=stdscr)
+        return self.function_search(indexed_search_function(lambda index, query: (index.regex(query), None)), query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info, sorted_function=sorted_function, pre_sorted_function=pre_sorted_function, history=history, show_line_number=show_line_number, return_tuple=return_tuple, stdscr=stdscr)
 
     def fuzzy_search(self, query="", max_k=NoDefault, str_func=str, str_display=None, display_info=None, sorted_function=None, pre_sorted_function=None, history=None, show_line_number=False, return_tuple=False, stdscr=None):
 
-        def fuzzy_function(candidate, query):
-            upper = any(x.isupper() for x in query)
-            if len(query) == 0:
-                return candidate
-            else:
-                candidate = candidate.filter(lambda x: query[0] in x)
-                if not upper:
-                    candidate = candidate.map(lambda x: x.lower())
-            def eta(x):
-                if len(x) > len(query):
-                    return 1 - (len(x) - len(query)) / (len(x) + len(query))
-                else:
-                    return 1 - (len(query) - len(x)) / (len(x) + len(query)) / 2
-            if len(candidate) < 1000:
-                partial_ratio = candidate.map(lambda x: (fuzz.ratio(x, query) / eta(x) ** 0.8, x))
-                selected = partial_ratio.filter(lambda x: x[0] > 49)
-            else:
-                if len(query) == 1:
-                    return candidate.map(lambda x: 100)
-                if len(candidate) > 5000:
-                    candidate = candidate.filter(lambda x: query[:2] in x)
-                else:
-                    candidate = candidate.filter(lambda x: query[0] in x and query[1] in x)
-                partial_ratio = candidate.map(lambda x: (fuzz.ratio(x, query) / eta(x) ** 0.8, x))
-                selected = partial_ratio.filter(lambda x: x[0] > 49)
-            # score = selected.map(lambda x: 100 * (x[0] == 100) + x[0] * min(1, len(x[1]) / len(query)) * min(1, len(query) / len(x[1])) ** 0.3, lambda x: round(x * 10) / 10).sort(lambda x: -x)
-            score = selected.map(lambda x: x[0]).sort(lambda x: -x)
-            return score
-
-        return self.function_search(fuzzy_function, query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info, sorted_function=sorted_function, pre_sorted_function=pre_sorted_function, history=history, show_line_number=show_line_number, return_tuple=return_tuple, stdscr=stdscr)
+        return self.function_search(indexed_search_function(lambda index, query: index.fuzzy(query)), query=query, max_k=max_k, str_func=str_func, str_display=str_display, display_info=display_info, sorted_function=sorted_function, pre_sorted_function=pre_sorted_function, history=history, show_line_number=show_line_number, return_tuple=return_tuple, stdscr=stdscr)
 
     def get_size(self):
         return self.rmap(sys.getsizeof).reduce(lambda x, y: x + y, first=0)
@@ -3999,7 +4596,51 @@ class vector(list):
     def help(self, only_content=False, prefix="", stdscr=None):
         return vhelp(self, only_content=only_content, prefix=prefix, stdscr=stdscr)
 
-    def save(self, filepath):
+    def _columnar_buffer(self) -> Optional[np.ndarray]:
+        """
+        the numpy array of a numeric (or nested numeric) vector of regular shape, None if the vector can't be stored column-wise without losing information
+        """
+        if self.length == 0:
+            return None
+        if self.isdense:
+            return self.to_numpy()
+        shape = self.shape
+        if shape is None:
+            return None
+        element_type = self.element_type_recursive
+        if not isinstance(element_type, type) or element_type not in _columnar_dtype:
+            return None
+        try:
+            buffer = np.asarray(self.tolist(), dtype=_columnar_dtype[element_type])
+        except (OverflowError, ValueError, TypeError):
+            return None
+        if buffer.shape != tuple(shape):
+            return None
+        return buffer
+
+    def save(self, filepath, format="auto"):
+        """
+        save the vector (and its index mapping) to filepath
+
+        Parameters
+        ----------
+        filepath : str
+        format : str
+            "auto": numeric and nested numeric vectors of regular shape are saved in the columnar format, others are pickled
+            "columnar": a single file made of npy segments: header, data of shape vector.shape and the index mapping. The data segment can be memory-mapped by vector.load(mmap=True)
+            "pickle": pickle self.tolist() and the index mapping
+        """
+        assert format in ("auto", "columnar", "pickle")
+        buffer = self._columnar_buffer() if format != "pickle" else None
+        if buffer is None and format == "columnar":
+            raise TypeError("only numeric vector of regular shape can be saved in columnar format")
+        if buffer is not None:
+            with open(filepath, "wb") as output:
+                output.write(_columnar_magic)
+                _write_npy(output, np.array([self.isdense], dtype=np.int64))
+                _write_npy(output, buffer)
+                _write_index_mapping(output, self.index_mapping)
+            return
         try:
             import pickle
         except:
@@ -4010,17 +4651,64 @@ class vector(list):
             pickle.dump(self.index_mapping, output)
 
     @staticmethod
-    def load(filepath) -> "vector":
-        try:
-            import pickle
-        except:
-            print("Please install pickle package")
-            return
+    def load(filepath, mmap=False, index=None) -> "vector":
+        """
+        load the vector saved by vector.save
+
+        Parameters
+        ----------
+        filepath : str
+        mmap : bool
+            for columnar file, memory-map the data instead of reading it, so that only the part selected by index is read from disk
+        index : slice / list / np.ndarray
+            for columnar file, only load the elements selected by index (along the first dimension), the index mapping is composed accordingly
+
+        Example
+        ----------
+        vector.range(10 ** 8).save("x.vec")
+        vector.load("x.vec", mmap=True, index=slice(0, 1000)).sum()
+        will read only the first 1000 elements from disk
+        """
         with open(filepath, "rb") as input:
-            content = pickle.load(input)
-            index_mapping = pickle.load(input)
-            ret = vector.from_list(content)
-            ret._index_mapping = index_mapping
+            if input.read(len(_columnar_magic)) != _columnar_magic:
+                input.seek(0)
+                try:
+                    import pickle
+                except:
+                    print("Please install pickle package")
+                    return
+                content = pickle.load(input)
+                index_mapping = pickle.load(input)
+                ret = vector.from_list(content)
+                ret._index_mapping = index_mapping
+                return ret
+            isdense = bool(np.lib.format.read_array(input)[0])
+            start = input.tell()
+            shape, fortran_order, dtype = _read_npy_header(input)
+            offset = input.tell()
+            if mmap:
+                buffer = np.memmap(filepath, dtype=dtype, mode="r", offset=offset, shape=shape, order="F" if fortran_order else "C")
+            else:
+                input.seek(start)
+                buffer = np.lib.format.read_array(input)
+            input.seek(offset + int(np.prod(shape)) * dtype.itemsize)
+            index_mapping = _read_index_mapping(input)
+        if index is not None:
+            if isinstance(index, slice):
+                selection = IndexMapping(index, shape[0], reverse=True)
+            else:
+                index = np.asarray(index)
+                if index.dtype == np.bool_:
+                    index = np.flatnonzero(index)
+                selection = IndexMapping(np.where(index < 0, index + shape[0], index), shape[0], reverse=True)
+            index_mapping = index_mapping.map(selection)
+            buffer = buffer[selection.slice_index] if selection.isslice else buffer[selection._reverse_positions()]
+        if buffer.ndim == 1 and isdense:
+            return vector(np.array(buffer), index_mapping=index_mapping, content_type=int if dtype.kind in "biu" else float)
+        if buffer.ndim == 1:
+            return vector(buffer.tolist(), index_mapping=index_mapping)
+        ret = vector.from_list(buffer.tolist())
+        ret._index_mapping = index_mapping
         return ret
 
     def detect_peaks(self, mph=None, mpd=1, threshold=0, edge='rising',
@@ -4577,7 +5265,11 @@ class ctgenerator:
             func = chain_function((func, *args))
         if not isinstance(default, EmptyClass):
             for x in self.generator:
-                yield touch(lambda: func(x), default=default)
+                try:
+                    ret = func(x)
+                except Exception:
+                    ret = default
+                yield ret
         else:
             for x in self.generator:
                 yield func(x)
@@ -4623,6 +5315,651 @@ class ctgenerator:
     def sum(self, default=None):
         return self.reduce(lambda x, y: x+y, default)
 
+    def join(self, other, key=None, other_key=NoDefault, how="inner") -> "ctgenerator":
+        """
+        streaming version of vector.join: other is collected into a hash index,
+        the pairs are generated while the elements of self are consumed.
+        with how "outer", the unmatched elements of other come after self is exhausted.
+        """
+        if how not in _join_methods:
+            raise ValueError("how should be one of {}, but got {}".format(", ".join(_join_methods), how))
+        if not isinstance(other, list):
+            other = list(other)
+        if isinstance(other_key, EmptyClass):
+            other_key = key
+        index = _hash_index(grouped_vector._values(other, other_key))
+        if key is not None and not callable(key):
+            key = operator.itemgetter(key)
+        return ctgenerator(ctgenerator._join(self.generator, key, other, index, how))
+
+    @staticmethod
+    def _join(generator, key, other, index, how):
+        matched = bytearray(len(other)) if how == "outer" else None
+        for x in generator:
+            positions = index.get(x if key is None else key(x), None)
+            if positions is None:
+                if how != "inner":
+                    yield (x, None)
+                continue
+            for j in positions:
+                yield (x, other[j])
+            if matched is not None:
+                for j in positions:
+                    matched[j] = 1
+        if matched is not None:
+            for j, m in enumerate(matched):
+                if not m:
+                    yield (None, other[j])
+
+_Dropped = EmptyClass("Dropped")
+
+class lazy_vector:
+    """
+    lazy_vector records a chain of map / filter / test / testnot / replace / map_where operations on a vector
+    and fuses them into one single pass over the source when it is collected or iterated,
+    so no intermediate vector is created.
+
+    Example:
+    ----------
+    vector.range(10).lazy().map(lambda x: x * 2).filter(lambda x: x > 5).collect()
+    will produce [6, 8, 10, 12, 14, 16, 18]
+    """
+
+    def __init__(self, source, stages=tuple()):
+        self._source = source
+        self._stages = tuple(stages)
+
+    def _then(self, name, step) -> "lazy_vector":
+        return lazy_vector(self._source, self._stages + ((name, step), ))
+
+    @property
+    def _has_filter(self) -> bool:
+        return any(name in ("filter", "test", "testnot") for name, _ in self._stages)
+
+    @staticmethod
+    def _split(func, split_tuple):
+        if split_tuple is None:
+            split_tuple = _need_split_tuple(func)
+        if not split_tuple:
+            return func
+        def step(x):
+            if isinstance(x, tuple):
+                return func(*x)
+            return func(x)
+        return step
+
+    def map(self, func: Callable, *args, default=NoDefault, split_tuple=None) -> "lazy_vector":
+        """
+        lazy version of vector.map
+        """
+        if func is None:
+            return self
+        func = vector._vector__hook_function(func)
+        func = lazy_vector._split(func, split_tuple)
+        if len(args) > 0:
+            func = chain_function((func, *(vector._vector__hook_function(x) for x in args)))
+        if isinstance(default, EmptyClass):
+            return self._then("map", func)
+        def step(x):
+            try:
+                return func(x)
+            except Exception:
+                return default
+        return self._then("map", step)
+
+    def filter(self, func=None, ignore_error=True) -> "lazy_vector":
+        """
+        lazy version of vector.filter
+        """
+        if func is None:
+            return self
+        if not ignore_error:
+            return self._then("filter", lambda x: x if func(x) else _Dropped)
+        def step(x):
+            try:
+                return x if func(x) else _Dropped
+            except Exception:
+                return _Dropped
+        return self._then("filter", step)
+
+    def test(self, func, *args) -> "lazy_vector":
+        """
+        lazy version of vector.test
+        """
+        if len(args) > 0:
+            func = chain_function((func, *args))
+        def step(x):
+            try:
+                func(x)
+            except Exception:
+                return _Dropped
+            return x
+        return self._then("test", step)
+
+    def testnot(self, func, *args) -> "lazy_vector":
+        """
+        lazy version of vector.testnot
+        """
+        if len(args) > 0:
+            func = chain_function((func, *args))
+        def step(x):
+            try:
+                func(x)
+            except Exception:
+                return x
+            return _Dropped
+        return self._then("testnot", step)
+
+    def replace(self, element, toelement=NoDefault) -> "lazy_vector":
+        """
+        lazy version of vector.replace
+        """
+        if toelement is NoDefault:
+            if callable(element):
+                return self._then("replace", element)
+            return self._then("replace", lambda x: element)
+        if callable(element):
+            def match(x):
+                try:
+                    return element(x)
+                except Exception:
+                    return False
+        else:
+            match = lambda x: x == element
+        if callable(toelement):
+            return self._then("replace", lambda x: toelement(x) if match(x) else x)
+        return self._then("replace", lambda x: toelement if match(x) else x)
+
+    def map_where(self, *args, default=NoDefault, split_tuple=None) -> "lazy_vector":
+        """
+        lazy version of vector.map_where
+        """
+        assert len(args) % 2 == 1
+        hook = vector._vector__hook_function
+        conditions = [(hook(args[index]), hook(args[index + 1])) for index in range(0, len(args) - 1, 2)]
+        last = hook(args[-1])
+        if split_tuple is None:
+            split_tuple = _need_split_tuple(last)
+        def _f(x):
+            for func, entry in conditions:
+                if func(x):
+                    return entry(*x) if split_tuple and isinstance(x, tuple) else entry(x)
+            return last(*x) if split_tuple and isinstance(x, tuple) else last(x)
+        return self.map(_f, default=default, split_tuple=False)
+
+    def _run(self):
+        steps = tuple(step for _, step in self._stages)
+        for index, x in enumerate(list.__iter__(self._source)):
+            for step in steps:
+                x = step(x)
+                if x is _Dropped:
+                    break
+            else:
+                yield index, x
+
+    def __iter__(self):
+        for _, x in self._run():
+            yield x
+
+    def collect(self, processing_bar=False) -> "vector":
+        """
+        run the fused pipeline over the source and return the result as a vector.
+        index mapping of the result is composed in the same way as the eager methods.
+        """
+        source = self._source
+        run = self._run()
+        if processing_bar:
+            run = tqdm(run)
+        recursive = getattr(source, "_recursive", False)
+        allow_undefined_value = getattr(source, "allow_undefined_value", False)
+        source_mapping = source.index_mapping if isinstance(source, vector) else IndexMapping()
+        if not self._has_filter:
+            return vector([x for _, x in run], recursive=recursive, index_mapping=source_mapping, allow_undefined_value=allow_undefined_value)
+        kept_index = list()
+        content = list()
+        for index, x in run:
+            kept_index.append(index)
+            content.append(x)
+        index_mapping = source_mapping.map(IndexMapping(kept_index, reverse=True, range_size=len(source)))
+        return vector(content, recursive=recursive, index_mapping=index_mapping, allow_undefined_value=allow_undefined_value)
+
+    def vector(self) -> "vector":
+        return self.collect()
+
+    def generator(self) -> "ctgenerator":
+        return ctgenerator(self.__iter__())
+
+    def __str__(self):
+        return "lazy_vector(length={}, stages=[{}])".format(len(self._source), " -> ".join(name for name, _ in self._stages))
+
+    def __repr__(self):
+        return self.__str__()
+
+class grouped_vector:
+    """
+    grouped_vector factorizes the keys of a vector once: every element gets the code of its group,
+    numeric keys are factorized by numpy, other hashable keys by one pass over a dict,
+    several keys are combined into one code per distinct tuple of keys.
+
+    agg computes named aggregations for all groups:
+    numeric values are aggregated by numpy over the group codes (bincount / reduceat on the elements ordered by group),
+    other values and custom functions are applied to the members of each group, collected in one pass.
+
+    Example:
+    ----------
+    t = vector(("a", 1), ("b", 2), ("a", 3))
+    t.groupby(0).agg(total=(1, "sum"), mean=(lambda x: x[1], "mean"), n="count", top=(1, lambda g: g.max()))
+    will produce {'key': ['a', 'b'], 'total': [4, 2], 'mean': [2.0, 2.0], 'n': [2, 1], 'top': [3, 2]}
+    """
+
+    def __init__(self, source, keys=(None, ), sort=False):
+        self._source = source
+        self._keys = tuple(keys)
+        codes = None
+        for key in self._keys:
+            key_codes, key_uniques = grouped_vector._factorize(grouped_vector._values(source, key))
+            if codes is None:
+                codes = key_codes
+                uniques = [(u, ) for u in key_uniques]
+                continue
+            combined_codes, combined = grouped_vector._factorize_array(codes * max(len(key_uniques), 1) + key_codes)
+            uniques = [uniques[c // len(key_uniques)] + (key_uniques[c % len(key_uniques)], ) for c in combined.tolist()]
+            codes = combined_codes
+        if sort and len(uniques) > 0:
+            order = sorted(range(len(uniques)), key=uniques.__getitem__)
+            rank = np.empty(len(order), dtype=np.int64)
+            rank[order] = np.arange(len(order))
+            codes = rank[codes]
+            uniques = [uniques[i] for i in order]
+        self.codes = codes
+        self._uniques = uniques
+        self._values_cache = dict()
+        self._members_cache = dict()
+        self._order = None
+
+    @staticmethod
+    def _values(source, key) -> list:
+        if key is None:
+            return source
+        if callable(key):
+            return [key(x) for x in source]
+        return [x[key] for x in source]
+
+    @staticmethod
+    def _numeric(values):
+        """
+        values as a 1-d numeric numpy array, or None.
+        values of mixed types (e.g. 1 and 2.5, or True and 1) are not converted, so that numpy does not change the type of any of them
+        """
+        if isinstance(values, vector) and values.isdense:
+            return values.to_numpy()
+        if len(values) == 0 or type(values[0]) not in (bool, int, float) or len(set(map(type, values))) > 1:
+            return None
+        try:
+            array = np.array(values)
+        except ValueError:
+            return None
+        if array.ndim != 1 or array.dtype.kind not in "biuf":
+            return None
+        return array
+
+    @staticmethod
+    def _factorize_array(array):
+        """
+        codes and uniques of a numeric array, uniques in order of first occurrence
+        """
+        uniques, first, codes = np.unique(array, return_index=True, return_inverse=True)
+        order = np.argsort(first, kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        return rank[codes.reshape(-1)], uniques[order]
+
+    @staticmethod
+    def _factorize(values):
+        """
+        codes (np.int64) and list of uniques of values, uniques in order of first occurrence
+        """
+        array = grouped_vector._numeric(values)
+        if array is not None:
+            codes, uniques = grouped_vector._factorize_array(array)
+            return codes, uniques.tolist()
+        index = dict()
+        try:
+            codes = [index.setdefault(x, len(index)) for x in values]
+            return np.array(codes, dtype=np.int64), list(index)
+        except TypeError:
+            uniques = list()
+            codes = list()
+            for x in values:
+                try:
+                    codes.append(uniques.index(x))
+                except ValueError:
+                    codes.append(len(uniques))
+                    uniques.append(x)
+            return np.array(codes, dtype=np.int64), uniques
+
+    def __len__(self) -> int:
+        return len(self._uniques)
+
+    @property
+    def keys(self) -> "vector":
+        """
+        key of each group (tuple of keys if grouped by several keys)
+        """
+        if len(self._keys) == 1:
+            return vector([u[0] for u in self._uniques], recursive=False)
+        return vector(self._uniques, recursive=False)
+
+    def _group_order(self):
+        """
+        positions of the elements ordered by group (stable), with the start and the size of each group
+        """
+        if self._order is None:
+            counts = np.bincount(self.codes, minlength=len(self))
+            starts = np.zeros(len(self), dtype=np.int64)
+            np.cumsum(counts[:-1], out=starts[1:])
+            self._order = (np.argsort(self.codes, kind="stable"), starts, counts)
+        return self._order
+
+    def _get_values(self, value):
+        try:
+            return self._values_cache[value]
+        except (KeyError, TypeError):
+            pass
+        values = grouped_vector._values(self._source, value)
+        ret = (values, grouped_vector._numeric(values))
+        try:
+            self._values_cache[value] = ret
+        except TypeError:
+            pass
+        return ret
+
+    def _members(self, value) -> list:
+        """
+        list of the values of the members of each group, collected in one pass
+        """
+        try:
+            return self._members_cache[value]
+        except (KeyError, TypeError):
+            pass
+        members = [list() for _ in range(len(self))]
+        for code, x in zip(self.codes.tolist(), self._get_values(value)[0]):
+            members[code].append(x)
+        try:
+            self._members_cache[value] = members
+        except TypeError:
+            pass
+        return members
+
+    def groups(self) -> "_Vector_Dict":
+        """
+        dict from the key of each group to the vector of its elements
+        """
+        return _Vector_Dict(zip(self.keys, (vector(m, recursive=False) for m in self._members(None))))
+
+    def _aggregate_numeric(self, array, how):
+        order, starts, counts = self._group_order()
+        codes = self.codes
+        if how == "count":
+            return counts
+        if how == "sum":
+            if array.dtype.kind == "f":
+                return np.bincount(codes, weights=array, minlength=len(self))
+            if not _int_sum_is_exact(array, counts.max()):
+                return None
+            return np.add.reduceat(array[order].astype(np.int64), starts)
+        if how == "mean":
+            return np.bincount(codes, weights=array, minlength=len(self)) / counts
+        if how == "min":
+            return np.minimum.reduceat(array[order], starts)
+        if how == "max":
+            return np.maximum.reduceat(array[order], starts)
+        if how == "prod" and array.dtype.kind == "f":
+            return np.multiply.reduceat(array[order], starts)
+        if how in ("var", "std"):
+            mean = np.bincount(codes, weights=array, minlength=len(self)) / counts
+            deviation = array - mean[codes]
+            var = np.bincount(codes, weights=deviation * deviation, minlength=len(self)) / counts
+            return var if how == "var" else np.sqrt(var)
+        if how == "first":
+            return array[order[starts]]
+        if how == "last":
+            return array[order[starts + counts - 1]]
+        if how == "nunique":
+            index = np.lexsort((array, codes))
+            sorted_codes = codes[index]
+            sorted_values = array[index]
+            new = np.ones(len(index), dtype=bool)
+            new[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_values[1:] != sorted_values[:-1])
+            return np.bincount(sorted_codes[new], minlength=len(self))
+        # sums and products of ints that may overflow int64 are computed exactly with python ints, lists are not numeric
+        return None
+
+    _generic_aggregations = {
+        "count": len,
+        "sum": lambda g: reduce(lambda x, y: x + y, g),
+        "mean": lambda g: vector(g).mean(),
+        "min": lambda g: vector(g).min(),
+        "max": lambda g: vector(g).max(),
+        "prod": lambda g: vector(g).prod(),
+        "var": lambda g: vector(g).variance(),
+        "std": lambda g: vector(g).std(),
+        "first": lambda g: g[0],
+        "last": lambda g: g[-1],
+        "nunique": lambda g: len(vector(g).unique()),
+        "list": lambda g: vector(g, recursive=False),
+    }
+
+    def aggregate(self, value=None, how="count") -> "vector":
+        """
+        aggregation of each group as a vector aligned with keys
+
+        Parameters
+        ----------
+        value :
+            None for the elements, a function of the element, or an index / a name used as element[value]
+        how :
+            one of count, sum, mean, min, max, prod, var, std, first, last, nunique, list
+            or a function applied to the vector of the values of each group
+        """
+        if len(self) == 0:
+            return vector()
+        if isinstance(how, str):
+            if how not in grouped_vector._generic_aggregations:
+                raise ValueError("unknown aggregation {}, use one of {} or a function".format(how, ", ".join(grouped_vector._generic_aggregations)))
+            if how == "count":
+                return vector(self._group_order()[2].tolist())
+            array = self._get_values(value)[1]
+            if array is not None:
+                ret = self._aggregate_numeric(array, how)
+                if ret is not None:
+                    return vector(ret.tolist())
+            func = grouped_vector._generic_aggregations[how]
+            return vector([func(m) for m in self._members(value)], recursive=False)
+        return vector([how(vector(m, recursive=False)) for m in self._members(value)], recursive=False)
+
+    def agg(self, **aggregations):
+        """
+        named aggregations as a table of columns aligned with the keys of the groups
+
+        Parameters
+        ----------
+        aggregations :
+            name=how or name=(value, how), see aggregate for value and how
+
+        Example
+        ----------
+        vector.range(10).groupby(lambda x: x % 2).agg(total="sum", n="count")
+        will produce {'key': [0, 1], 'total': [20, 25], 'n': [5, 5]}
+        """
+        from .table import table
+        if len(self._keys) == 1:
+            names = [self._keys[0] if isinstance(self._keys[0], str) else "key"]
+        else:
+            names = [key if isinstance(key, str) else "key{}".format(index) for index, key in enumerate(self._keys)]
+        ret = table()
+        for index, name in enumerate(names):
+            ret[name] = vector([u[index] for u in self._uniques], recursive=False)
+        for name, spec in aggregations.items():
+            if name in ret:
+                raise ValueError("aggregation name {} is also the name of a key".format(name))
+            if isinstance(spec, tuple):
+                value, how = spec
+            else:
+                value, how = None, spec
+            ret[name] = self.aggregate(value, how)
+        return ret
+
+    def __str__(self):
+        return "grouped_vector(length={}, groups={})".format(len(self._source), len(self))
+
+    def __repr__(self):
+        return self.__str__()
+
+class strided_vector:
+    """
+    strided_vector is a regular n-d view on a flat buffer:
+    the element at index (i_0, ..., i_{n-1}) is buffer[offset + i_0 * strides[0] + ... + i_{n-1} * strides[n-1]].
+
+    reshape / flatten of a contiguous view, permute / transpose / T and integer indexing only create a new view
+    with other shape and strides; elements are gathered in order when the view is turned back into
+    a nested vector (tovector) or a flat list (tolist), or when a non contiguous view is reshaped.
+
+    Example:
+    ----------
+    t = vector.range(6).reshape(2, 3).strided()
+    t.T.tovector()
+    will produce [[0, 3], [1, 4], [2, 5]]
+    """
+
+    def __init__(self, buffer, shape, strides=None, offset=0):
+        self.buffer = buffer
+        self.shape = tuple(shape)
+        self.strides = strided_vector._contiguous_strides(self.shape) if strides is None else tuple(strides)
+        self.offset = offset
+
+    @staticmethod
+    def _contiguous_strides(shape) -> tuple:
+        strides = list()
+        step = 1
+        for n in reversed(shape):
+            strides.append(step)
+            step *= n
+        return tuple(reversed(strides))
+
+    @staticmethod
+    def from_vector(v, ndim=None) -> "strided_vector":
+        """
+        flatten the first ndim levels of the nested vector v into one buffer in O(n), every level should be regular
+        """
+        if ndim is None:
+            if v.shape is None:
+                raise ValueError("strided_vector needs a regular nested vector, but the shape of the vector is None")
+            ndim = len(v.shape)
+        shape = [len(v)]
+        buffer = list(v)
+        for level in range(1, ndim):
+            if not all(isinstance(x, list) for x in buffer):
+                raise ValueError("level {} of the vector is not a level of vectors".format(level))
+            n = len(buffer[0]) if len(buffer) > 0 else 0
+            if any(len(x) != n for x in buffer):
+                raise ValueError("level {} of the vector is not regular".format(level))
+            shape.append(n)
+            buffer = [y for x in buffer for y in x]
+        return strided_vector(buffer, shape)
+
+    @property
+    def ndim(self) -> int:
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        return reduce(lambda x, y: x * y, self.shape, 1)
+
+    @property
+    def is_contiguous(self) -> bool:
+        return all(n == 1 or s == c for n, s, c in zip(self.shape, self.strides, strided_vector._contiguous_strides(self.shape)))
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        index = totuple(index)
+        if len(index) > self.ndim:
+            raise IndexError("too many indices for strided_vector of dimension {}".format(self.ndim))
+        offset = self.offset
+        for i, n, s in zip(index, self.shape, self.strides):
+            if not -n <= i < n:
+                raise IndexError("index {} is out of bounds for dimension with size {}".format(i, n))
+            offset += (i % n) * s
+        if len(index) == self.ndim:
+            return self.buffer[offset]
+        return strided_vector(self.buffer, self.shape[len(index):], self.strides[len(index):], offset)
+
+    def reshape(self, *args) -> "strided_vector":
+        shape = list(totuple(args))
+        assert shape.count(-1) <= 1
+        if -1 in shape:
+            known = reduce(lambda x, y: x * y, [n for n in shape if n != -1], 1)
+            assert known > 0 and self.size % known == 0
+            shape[shape.index(-1)] = self.size // known
+        assert reduce(lambda x, y: x * y, shape, 1) == self.size
+        if not self.is_contiguous:
+            return self.contiguous().reshape(shape)
+        return strided_vector(self.buffer, shape, offset=self.offset)
+
+    def flatten(self) -> "strided_vector":
+        return self.reshape(-1)
+
+    def permute(self, *args) -> "strided_vector":
+        args = totuple(args)
+        assert sorted(args) == list(range(self.ndim))
+        return strided_vector(self.buffer, tuple(self.shape[i] for i in args), tuple(self.strides[i] for i in args), self.offset)
+
+    def transpose(self, dim1: int, dim2: int) -> "strided_vector":
+        order = list(range(self.ndim))
+        order[dim1], order[dim2] = order[dim2], order[dim1]
+        return self.permute(order)
+
+    @property
+    def T(self) -> "strided_vector":
+        return self.permute(tuple(range(self.ndim))[::-1])
+
+    def contiguous(self) -> "strided_vector":
+        if self.is_contiguous:
+            return self
+        return strided_vector(self.tolist(), self.shape)
+
+    def tolist(self) -> list:
+        """
+        elements in the order of the view as a flat list
+        """
+        size = self.size
+        if self.is_contiguous:
+            return self.buffer[self.offset:self.offset + size]
+        index = np.full(self.shape, self.offset, dtype=np.int64)
+        for dim, (n, s) in enumerate(zip(self.shape, self.strides)):
+            index += (np.arange(n, dtype=np.int64) * s).reshape([-1 if d == dim else 1 for d in range(self.ndim)])
+        buffer = self.buffer
+        return [buffer[i] for i in index.ravel().tolist()]
+
+    def tovector(self) -> "vector":
+        """
+        build the nested vector of the view in O(n), one level at a time from the innermost one
+        """
+        rows = self.tolist()
+        for dim in range(self.ndim - 1, 0, -1):
+            n = self.shape[dim]
+            count = reduce(lambda x, y: x * y, self.shape[:dim], 1)
+            rows = [vector(rows[i * n:(i + 1) * n]) for i in range(count)]
+        return vector(rows)
+
+    def __str__(self):
+        return "strided_vector(shape={}, strides={}, offset={})".format(self.shape, self.strides, self.offset)
+
+    def __repr__(self):
+        return self.__str__()
+
 class fuzzy_obj:
 
     def __getattribute__(self, name):
@@ -10,9 +10,8 @@
 from ..touch import touch
 from .display import *
 
-if touch(lambda: __import__("line_profiler")):
-    # from pyctlib.watch import debugger
-    from .debugger import *
+# from pyctlib.watch import debugger
+from .debugger import *
 if touch(lambda: __import__("matplotlib")):
     # from pyctlib.watch import plot as plt
     from .plot import *
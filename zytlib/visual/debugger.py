@@ -8,16 +8,197 @@
 
 __all__ = """
     profile
+    SamplingProfiler
 """.split()
 
 import sys
+import time
+import pickle
+import inspect
+import linecache
+import threading
+from collections import Counter
 from functools import wraps
 try:
     from line_profiler import LineProfiler
 except ImportError:
-    raise ImportError("'pyctlib.watch.debugger' cannot be used without dependency 'line_profiler'. ")
+    LineProfiler = None
 
-def profile(*args, **kwargs):
+def _line_profiler():
+    if LineProfiler is None:
+        raise ImportError("'pyctlib.watch.debugger' cannot be used without dependency 'line_profiler'. use profile(mode='sample') instead. ")
+    return LineProfiler()
+
+class SamplingProfiler:
+    """
+    statistical profiler with the interface of LineProfiler used by profile (__call__, print_stats, dump_stats).
+
+    while a wrapped function runs, a background thread takes the stack of the calling thread from sys._current_frames()
+    every interval seconds, the cost for the profiled thread is independent of the number of executed lines.
+    each sample counts:
+        self samples of the innermost function and line
+        total samples of every function and line on the stack (once per sample, so recursion is not counted twice)
+    time is estimated as samples * interval.
+    the sampler thread needs the GIL, so the effective interval is at least sys.getswitchinterval() while the profiled thread runs python code.
+
+    Example
+    ----------
+    prof = SamplingProfiler(interval=0.001)
+    prof(func)(*args)
+    prof.print_stats()
+    """
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.functions = list()
+        self.samples = 0
+        self.elapsed = 0.
+        self.function_self = Counter()
+        self.function_total = Counter()
+        self.line_self = Counter()
+        self.line_total = Counter()
+        self.__lock = threading.Lock()
+        self.__active = 0
+        self.__stop = None
+        self.__thread = None
+        self.__start_time = None
+
+    def add_function(self, func) -> None:
+        code = getattr(func, "__code__", None)
+        if code is not None and code not in self.functions:
+            self.functions.append(code)
+
+    def __call__(self, func):
+        self.add_function(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            self.enable(sys._getframe())
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.disable()
+        return wrapper
+
+    def enable(self, root_frame=None) -> None:
+        """
+        start sampling the calling thread, frames outside root_frame are not recorded
+        """
+        with self.__lock:
+            self.__active += 1
+            if self.__active > 1:
+                return
+            self.__stop = threading.Event()
+            self.__start_time = time.perf_counter()
+            self.__thread = threading.Thread(target=self.__run, args=(threading.get_ident(), root_frame, self.__stop), name="zytlib-sampler", daemon=True)
+            self.__thread.start()
+
+    def disable(self) -> None:
+        with self.__lock:
+            self.__active -= 1
+            if self.__active > 0:
+                return
+            self.__stop.set()
+            thread = self.__thread
+            self.elapsed += time.perf_counter() - self.__start_time
+        thread.join()
+
+    def __run(self, target, root_frame, stop):
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(target, None)
+            if frame is not None:
+                self.__record(frame, root_frame)
+
+    def __record(self, frame, root_frame):
+        if frame is root_frame:
+            return
+        self.samples += 1
+        code = frame.f_code
+        self.function_self[code] += 1
+        self.line_self[(code, frame.f_lineno)] += 1
+        seen = set()
+        while frame is not None and frame is not root_frame:
+            code = frame.f_code
+            line = (code, frame.f_lineno)
+            if line not in seen:
+                seen.add(line)
+                self.line_total[line] += 1
+                if code not in seen:
+                    seen.add(code)
+                    self.function_total[code] += 1
+            frame = frame.f_back
+
+    def get_stats(self) -> dict:
+        """
+        picklable statistics, code objects are replaced by (filename, first line number, function name)
+        """
+        key = lambda code: (code.co_filename, code.co_firstlineno, code.co_name)
+        return dict(
+            interval=self.interval,
+            samples=self.samples,
+            elapsed=self.elapsed,
+            functions=[key(code) for code in self.functions],
+            function_self={key(code): count for code, count in self.function_self.items()},
+            function_total={key(code): count for code, count in self.function_total.items()},
+            line_self={key(code) + (lineno,): count for (code, lineno), count in self.line_self.items()},
+            line_total={key(code) + (lineno,): count for (code, lineno), count in self.line_total.items()},
+        )
+
+    def dump_stats(self, filename) -> None:
+        with open(filename, "wb") as output:
+            pickle.dump(self.get_stats(), output)
+
+    @staticmethod
+    def load_stats(filename) -> dict:
+        with open(filename, "rb") as finput:
+            return pickle.load(finput)
+
+    def print_stats(self, stream=None, top=20) -> None:
+        SamplingProfiler.show_stats(self.get_stats(), stream=stream, top=top)
+
+    @staticmethod
+    def show_stats(stats, stream=None, top=20) -> None:
+        """
+        print the function hot spots (top functions by self samples) followed by a line by line report of every profiled function
+        """
+        if stream is None:
+            stream = sys.stdout
+        interval = stats["interval"]
+        samples = max(stats["samples"], 1)
+        stream.write("Timer unit: {:g} s (one sample)\n\n".format(interval))
+        stream.write("Total samples: {}, elapsed time: {:g} s\n\n".format(stats["samples"], stats["elapsed"]))
+        stream.write("Function hot spots\n")
+        stream.write("{:>10} {:>10} {:>8} {:>8}  {}\n".format("Self", "Total", "% Self", "% Total", "Function"))
+        stream.write("=" * 62 + "\n")
+        hot = sorted(stats["function_total"].items(), key=lambda x: (-stats["function_self"].get(x[0], 0), -x[1]))
+        for (filename, firstlineno, name), total in hot[:top]:
+            count = stats["function_self"].get((filename, firstlineno, name), 0)
+            stream.write("{:>10} {:>10} {:>8.1f} {:>8.1f}  {} ({}:{})\n".format(count, total, 100 * count / samples, 100 * total / samples, name, filename, firstlineno))
+        stream.write("\n")
+        for filename, firstlineno, name in stats["functions"]:
+            function_total = stats["function_total"].get((filename, firstlineno, name), 0)
+            stream.write("Total time: {:g} s\n".format(function_total * interval))
+            stream.write("File: {}\n".format(filename))
+            stream.write("Function: {} at line {}\n\n".format(name, firstlineno))
+            stream.write("{:>6} {:>9} {:>9} {:>12} {:>8}  {}\n".format("Line #", "Self", "Total", "Time", "% Time", "Line Contents"))
+            stream.write("=" * 62 + "\n")
+            lines = linecache.getlines(filename)
+            try:
+                length = len(inspect.getblock(lines[firstlineno - 1:]))
+            except Exception:
+                length = len(lines) - firstlineno + 1
+            for lineno in range(firstlineno, firstlineno + length):
+                key = (filename, firstlineno, name, lineno)
+                total = stats["line_total"].get(key, 0)
+                count = stats["line_self"].get(key, 0)
+                content = lines[lineno - 1].rstrip("\n") if lineno - 1 < len(lines) else ""
+                if total == 0:
+                    stream.write("{:>6} {:>9} {:>9} {:>12} {:>8}  {}\n".format(lineno, "", "", "", "", content))
+                else:
+                    stream.write("{:>6} {:>9} {:>9} {:>12.6g} {:>8.1f}  {}\n".format(lineno, count, total, total * interval, 100 * total / max(function_total, 1), content))
+            stream.write("\n")
+
+def profile(*args, mode="line", interval=0.005, **kwargs):
     """
     Usage 1:
     @profile
@@ -30,7 +211,20 @@ def profile(*args, **kwargs):
     Usage 3:
     @profile(max_cnt, filename=<path>)
     def function
+
+    Usage 4 (statistical sampling, see SamplingProfiler):
+    @profile(max_cnt, filename=<path>, mode="sample", interval=0.005)
+    def function
+
+    mode "line" profiles every line with line_profiler.LineProfiler,
+    mode "sample" samples the stack every interval seconds in a background thread, which is cheap enough to keep on for long runs.
     """
+    if mode == "line":
+        make_profiler = _line_profiler
+    elif mode == "sample":
+        make_profiler = lambda: SamplingProfiler(interval)
+    else:
+        raise ValueError("mode should be 'line' or 'sample', but got {}".format(mode))
     if len(args) == 1 and callable(args[0]):
         func = args[0]
 
@@ -41,7 +235,7 @@ def profile(*args, **kwargs):
             else:
                 wrapper.cnt += 1
             if not sys._getframe().f_back.f_code.co_name == func.__name__:
-                prof = LineProfiler()
+                prof = make_profiler()
                 try:
                     return prof(func)(*args, **kwargs)
                 finally:
@@ -65,7 +259,7 @@ def profile(*args, **kwargs):
                 else:
                     wrapper.cnt += 1
                 if not (max_cnt >= 0 and wrapper.cnt > max_cnt) and not sys._getframe().f_back.f_code.co_name == func.__name__:
-                    prof = LineProfiler()
+                    prof = make_profiler()
                     try:
                         return prof(func)(*args, **kwargs)
                     finally:
@@ -89,7 +283,7 @@ def profile(*args, **kwargs):
                 else:
                     wrapper.cnt += 1
                 if not (max_cnt >= 0 and wrapper.cnt > max_cnt) and not sys._getframe().f_back.f_code.co_name == func.__name__:
-                    prof = LineProfiler()
+                    prof = make_profiler()
                     try:
                         return prof(func)(*args, **kwargs)
                     finally:
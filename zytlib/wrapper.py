@@ -9,6 +9,13 @@ __all__ = """
     restore_type_wrapper
     generate_typehint_wrapper
     empty_wrapper
+    MemoCache
+    registered_property
+    registered_method
+    destory_registered_property
+    registered_cache
+    registered_cache_info
+    clear_registered_cache
 """.split()
 
 from pyoverload import *
@@ -20,7 +27,8 @@ from .touch import crash
 import signal
 import types
 import time
-from collections import namedtuple
+import sys
+from collections import namedtuple, OrderedDict
 
 def wrapper_template(func, **hyper):
 
@@ -225,8 +233,116 @@ def second_argument(*args):
     else:
         raise ValueError()
 
-def destory_registered_property(func):
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "size", "nbytes"])
+
+_register_name = "__registered_property"
+_missing = object()
+
+class MemoCache:
+    """
+    cache of one memoized function of one object, used by registered_property / registered_method.
+
+    Parameters
+    ----------
+    maxsize : int
+        maximal number of entries, the least recently used entry is evicted first. None means no limit
+    maxbytes : int
+        maximal total size of cached values measured by sizeof, the least recently used entries are evicted first. None means no limit
+    ttl : float
+        entries older than ttl seconds are recomputed. None means entries never expire
+    sizeof : callable
+        size of a cached value in bytes, sys.getsizeof by default (which does not count referenced objects)
+    """
+
+    __slots__ = ("maxsize", "maxbytes", "ttl", "sizeof", "data", "nbytes", "hits", "misses", "evictions")
+
+    def __init__(self, maxsize=None, maxbytes=None, ttl=None, sizeof=sys.getsizeof):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self.data = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.data)
+
+    def __contains__(self, key):
+        return self.get(key, _missing, count=False) is not _missing
+
+    def get(self, key, default=None, count=True):
+        entry = self.data.get(key, None)
+        if entry is None or (entry[1] is not None and entry[1] < time.monotonic()):
+            if entry is not None:
+                self.__remove(key)
+            if count:
+                self.misses += 1
+            return default
+        if self.maxsize is not None or self.maxbytes is not None:
+            self.data.move_to_end(key)
+        if count:
+            self.hits += 1
+        return entry[0]
+
+    def set(self, key, value) -> None:
+        if key in self.data:
+            self.__remove(key)
+        nbytes = self.sizeof(value) if self.maxbytes is not None else 0
+        self.data[key] = (value, None if self.ttl is None else time.monotonic() + self.ttl, nbytes)
+        self.nbytes += nbytes
+        while len(self.data) > 1 and ((self.maxsize is not None and len(self.data) > self.maxsize) or (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+            self.__remove(next(iter(self.data)))
+            self.evictions += 1
+
+    def __remove(self, key):
+        self.nbytes -= self.data.pop(key)[2]
+
+    def clear(self) -> None:
+        self.data.clear()
+        self.nbytes = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.evictions, len(self.data), self.nbytes)
+
+def registered_cache(obj, name, **policy) -> MemoCache:
+    """
+    the MemoCache of registered function name of obj, created with policy (see MemoCache) if it doesn't exist
     """
+    register = getattr(obj, _register_name, None)
+    if register is None:
+        register = dict()
+        setattr(obj, _register_name, register)
+    cache = register.get(name, None)
+    if cache is None:
+        cache = register[name] = MemoCache(**policy)
+    return cache
+
+def registered_cache_info(obj) -> dict:
+    """
+    CacheInfo of every registered function of obj, keyed by function name
+    """
+    return {name: cache.info() for name, cache in getattr(obj, _register_name, dict()).items()}
+
+def clear_registered_cache(obj, *names) -> None:
+    """
+    invalidate cached results of registered functions in names of obj, all registered functions if names is empty
+    """
+    register = getattr(obj, _register_name, None)
+    if not register:
+        return
+    for name in (names if names else register.keys()):
+        cache = register.get(name, None)
+        if cache is not None and len(cache):
+            cache.clear()
+
+def destory_registered_property(*args):
+    """
+    invalidate cached results of registered_property / registered_method before the decorated function is called.
+    all of them are invalidated if no name is given.
+
     class A:
 
         def __init__(self):
@@ -236,54 +352,81 @@ def destory_registered_property(func):
         def destory(self):
             return
 
+        @destory_registered_property("test")
+        def destory_test(self):
+            return
+
         @registered_property
         def test(self):
             print("hello")
             return 1
     """
+    if len(args) == 1 and callable(args[0]):
+        return destory_registered_property()(args[0])
+    names = args
+    def o_wrapper(func):
+        @wraps(func)
+        def wrapper(self, *args, **kwargs):
+            clear_registered_cache(self, *names)
+            return func(self, *args, **kwargs)
+        return wrapper
+    return o_wrapper
+
+def _memoize(func, n, policy):
+    name = func.__name__
+
     @wraps(func)
-    def wrapper(self, *args, **kwars):
-        self.__registered_property = dict()
-        return func(self, *args, **kwars)
+    def wrapper(self, *args, **kwargs):
+        register = getattr(self, _register_name, None)
+        cache = None if register is None else register.get(name, None)
+        if cache is None:
+            cache = registered_cache(self, name, **policy)
+        key = args[:n]
+        ret = cache.get(key, _missing)
+        if ret is _missing:
+            ret = func(self, *args, **kwargs)
+            cache.set(key, ret)
+        return ret
+
+    wrapper.cache_info = lambda self: registered_cache(self, name, **policy).info()
+    wrapper.cache_clear = lambda self: clear_registered_cache(self, name)
     return wrapper
 
-def registered_method(*args, **kwargs):
-    if len(args) == 1 and callable(func:= args[0]):
-        @wraps(func)
-        def wrapper(self):
-            if not hasattr(self, "_{}__registered_property".format(self.__class__.__name__)):
-                exec("self._{}__registered_property = dict()".format(self.__class__.__name__))
-            register = eval("self._{}__registered_property".format(self.__class__.__name__))
-            if func.__name__ in register:
-                return register[func.__name__]
-            register[func.__name__] = func(self)
-            return register[func.__name__]
-        return wrapper
-    elif len(args) == 1 and isinstance(n:= args[0], int) and n > 0:
-        pass
-    elif len(args) == 0 and (n:= kwargs.pop("n", -1) > 0):
-        pass
-    else:
-        raise RuntimeError
+def registered_method(*args, n=None, maxsize=None, maxbytes=None, ttl=None, sizeof=sys.getsizeof):
+    """
+    cache the result of a method in its object, results are keyed by the first n positional arguments (0 by default)
+    see MemoCache for maxsize, maxbytes, ttl and sizeof.
+    cached results are invalidated by destory_registered_property.
+
+    @registered_method
+    def func_1(self):
+        ...
+
+    @registered_method(n=1, maxsize=128)
+    def func_2(self, a):
+        ...
 
+    statistics: A.func_2.cache_info(a), invalidation: A.func_2.cache_clear(a)
+    """
+    policy = dict(maxsize=maxsize, maxbytes=maxbytes, ttl=ttl, sizeof=sizeof)
+    if len(args) == 1 and callable(args[0]):
+        return _memoize(args[0], 0, policy)
+    elif len(args) == 1 and isinstance(args[0], int) and args[0] > 0:
+        n = args[0]
+    elif len(args) == 0:
+        n = 0 if n is None else n
+    else:
+        raise RuntimeError("registered_method should be used as @registered_method or @registered_method(n)")
     def o_wrapper(func):
-        @wraps(func)
-        def wrapper(self, *args, **kwargs):
-            if not hasattr(self, "_{}__registered_property".format(self.__class__.__name__)):
-                exec("self._{}__registered_property = dict()".format(self.__class__.__name__))
-            register = eval("self._{}__registered_property".format(self.__class__.__name__))
-            if func.__name__ in register and args[:n] in register[func.__name__]:
-                return register[func.__name__][args[:n]]
-            if func.__name__ not in register:
-                register[func.__name__] = dict()
-            register[func.__name__][args[:n]] = (ret:= func(self, *args, **kwargs))
-            return ret
-        return wrapper
+        return _memoize(func, n, policy)
     o_wrapper.n = n
     return o_wrapper
 
-def registered_property(func):
+def registered_property(*args, maxbytes=None, ttl=None, sizeof=sys.getsizeof):
     """
+    property whose value is computed at the first access and cached in its object,
+    see MemoCache for maxbytes, ttl and sizeof. cached values are invalidated by destory_registered_property.
+
     class A:
 
         def __init__(self):
@@ -298,27 +441,24 @@ def registered_property(func):
             print("hello")
             return 1
 
+        @registered_property(ttl=10)
+        def now(self):
+            return time.time()
+
         @registered_method
         def func_1(self):
             print("hello from func_1")
             return 2
 
-        @registered(n=1)
+        @registered_method(n=1)
         def func_2(self, a):
             print("hello from func_2")
             return a
     """
-
-    @wraps(func)
-    def wrapper(self, *args, **kwargs):
-        if not hasattr(self, "_{}__registered_property".format(self.__class__.__name__)):
-            exec("self._{}__registered_property = dict()".format(self.__class__.__name__))
-        register = eval("self._{}__registered_property".format(self.__class__.__name__))
-        if func.__name__ in register:
-            return register[func.__name__]
-        register[func.__name__] = func(self, )
-        return register[func.__name__]
-    return property(wrapper)
+    policy = dict(maxbytes=maxbytes, ttl=ttl, sizeof=sizeof)
+    if len(args) == 1 and callable(args[0]):
+        return property(_memoize(args[0], 0, policy))
+    return lambda func: property(_memoize(func, 0, policy))
 
 class TimeoutException(Exception):
     pass
@@ -385,15 +525,25 @@ def repeat_trigger(func, n=1, start=1, with_input=True):
 
 class FunctionTimer:
 
-    def __init__(self, fast_threshold=-1, disable=False):
+    def __init__(self, fast_threshold=-1, disable=False, profiler=None):
+        """
+        Parameters
+        ----------
+        profiler : zytlib.timing.Profiler
+            if given, calls of the timed functions are also recorded in the call tree of profiler
+        """
         from .table import table
         self.fast_threshold = fast_threshold
         self.__funcs = {}
         self.disable = disable
+        self.profiler = profiler
 
     def timer(self, func):
         if self.disable:
             return func
+        wrapped = func
+        if self.profiler is not None:
+            func = self.profiler.function(func)
 
         @wraps(func)
         def wrapper(*args, **kwargs):
@@ -402,15 +552,14 @@ class FunctionTimer:
                 ret = func(*args, **kwargs)
                 elapse = old[1] / old[0]
             else:
-                start = time.time()
+                start = time.perf_counter_ns()
                 ret = func(*args, **kwargs)
-                end = time.time()
-                elapse = end - start
+                elapse = (time.perf_counter_ns() - start) / 1e9
             wrapper.record = (old[0] + 1, old[1] + elapse)
             return ret
 
         wrapper.record = (0, 0)
-        self.__funcs[func] = wrapper
+        self.__funcs[wrapped] = wrapper
         return wrapper
 
     @property